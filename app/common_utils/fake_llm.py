@@ -0,0 +1,147 @@
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, List, Optional
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import PrivateAttr
+
+# Matches the leading `('table', 'column', 'datatype'` of a metadata row in a prompt
+METADATA_ROW_PATTERN = re.compile(r"\(\s*'([^']*)',\s*'([^']*)',\s*'([^']*)'")
+
+# Header line of the compact prompt encoding, followed by one `|`-separated line per column
+COMPACT_HEADER_PREFIX = "column|type|"
+
+
+class FakeLLMError(Exception):
+    """Simulated transient provider failure."""
+    status_code = 503
+
+
+class FakeRateLimitError(Exception):
+    """Simulated provider rate limit (HTTP 429) carrying a Retry-After hint."""
+    status_code = 429
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Offline stand-in for a chat model, used to exercise throttling, retries and throughput
+    without a paid provider.
+
+    It answers the data dictionary prompts with valid JSON built from the metadata rows in the
+    prompt, after `latency` ± `jitter` seconds, or `tail_latency` seconds for a `tail_rate` share
+    of the calls. With `error_rate` it fails randomly, and with `rate_limit_rpm` it rejects calls
+    beyond that many per minute with a 429-style error.
+    """
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    tail_rate: float = 0.0
+    tail_latency: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rpm: int = 0
+    seed: Optional[int] = None
+
+    _random: random.Random = PrivateAttr()
+    _calls: deque = PrivateAttr(default_factory=deque)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        self._check_rate_limit()
+        with self._lock:
+            delay = max(self.latency + self._random.uniform(-self.jitter, self.jitter), 0.0)
+            if self._random.random() < self.tail_rate:
+                delay = self.tail_latency
+            fail = self._random.random() < self.error_rate
+        time.sleep(delay)
+        if fail:
+            raise FakeLLMError("Simulated provider error")
+
+        prompt = messages[-1].content if messages else ""
+        content = json.dumps(self._build_response(prompt))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def with_structured_output(self, schema: Any, **kwargs: Any) -> Runnable:
+        """Mimics provider structured output by validating the JSON answer against `schema`."""
+        return self | JsonOutputParser() | RunnableLambda(schema.model_validate)
+
+    def _check_rate_limit(self) -> None:
+        """Raises FakeRateLimitError when more than `rate_limit_rpm` calls were made in the last minute."""
+        if self.rate_limit_rpm <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and now - self._calls[0] >= 60:
+                self._calls.popleft()
+            if len(self._calls) >= self.rate_limit_rpm:
+                raise FakeRateLimitError(60 - (now - self._calls[0]))
+            self._calls.append(now)
+
+    @staticmethod
+    def _build_response(prompt: str) -> dict:
+        """Builds a response in the structure each data dictionary prompt expects."""
+        if COMPACT_HEADER_PREFIX in prompt:
+            return FakeChatModel._build_compact_response(prompt)
+
+        columns_by_table = {}
+        for table_name, column_name, datatype in METADATA_ROW_PATTERN.findall(prompt):
+            columns = columns_by_table.setdefault(table_name, {})
+            columns.setdefault(column_name, {
+                "column_name": column_name, "datatype": datatype, "length": "NULL",
+                "is_null": "NULL", "default": "NULL", "primary_key": "No", "foreign_key": "No",
+                "constraints": "NULL", "description": f"The {column_name.replace('_', ' ')} of the record.",
+            })
+
+        tables = [{"table_name": table_name,
+                   "table_description": f"Stores {table_name.replace('_', ' ')} records.",
+                   "columns": list(columns.values())}
+                  for table_name, columns in columns_by_table.items()]
+
+        if '"tables"' in prompt:
+            return {"tables": tables}
+        if not tables:
+            return {"table_description": "Stores records described by the listed columns."}
+        return tables[0]
+
+    @staticmethod
+    def _build_compact_response(prompt: str) -> dict:
+        """Builds a response for the compact prompts, describing columns without a description."""
+        tables, current = [], None
+        for line in prompt.splitlines():
+            line = line.strip()
+            if line.startswith("table "):
+                table_name = line[len("table "):]
+                current = {"table_name": table_name,
+                           "table_description": f"Stores {table_name.replace('_', ' ')} records.",
+                           "columns": []}
+                tables.append(current)
+            elif current is not None and line.count("|") == 7 and not line.startswith(COMPACT_HEADER_PREFIX):
+                fields = line.split("|")
+                if not fields[-1]:
+                    current["columns"].append({"column_name": fields[0],
+                                               "description": f"The {fields[0].replace('_', ' ')} of the record."})
+
+        if '"tables"' in prompt:
+            return {"tables": tables}
+        if not tables:
+            return {"table_description": "Stores records described by the listed columns."}
+        return {key: value for key, value in tables[0].items() if key != "table_name"}
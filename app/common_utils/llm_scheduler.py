@@ -0,0 +1,319 @@
+import random
+import threading
+import time
+from concurrent.futures import CancelledError
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict
+from uuid import UUID
+from langchain_core.callbacks import BaseCallbackHandler
+from app.common_utils.loggers import logger
+from app.common_utils.run_metrics import run_metrics
+from app.config.config import Config
+
+# HTTP status codes that are worth retrying: timeouts, rate limits and server errors
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Exception class name fragments used by provider SDKs for transient failures
+RETRYABLE_ERROR_NAMES = ("ratelimit", "timeout", "apiconnection", "serviceunavailable", "overloaded")
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that refills continuously at `rate_per_minute`.
+
+    The bucket holds at most `burst_seconds` worth of tokens, so a burst at start-up cannot
+    exceed the provider's short-window limits.
+    """
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 10.0) -> None:
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(rate_per_minute * burst_seconds / 60.0, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Blocks until `amount` tokens are available and consumes them.
+
+        Args:
+            amount (float): Number of tokens to consume, capped at the bucket capacity.
+
+        Returns:
+            float: The number of seconds spent waiting.
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def classify_error(error: Exception) -> tuple[bool, float | None]:
+    """
+    Determines whether an LLM call error is transient and how long the provider asked us to wait.
+
+    Args:
+        error (Exception): The exception raised by the provider SDK.
+
+    Returns:
+        tuple[bool, float | None]: Whether the call should be retried, and the Retry-After delay in seconds if given.
+    """
+    response = getattr(error, "response", None)
+    status_code = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+
+    retry_after = getattr(error, "retry_after", None)
+    headers = getattr(response, "headers", None)
+    if retry_after is None and headers is not None:
+        retry_after = headers.get("retry-after")
+    retry_after = _parse_retry_after(retry_after)
+
+    error_name = type(error).__name__.lower()
+    retryable = (
+        status_code in RETRYABLE_STATUS_CODES
+        or isinstance(error, (TimeoutError, ConnectionError))
+        or any(fragment in error_name for fragment in RETRYABLE_ERROR_NAMES)
+    )
+    return retryable, retry_after
+
+
+def _parse_retry_after(value: Any) -> float | None:
+    """Parses a Retry-After value given in seconds or as an HTTP date."""
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(parsedate_to_datetime(str(value)).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class LLMScheduler:
+    """
+    Throttles, retries and counts the LLM calls made to one provider.
+
+    Every call first takes one request from the requests/minute bucket and its estimated tokens
+    from the tokens/minute bucket. Transient failures (rate limits, timeouts, server errors) are
+    retried with jittered exponential backoff; a Retry-After hint pauses all calls to the provider.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0) -> None:
+        self.name = name
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "succeeded": 0, "throttled": 0, "retried": 0, "failed": 0}
+        # Wall-clock time of successful calls and the part of it spent waiting for the model
+        self._call_seconds = 0.0
+        self._model_seconds = 0.0
+        self._model_calls = 0
+
+    @classmethod
+    def from_config(cls, name: str) -> "LLMScheduler":
+        """Creates a scheduler using the `LLM_*` rate limit and retry settings."""
+        return cls(name, Config.LLM_REQUESTS_PER_MINUTE, Config.LLM_TOKENS_PER_MINUTE,
+                   Config.LLM_MAX_RETRIES, Config.LLM_RETRY_BASE_DELAY, Config.LLM_RETRY_MAX_DELAY)
+
+    def call(self, fn: Callable[..., Any], *args: Any, estimated_tokens: int = 0,
+             max_retries: int | None = None, cancelled: threading.Event | None = None, **kwargs: Any) -> Any:
+        """
+        Calls `fn(*args, **kwargs)` within the provider's budgets, retrying transient failures.
+
+        Args:
+            fn (Callable[..., Any]): The LLM call, e.g. a chain's `invoke`.
+            estimated_tokens (int): Estimated prompt and completion tokens of the call.
+            max_retries (int | None): Retries of this call, instead of the scheduler's `max_retries`.
+            cancelled (threading.Event | None): Once set, no further attempt is started.
+
+        Returns:
+            Any: The return value of `fn`.
+
+        Raises:
+            CancelledError: If `cancelled` was set before an attempt started.
+            Exception: The last error once it is not retryable or the retries are exhausted.
+        """
+        max_retries = self.max_retries if max_retries is None else max_retries
+        run_metrics.increment("estimated_tokens", estimated_tokens)
+        for attempt in range(max_retries + 1):
+            self._wait_for_capacity(estimated_tokens)
+            if cancelled is not None and cancelled.is_set():
+                raise CancelledError(f"LLM call to '{self.name}' was cancelled")
+            self._increment("calls")
+            try:
+                started = time.perf_counter()
+                result = fn(*args, **kwargs)
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._counters["succeeded"] += 1
+                    self._call_seconds += elapsed
+                run_metrics.record_span("llm_call", elapsed)
+                return result
+            except Exception as e:
+                retryable, retry_after = classify_error(e)
+                if not retryable or attempt >= max_retries:
+                    self._increment("failed")
+                    raise
+
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                    with self._lock:
+                        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                self._increment("retried")
+                logger.warning(
+                    f"LLM call to '{self.name}' failed ({type(e).__name__}: {e}), "
+                    f"retry {attempt + 1}/{max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def _wait_for_capacity(self, estimated_tokens: int) -> None:
+        """Blocks until the provider is not paused and both budgets allow another call."""
+        with self._lock:
+            pause = self._paused_until - time.monotonic()
+        waited = 0.0
+        if pause > 0:
+            time.sleep(pause)
+            waited += pause
+        if self.request_bucket is not None:
+            waited += self.request_bucket.acquire(1)
+        if self.token_bucket is not None and estimated_tokens > 0:
+            waited += self.token_bucket.acquire(estimated_tokens)
+        if waited > 0:
+            self._increment("throttled")
+
+    def _increment(self, counter: str) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+        run_metrics.increment(f"llm_{counter}")
+
+    def record_model_time(self, seconds: float) -> None:
+        """Records how long the model itself took to answer one request."""
+        with self._lock:
+            self._model_seconds += seconds
+            self._model_calls += 1
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns a copy of the call counters and the average time per successful call.
+
+        `avg_overhead_ms` is the call time not spent waiting for the model: prompt formatting,
+        client and connection setup, and response parsing.
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            if self._counters["succeeded"]:
+                avg_call_ms = 1000 * self._call_seconds / self._counters["succeeded"]
+                stats["avg_call_ms"] = round(avg_call_ms, 2)
+                if self._model_calls:
+                    avg_model_ms = 1000 * self._model_seconds / self._model_calls
+                    stats["avg_model_ms"] = round(avg_model_ms, 2)
+                    stats["avg_overhead_ms"] = round(max(avg_call_ms - avg_model_ms, 0.0), 2)
+            return stats
+
+
+class ModelLatencyCallback(BaseCallbackHandler):
+    """Reports the time between a model request starting and its response to an `LLMScheduler`."""
+
+    def __init__(self, scheduler: LLMScheduler) -> None:
+        self.scheduler = scheduler
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized: Any, prompts: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            elapsed = time.perf_counter() - started
+            self.scheduler.record_model_time(elapsed)
+            run_metrics.record_span("llm_model", elapsed)
+        input_tokens, output_tokens = _token_usage(response)
+        if input_tokens or output_tokens:
+            run_metrics.increment("input_tokens", input_tokens)
+            run_metrics.increment("output_tokens", output_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+
+
+def _token_usage(response: Any) -> tuple[int, int]:
+    """Returns the input and output tokens a provider reported for a response, (0, 0) if unknown."""
+    usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    if usage:
+        return int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0)
+
+    input_tokens = output_tokens = 0
+    for generations in getattr(response, "generations", None) or []:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            input_tokens += int(usage.get("input_tokens") or 0)
+            output_tokens += int(usage.get("output_tokens") or 0)
+    return input_tokens, output_tokens
+
+
+_schedulers: Dict[str, LLMScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def provider_name(model_name: str | None) -> str:
+    """
+    Returns the provider of `model_name` (e.g. 'openai:gpt-4o' → 'openai').
+
+    Fake models are named 'fake:<name>', so that fakes with different names stand in for different
+    providers when testing model tiers.
+    """
+    provider, _, model_id = (model_name or "").strip().lower().partition(":")
+    provider = provider.strip()
+    if provider == "fake":
+        return f"fake:{model_id.split('?', 1)[0].strip()}"
+    return provider
+
+
+def get_llm_scheduler(model_name: str | None) -> LLMScheduler:
+    """
+    Returns the shared scheduler of the provider of `model_name`, see `provider_name`.
+
+    Args:
+        model_name (str | None): The `provider:model` id.
+
+    Returns:
+        LLMScheduler: The provider's scheduler, created on first use.
+    """
+    provider = provider_name(model_name)
+    with _schedulers_lock:
+        if provider not in _schedulers:
+            _schedulers[provider] = LLMScheduler.from_config(provider)
+        return _schedulers[provider]
+
+
+def get_scheduler_stats() -> Dict[str, Dict[str, float]]:
+    """Returns the stats of every provider scheduler, keyed by provider."""
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    return {scheduler.name: scheduler.stats() for scheduler in schedulers}
+
+
+def log_scheduler_stats() -> None:
+    """Logs the call counters of every provider scheduler."""
+    with _schedulers_lock:
+        schedulers = list(_schedulers.values())
+    for scheduler in schedulers:
+        logger.info(f"LLM scheduler stats for '{scheduler.name}': {scheduler.stats()}")
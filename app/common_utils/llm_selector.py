@@ -1,12 +1,17 @@
 import os
-from typing import Any
-from langchain_openai import ChatOpenAI
-from langchain_ollama import ChatOllama
-from langchain_huggingface import ChatHuggingFace
-from langchain_cohere import ChatCohere
+from typing import TYPE_CHECKING, Any
 from app.common_utils.loggers import logger
 from app.config.config import Config
 
+# Provider SDKs take seconds to import, so each one is only imported when it is selected
+if TYPE_CHECKING:
+    import httpx
+    from langchain_cohere import ChatCohere
+    from langchain_huggingface import ChatHuggingFace
+    from langchain_ollama import ChatOllama
+    from langchain_openai import ChatOpenAI
+    from app.common_utils.fake_llm import FakeChatModel
+
 
 class ConfigurationError(Exception):
     """Custom exception for configuration errors in LLMSelector."""
@@ -22,10 +27,14 @@ class LLMSelector:
         - "ollama:llama3" → Uses Ollama's LLaMA-3
         - "huggingface:mistral-7b" → Uses Hugging Face's Mistral-7B
         - "cohere:command-r" → Uses Cohere's Command-R+
+        - "fake:any" → Uses an offline fake model (for testing and benchmarks)
+
+    Fake models take their settings from the `FAKE_LLM_*` configuration, overridden by query
+    parameters, e.g. "fake:backup?latency=0.5&error_rate=0.1".
     """
 
-    def __init__(self) -> None:
-        self.model_name: str = (Config.LLM_MODEL_NAME or "").strip().lower()
+    def __init__(self, model_name: str | None = None) -> None:
+        self.model_name: str = (model_name or Config.LLM_MODEL_NAME or "").strip().lower()
         logger.info(f"LLMSelector initialized with model: '{self.model_name}'")
 
     def get_llm_model(self) -> Any:
@@ -66,6 +75,7 @@ class LLMSelector:
             "ollama": self._initialize_ollama,
             "huggingface": self._initialize_huggingface,
             "cohere": self._initialize_cohere,
+            "fake": self._initialize_fake,
         }
 
         if provider in model_initializers:
@@ -78,29 +88,70 @@ class LLMSelector:
             "Update .env with correct syntax (e.g., 'openai:gpt-4')."
         )
 
-    def _initialize_openai(self, model_id: str) -> ChatOpenAI:
+    def _initialize_openai(self, model_id: str) -> "ChatOpenAI":
         """Initializes an OpenAI model."""
+        from langchain_openai import ChatOpenAI
+        from openai import DefaultHttpxClient
+
         self._validate_api_key()
         logger.info(f"Initializing OpenAI model: '{model_id}'")
-        return ChatOpenAI(model=model_id, api_key=Config.API_KEY, temperature=0.0)
+        # Retries are left to `LLMScheduler`, so SDK retries do not multiply them
+        return ChatOpenAI(model=model_id, api_key=Config.API_KEY, temperature=0.0, max_retries=0,
+                          http_client=DefaultHttpxClient(limits=self._connection_limits()))
 
-    def _initialize_ollama(self, model_id: str) -> ChatOllama:
+    def _initialize_ollama(self, model_id: str) -> "ChatOllama":
         """Initializes an Ollama model."""
+        from langchain_ollama import ChatOllama
+
         logger.info(f"Initializing Ollama model: '{model_id}'")
-        return ChatOllama(model=model_id)
+        return ChatOllama(model=model_id, client_kwargs={"limits": self._connection_limits()})
 
-    def _initialize_huggingface(self, model_id: str) -> ChatHuggingFace:
+    def _initialize_huggingface(self, model_id: str) -> "ChatHuggingFace":
         """Initializes a Hugging Face model."""
+        from langchain_huggingface import ChatHuggingFace
+
         self._validate_api_key()
         logger.info(f"Initializing Hugging Face model: '{model_id}'")
         return ChatHuggingFace(repo_id=model_id, api_key=Config.API_KEY, temperature=0.0)
 
-    def _initialize_cohere(self, model_id: str) -> ChatCohere:
+    def _initialize_cohere(self, model_id: str) -> "ChatCohere":
         """Initializes a Cohere model."""
+        from langchain_cohere import ChatCohere
+
         self._validate_api_key()
         logger.info(f"Initializing Cohere model: '{model_id}'")
         return ChatCohere(model=model_id, api_key=Config.API_KEY, temperature=0.0)
 
+    def _initialize_fake(self, model_id: str) -> "FakeChatModel":
+        """Initializes the offline fake model, applying the settings given as query parameters."""
+        from urllib.parse import parse_qsl
+        from app.common_utils.fake_llm import FakeChatModel
+
+        logger.info(f"Initializing fake model: '{model_id}'")
+        settings = {"latency": Config.FAKE_LLM_LATENCY, "jitter": Config.FAKE_LLM_JITTER,
+                    "error_rate": Config.FAKE_LLM_ERROR_RATE,
+                    "rate_limit_rpm": Config.FAKE_LLM_RATE_LIMIT_RPM, "seed": Config.FAKE_LLM_SEED}
+        _, _, query = model_id.partition("?")
+        settings.update(parse_qsl(query))
+        try:
+            return FakeChatModel(**settings)
+        except ValueError as e:
+            raise ConfigurationError(f"Invalid fake model settings '{query}': {e}")
+
+    @staticmethod
+    def _connection_limits() -> "httpx.Limits":
+        """
+        Sizes the model client's keep-alive pool so every concurrent request reuses a warm connection.
+
+        Each schema worker runs `LLM_MAX_CONCURRENCY` table requests, plus one shared pool of
+        `LLM_MAX_CONCURRENCY` column-chunk requests.
+        """
+        import httpx
+
+        pool_size = Config.LLM_MAX_CONCURRENCY * (Config.SCHEMA_CONCURRENCY + 1)
+        return httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size,
+                            keepalive_expiry=60.0)
+
     @staticmethod
     def _validate_api_key() -> None:
         """Validates the presence of an API key in the configuration."""
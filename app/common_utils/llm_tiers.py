@@ -0,0 +1,321 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List
+from app.common_utils.llm_scheduler import LLMScheduler, classify_error, get_llm_scheduler, provider_name
+from app.common_utils.llm_selector import LLMSelector
+from app.common_utils.loggers import logger
+from app.common_utils.run_metrics import _percentile, run_metrics
+from app.config.config import Config
+
+# Recent successful call latencies kept per tier to derive its hedging threshold
+LATENCY_WINDOW = 200
+
+
+class CircuitBreaker:
+    """
+    Skips a provider after `failure_threshold` consecutive transient failures.
+
+    An open breaker lets a single probe call through after `reset_seconds`; the probe closes the
+    breaker again when it succeeds and re-opens it when it fails. A probe that never reports back
+    (e.g. a cancelled hedge) is replaced by another one after `reset_seconds`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.opened = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Returns whether a call may be sent to the provider, claiming the probe of an expired open breaker."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != "closed":
+                logger.info(f"Circuit breaker of '{self.name}' closed")
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or (self.state == "closed" and self._failures >= self.failure_threshold):
+                self.state = "open"
+                self.opened += 1
+                self._opened_at = time.monotonic()
+                logger.warning(f"Circuit breaker of '{self.name}' opened after {self._failures} "
+                               f"consecutive failures, retrying in {self.reset_seconds:.0f}s")
+
+
+class ModelTier:
+    """One model of the ordered tier list, with its provider's scheduler and circuit breaker."""
+
+    def __init__(self, index: int, model_name: str, scheduler: LLMScheduler, breaker: CircuitBreaker) -> None:
+        self.index = index
+        self.model_name = model_name
+        self.scheduler = scheduler
+        self.breaker = breaker
+        self._llm = None
+        self._lock = threading.Lock()
+        self._latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self._counters = {"requests": 0, "served": 0, "hedges": 0, "hedges_won": 0, "failovers": 0,
+                          "abandoned": 0, "failed": 0, "tables": 0}
+
+    def get_llm(self) -> Any:
+        """Returns the tier's model, initializing its provider on first use."""
+        with self._lock:
+            if self._llm is None:
+                self._llm = LLMSelector(self.model_name).get_llm_model()
+                logger.info(f"Using LLM Model for tier {self.index}: {self._llm.__class__.__name__}")
+        return self._llm
+
+    def hedge_delay(self, percentile: float, min_samples: int, min_seconds: float) -> float | None:
+        """
+        Returns how long a request may run before it is hedged: the `percentile` of the tier's
+        recent latencies, at least `min_seconds`. None until `min_samples` calls succeeded.
+        """
+        with self._lock:
+            if percentile <= 0 or len(self._latencies) < max(min_samples, 1):
+                return None
+            latencies = sorted(self._latencies)
+        return max(_percentile(latencies, percentile), min_seconds)
+
+    def record(self, counter: str, seconds: float | None = None) -> None:
+        with self._lock:
+            self._counters[counter] += 1
+            if seconds is not None:
+                self._latencies.append(seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = {"model": self.model_name, **self._counters}
+            latencies = sorted(self._latencies)
+        if latencies:
+            for percentile in (50, 95, 99):
+                stats[f"p{percentile}_ms"] = round(1000 * _percentile(latencies, percentile), 2)
+        stats["breaker"] = self.breaker.state
+        stats["breaker_opened"] = self.breaker.opened
+        return stats
+
+
+class LLMRouter:
+    """
+    Sends each LLM request to an ordered list of model tiers, e.g. a local Ollama model backed by OpenAI.
+
+    A request goes to the first tier whose provider's circuit breaker is closed. If it runs longer
+    than the tier's `hedge_percentile` latency, a duplicate is sent to the next tier and the first
+    valid response wins; the other request is cancelled if it has not started, and otherwise its
+    result is discarded and its remaining retries are skipped. A failed request fails over to the
+    next tier. Every tier but the last retries `fallback_retries` times instead of `LLM_MAX_RETRIES`.
+
+    With a single tier, requests are passed straight to its scheduler.
+    """
+
+    def __init__(self, tiers: List[ModelTier], hedge_percentile: float = 95.0, hedge_min_samples: int = 20,
+                 hedge_min_seconds: float = 1.0, fallback_retries: int = 1) -> None:
+        self.tiers = tiers
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_seconds = hedge_min_seconds
+        self.fallback_retries = fallback_retries
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls) -> "LLMRouter":
+        """Creates the tiers of `LLM_MODEL_NAME` followed by `LLM_FALLBACK_MODELS`."""
+        model_names = [Config.LLM_MODEL_NAME or ""] + Config.LLM_FALLBACK_MODELS
+        tiers = [ModelTier(index, model_name, get_llm_scheduler(model_name), get_circuit_breaker(model_name))
+                 for index, model_name in enumerate(model_names, start=1)]
+        return cls(tiers, Config.LLM_HEDGE_PERCENTILE, Config.LLM_HEDGE_MIN_SAMPLES,
+                   Config.LLM_HEDGE_MIN_SECONDS, Config.LLM_FALLBACK_RETRIES)
+
+    def call(self, invoke: Callable[[ModelTier], Callable[..., Any]], *args: Any,
+             estimated_tokens: int = 0) -> Any:
+        """
+        Calls `invoke(tier)(*args)` on the tiers, hedging slow requests and failing over on errors.
+
+        Args:
+            invoke (Callable[[ModelTier], Callable[..., Any]]): Returns the call to make on a tier,
+                e.g. the `invoke` of a chain built on the tier's model.
+            estimated_tokens (int): Estimated prompt and completion tokens of the call.
+
+        Returns:
+            Any: The first valid response.
+
+        Raises:
+            Exception: The last error once every tier failed.
+        """
+        if len(self.tiers) == 1:
+            return self._attempt(self.tiers[0], invoke, args, estimated_tokens, None, None)
+
+        # Tiers are claimed one at a time, so an unused tier never takes its breaker's probe
+        remaining = list(self.tiers)
+        cancelled = threading.Event()
+        pending: Dict[Future, tuple] = {}
+        last_error = None
+
+        def next_tier() -> ModelTier | None:
+            while remaining:
+                tier = remaining.pop(0)
+                if tier.breaker.allow():
+                    return tier
+            return None
+
+        def start(tier: ModelTier, reason: str | None) -> None:
+            retries = None if tier is self.tiers[-1] else self.fallback_retries
+            if reason:
+                tier.record(reason)
+            future = self._get_executor().submit(
+                contextvars.copy_context().run, self._attempt, tier, invoke, args, estimated_tokens,
+                retries, cancelled)
+            pending[future] = (tier, time.perf_counter(), reason)
+
+        # When every breaker is open, the last tier is tried anyway
+        start(next_tier() or self.tiers[-1], None)
+        while pending:
+            timeout = None
+            if remaining and len(pending) == 1:
+                tier, started, _ = next(iter(pending.values()))
+                delay = tier.hedge_delay(self.hedge_percentile, self.hedge_min_samples, self.hedge_min_seconds)
+                if delay is not None:
+                    timeout = max(delay - (time.perf_counter() - started), 0.0)
+
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedge_tier = next_tier()
+                if hedge_tier is not None:
+                    logger.debug(f"LLM request to tier {tier.index} exceeded {timeout:.2f}s, "
+                                 f"hedging to tier {hedge_tier.index}")
+                    run_metrics.increment("llm_hedges")
+                    start(hedge_tier, "hedges")
+                continue
+
+            for future in done:
+                tier, _, reason = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                cancelled.set()
+                for loser in pending:
+                    loser_tier = pending[loser][0]
+                    loser_tier.record("abandoned")
+                    loser.cancel()
+                if reason == "hedges":
+                    tier.record("hedges_won")
+                    run_metrics.increment("llm_hedges_won")
+                return result
+
+            if not pending:
+                fallback_tier = next_tier()
+                if fallback_tier is not None:
+                    logger.warning(f"LLM request failed on tier {tier.index} ({type(last_error).__name__}: "
+                                   f"{last_error}), failing over to tier {fallback_tier.index}")
+                    run_metrics.increment("llm_failovers")
+                    start(fallback_tier, "failovers")
+        raise last_error
+
+    def _attempt(self, tier: ModelTier, invoke: Callable[[ModelTier], Callable[..., Any]], args: tuple,
+                 estimated_tokens: int, retries: int | None, cancelled: threading.Event | None) -> Any:
+        """Makes the call on one tier, recording its latency, its outcome and its circuit breaker state."""
+        tier.record("requests")
+        started = time.perf_counter()
+        try:
+            result = tier.scheduler.call(invoke(tier), *args, estimated_tokens=estimated_tokens,
+                                         max_retries=retries, cancelled=cancelled)
+        except Exception as e:
+            if not (cancelled is not None and cancelled.is_set()):
+                tier.record("failed")
+                if classify_error(e)[0]:
+                    tier.breaker.record_failure()
+            raise
+        tier.breaker.record_success()
+        if cancelled is not None and cancelled.is_set():
+            return result
+        tier.record("served", time.perf_counter() - started)
+        run_metrics.increment(f"llm_tier_{tier.index}_served")
+        return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Returns the pool running tier requests: a primary and a hedge for every concurrent LLM call."""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=2 * Config.LLM_MAX_CONCURRENCY * (Config.SCHEMA_CONCURRENCY + 1),
+                    thread_name_prefix="llm-tier")
+        return self._executor
+
+    def record_table(self, counters: Dict[str, float]) -> int:
+        """
+        Attributes a table to the last tier that answered one of its requests.
+
+        Args:
+            counters (Dict[str, float]): The counters of the table's `run_metrics.table_scope`.
+
+        Returns:
+            int: The tier that served the table, 0 if it needed no LLM request.
+        """
+        served = [tier for tier in self.tiers if counters.get(f"llm_tier_{tier.index}_served")]
+        if not served:
+            return 0
+        served[-1].record("tables")
+        return served[-1].index
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the counters, latency percentiles and breaker state of every tier, keyed by tier number."""
+        return {str(tier.index): tier.stats() for tier in self.tiers}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_circuit_breaker(model_name: str | None) -> CircuitBreaker:
+    """Returns the shared circuit breaker of the provider of `model_name`, created on first use."""
+    provider = provider_name(model_name)
+    with _breakers_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider, Config.LLM_BREAKER_FAILURES,
+                                                 Config.LLM_BREAKER_RESET_SECONDS)
+        return _breakers[provider]
+
+
+def get_llm_router() -> LLMRouter:
+    """Returns the shared router over the configured model tiers."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = LLMRouter.from_config()
+    return _router
+
+
+def get_tier_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns the stats of every model tier, or an empty dict when no LLM request was routed."""
+    return _router.stats() if _router is not None else {}
+
+
+def log_tier_stats() -> None:
+    """Logs how many requests and tables every model tier served, when more than one is configured."""
+    if _router is None or len(_router.tiers) < 2:
+        return
+    for index, stats in _router.stats().items():
+        logger.info(f"LLM tier {index} stats: {stats}")
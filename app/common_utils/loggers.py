@@ -1,12 +1,41 @@
+import atexit
+import glob
 import json
 import os
+import queue
 import sys
+import threading
+import time
+from dotenv import load_dotenv
 from loguru import logger
 import traceback
 
+# The logger is configured on import, usually before `Config` has loaded the .env file
+load_dotenv()
+
 LOG_FILE = os.getenv("LOG_FILE", os.path.join(
     os.path.dirname(__file__), "log.log"))
 
+# Serialize and write records on a background thread instead of the logging thread
+LOG_ASYNC = os.getenv("LOG_ASYNC", "True").lower() == "true"
+
+# Keep the first LOG_SAMPLE_BURST INFO/DEBUG messages of every log call site, then one in
+# LOG_SAMPLE_EVERY (0 = no sampling). Warnings and errors are never sampled.
+LOG_SAMPLE_BURST = int(os.getenv("LOG_SAMPLE_BURST", "0"))
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "10"))
+
+# Records the asynchronous writer may hold; when it is full, "block" makes the logging thread
+# wait and "drop" discards INFO/DEBUG records (warnings and errors always wait)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_QUEUE_FULL = os.getenv("LOG_QUEUE_FULL", "block").strip().lower()
+
+FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {file}:{line} | {message}"
+LOG_ROTATION_SECONDS = 14 * 24 * 3600
+LOG_RETENTION_SECONDS = 30 * 24 * 3600
+
+# Maximum number of records the background writer serializes and writes at once
+MAX_BATCH_SIZE = 1000
+
 
 def serializer(record):
     return json.dumps({
@@ -36,15 +65,181 @@ def sink_function(message):
         print(f"Logging Error: {e}", file=sys.stderr)
 
 
+def _first_record_time(path: str) -> float | None:
+    """Returns the time of the first record in an existing log file, which dates its creation."""
+    try:
+        with open(path, encoding="utf-8") as log_file:
+            return time.mktime(time.strptime(log_file.readline()[:19], "%Y-%m-%d %H:%M:%S"))
+    except (OSError, ValueError):
+        return None
+
+
+class CallSiteSampler:
+    """
+    Loguru filter that samples high-volume INFO and DEBUG messages, such as the per-table progress
+    lines, per call site: the first `burst` messages of each site pass, then one in `every`.
+    """
+
+    def __init__(self, burst: int, every: int) -> None:
+        self.burst = burst
+        self.every = max(every, 1)
+        self.warning_level = logger.level("WARNING").no
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, record) -> bool:
+        if record["level"].no >= self.warning_level:
+            return True
+        key = (record["name"], record["line"])
+        with self._lock:
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+        return count <= self.burst or (count - self.burst) % self.every == 0
+
+
+class AsyncLogWriter:
+    """
+    Loguru sink that only enqueues records, leaving the work to a background thread.
+
+    The writer thread serializes each record once, writes the JSON lines to stdout (errors also
+    to stderr) and the text lines to `log_file` in batches, flushing once per batch. The log
+    file is rotated every two weeks and rotated files are deleted after 30 days.
+
+    At most `max_queued` records wait for the writer. When the queue is full, the logging thread
+    waits, or with `drop_when_full` INFO and DEBUG records are discarded and counted instead.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_file: str | None, max_queued: int = 10000, drop_when_full: bool = False) -> None:
+        self.log_file = log_file
+        self.drop_when_full = drop_when_full
+        self.dropped = 0
+        self._file = None
+        self._file_created = 0.0
+        self._queue = queue.Queue(maxsize=max(max_queued, 1))
+        self._dropped_lock = threading.Lock()
+        self._warning_level = logger.level("WARNING").no
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def __call__(self, message) -> None:
+        record = message.record
+        if not self.drop_when_full or record["level"].no >= self._warning_level:
+            self._queue.put(record)
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Blocks until every record enqueued so far has been written."""
+        written = threading.Event()
+        self._queue.put(written)
+        written.wait(timeout)
+
+    def stop(self) -> None:
+        """Writes the remaining records and stops the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < MAX_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write([item for item in batch if isinstance(item, dict)])
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if any(item is self._STOP for item in batch):
+                if self._file is not None:
+                    self._file.close()
+                return
+
+    def _write(self, records: list) -> None:
+        out_lines, err_lines, file_lines = [], [], []
+        with self._dropped_lock:
+            dropped, self.dropped = self.dropped, 0
+        if dropped:
+            notice = f"Dropped {dropped} log records while the log queue was full"
+            out_lines.append(json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                                         "level": "WARNING", "message": notice}))
+            if self.log_file:
+                file_lines.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')} | WARNING | loggers.py | {notice}\n")
+        for record in records:
+            try:
+                serialized = serializer(record)
+            except Exception as e:
+                serialized = json.dumps({"level": "ERROR", "message": f"Logging Error: {e}"})
+            out_lines.append(serialized)
+            if record["level"].name.lower() in ("error", "critical"):
+                err_lines.append(serialized)
+            if self.log_file:
+                file_lines.append(
+                    f"{record['time']:%Y-%m-%d %H:%M:%S} | {record['level'].name} | "
+                    f"{record['file'].name}:{record['line']} | {record['message']}\n")
+                if record["exception"]:
+                    file_lines.append("".join(traceback.format_exception(*record["exception"])))
+
+        try:
+            if out_lines:
+                sys.stdout.write("\n".join(out_lines) + "\n")
+                sys.stdout.flush()
+            if err_lines:
+                sys.stderr.write("\n".join(err_lines) + "\n")
+                sys.stderr.flush()
+            if file_lines:
+                log_file = self._open_log_file()
+                log_file.write("".join(file_lines))
+                log_file.flush()
+        except Exception as e:
+            print(f"Logging Error: {e}", file=sys.stderr)
+
+    def _open_log_file(self):
+        """Returns the open log file, rotating it and deleting expired rotated files when it is due."""
+        now = time.time()
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_file)), exist_ok=True)
+            self._file_created = _first_record_time(self.log_file) or now
+            self._file = open(self.log_file, "a", encoding="utf-8")
+
+        if now - self._file_created >= LOG_ROTATION_SECONDS:
+            self._file.close()
+            root, extension = os.path.splitext(self.log_file)
+            os.replace(self.log_file, f"{root}.{time.strftime('%Y-%m-%d_%H-%M-%S')}{extension}")
+            for rotated in glob.glob(f"{glob.escape(root)}.*{extension}"):
+                if now - os.path.getmtime(rotated) >= LOG_RETENTION_SECONDS:
+                    os.remove(rotated)
+            self._file_created = now
+            self._file = open(self.log_file, "a", encoding="utf-8")
+        return self._file
+
+
 def setup_logger(log_level="INFO"):
     logger.remove()
     logger.patch(add_traceback)
-    logger.add(sink_function, level=log_level)
+    sampler = CallSiteSampler(LOG_SAMPLE_BURST, LOG_SAMPLE_EVERY) if LOG_SAMPLE_BURST > 0 else None
+    if LOG_ASYNC:
+        # The writer formats records itself, so loguru only needs the bare message
+        writer = AsyncLogWriter(LOG_FILE, LOG_QUEUE_SIZE, drop_when_full=LOG_QUEUE_FULL == "drop")
+        logger.add(writer, format="{message}", level=log_level, filter=sampler)
+        return logger
+
+    logger.add(sink_function, level=log_level, filter=sampler)
     logger.add(LOG_FILE,
-               format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {file}:{line} | {message}",
+               format=FILE_FORMAT,
                rotation="2 week",
                retention="30 days",
-               level=log_level)
+               level=log_level,
+               filter=sampler)
     return logger
 
 
@@ -0,0 +1,197 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+from app.common_utils.loggers import logger
+
+# Latency percentiles reported for every timed stage
+PERCENTILES = (50, 90, 99)
+
+# Counters of the table or batch the current thread is working on, see `RunMetrics.table_scope`
+_table_counters: contextvars.ContextVar[Dict[str, float] | None] = contextvars.ContextVar(
+    "table_counters", default=None)
+
+# Prefix of the table names recorded by the current thread, see `RunMetrics.table_namespace`
+_table_namespace: contextvars.ContextVar[str] = contextvars.ContextVar("table_namespace", default="")
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Returns the nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(int(round(percentile / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class RunMetrics:
+    """
+    Thread-safe timing spans, counters and per-table statistics of one run.
+
+    Spans record how long each pipeline stage (catalog query, LLM calls, response parsing,
+    sheet writing, ...) took every time it ran; counters accumulate totals such as LLM calls,
+    retries and tokens. Counters incremented inside `table_scope` are also attributed to the
+    tables being generated.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears every span, counter and table statistic."""
+        with self._lock:
+            self.started = time.time()
+            self._spans: Dict[str, List[float]] = {}
+            self._counters: Dict[str, float] = {}
+            self._tables: Dict[str, Dict[str, float]] = {}
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Times the enclosed block as one occurrence of `stage`, even when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(stage, time.perf_counter() - started)
+
+    def record_span(self, stage: str, seconds: float) -> None:
+        """Records one occurrence of `stage` that took `seconds`."""
+        with self._lock:
+            self._spans.setdefault(stage, []).append(seconds)
+
+    def increment(self, counter: str, amount: float = 1) -> None:
+        """Adds `amount` to a run counter and to the counters of the current table scope, if any."""
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+            scope = _table_counters.get()
+            if scope is not None:
+                scope[counter] = scope.get(counter, 0) + amount
+
+    @contextmanager
+    def table_scope(self) -> Iterator[Dict[str, float]]:
+        """
+        Collects the counters incremented by the enclosed block, e.g. the LLM calls and tokens of one batch.
+
+        Worker threads only see the scope when submitted with `contextvars.copy_context().run`.
+
+        Yields:
+            Dict[str, float]: The counters of the scope, filled in as the block runs.
+        """
+        counters: Dict[str, float] = {}
+        token = _table_counters.set(counters)
+        try:
+            yield counters
+        finally:
+            _table_counters.reset(token)
+
+    @contextmanager
+    def table_namespace(self, namespace: str) -> Iterator[None]:
+        """
+        Records the tables of the enclosed block as `<namespace>.<table>`, e.g. `target.schema`,
+        so tables of the same name in different schemas or databases are kept apart.
+
+        Worker threads only see the namespace when submitted with `contextvars.copy_context().run`.
+        """
+        token = _table_namespace.set(namespace)
+        try:
+            yield
+        finally:
+            _table_namespace.reset(token)
+
+    def record_table(self, table: str, **values: float) -> None:
+        """Adds `values` (rows, tokens, seconds, ...) to the statistics of `table`, within the current namespace."""
+        namespace = _table_namespace.get()
+        if namespace:
+            table = f"{namespace}.{table}"
+        with self._lock:
+            stats = self._tables.setdefault(table, {})
+            for name, value in values.items():
+                stats[name] = stats.get(name, 0) + value
+
+    def summary(self) -> dict:
+        """
+        Returns the machine-readable summary of the run.
+
+        Returns:
+            dict: `stages` with the count, total, mean, max and percentiles (in ms) of every span,
+                `counters`, and `tables` with the statistics of every table.
+        """
+        with self._lock:
+            spans = {stage: sorted(values) for stage, values in self._spans.items()}
+            counters = dict(self._counters)
+            tables = {table: dict(stats) for table, stats in self._tables.items()}
+            started = self.started
+
+        stages = {}
+        for stage, values in spans.items():
+            stats = {"count": len(values), "total_ms": round(1000 * sum(values), 3),
+                     "mean_ms": round(1000 * sum(values) / len(values), 3),
+                     "max_ms": round(1000 * values[-1], 3)}
+            for percentile in PERCENTILES:
+                stats[f"p{percentile}_ms"] = round(1000 * _percentile(values, percentile), 3)
+            stages[stage] = stats
+
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(started)),
+            "duration_s": round(time.time() - started, 3),
+            "stages": stages,
+            "counters": counters,
+            "tables": tables,
+        }
+
+
+def _prometheus_lines(summary: dict) -> List[str]:
+    """Renders the stage timings and counters of a summary in the Prometheus text format."""
+    lines = ["# HELP docuschema_run_duration_seconds Wall-clock duration of the run.",
+             "# TYPE docuschema_run_duration_seconds gauge",
+             f"docuschema_run_duration_seconds {summary['duration_s']}",
+             "# HELP docuschema_stage_seconds Time spent in each pipeline stage.",
+             "# TYPE docuschema_stage_seconds summary"]
+    for stage, stats in summary["stages"].items():
+        for percentile in PERCENTILES:
+            lines.append(f'docuschema_stage_seconds{{stage="{stage}",quantile="{percentile / 100}"}} '
+                         f'{round(stats[f"p{percentile}_ms"] / 1000, 6)}')
+        lines.append(f'docuschema_stage_seconds_sum{{stage="{stage}"}} {round(stats["total_ms"] / 1000, 6)}')
+        lines.append(f'docuschema_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+    lines += ["# HELP docuschema_events_total Run counters (LLM calls, retries, tokens, tables, ...).",
+              "# TYPE docuschema_events_total counter"]
+    for counter, value in sorted(summary["counters"].items()):
+        lines.append(f'docuschema_events_total{{counter="{counter}"}} {value}')
+    return lines
+
+
+run_metrics = RunMetrics()
+
+
+def write_run_report(json_path: str | None, prometheus_path: str | None = None,
+                     extra: Dict[str, dict] | None = None) -> dict:
+    """
+    Writes the run summary as JSON and, optionally, as a Prometheus textfile.
+
+    Files are written to a temporary name first and then renamed, so a textfile collector
+    never reads a partial file.
+
+    Args:
+        json_path (str | None): Path of the JSON summary, or None to skip it.
+        prometheus_path (str | None): Path of the Prometheus textfile, or None to skip it.
+        extra (Dict[str, dict] | None): Additional sections, such as the LLM scheduler stats.
+
+    Returns:
+        dict: The summary that was written.
+    """
+    summary = run_metrics.summary()
+    summary.update(extra or {})
+    for path, content in ((json_path, lambda: json.dumps(summary, indent=2, default=str)),
+                          (prometheus_path, lambda: "\n".join(_prometheus_lines(summary)) + "\n")):
+        if not path:
+            continue
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as report_file:
+                report_file.write(content())
+            os.replace(f"{path}.tmp", path)
+            logger.info(f"Run report written to {path}")
+        except OSError as err:
+            logger.warning(f"Could not write run report {path}: {err}")
+    return summary
@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from itertools import groupby
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 
 class BaseDB(ABC):
@@ -8,3 +10,19 @@ class BaseDB(ABC):
     def fetch_metadata(self, schema_name, table_name):
         """Fetch metadata for the given schema and table."""
         pass
+
+    @abstractmethod
+    def stream_metadata(self, conn, schema_name: str) -> Iterator[Tuple[str, List[Tuple[Any, ...]]]]:
+        """Stream metadata for the given schema, yielding one table's rows at a time."""
+        pass
+
+    @abstractmethod
+    def fetch_table_comments(self, conn, schema_name: str) -> Dict[str, str]:
+        """Fetch the existing comments of the tables in the given schema, keyed by table name."""
+        pass
+
+    @staticmethod
+    def group_rows_by_table(rows: Iterable[Tuple[Any, ...]]) -> Iterator[Tuple[str, List[Tuple[Any, ...]]]]:
+        """Groups consecutive metadata rows by table name (rows must be ordered by table)."""
+        for table_name, table_rows in groupby(rows, key=lambda row: row[0]):
+            yield table_name, list(table_rows)
@@ -4,11 +4,11 @@ from app.database.mysql import MySQLDB
 from app.config.config import Config
 
 
-def get_db_instance():
-    """Returns an instance of the appropriate database class based on the DBMS."""
-    dbms = Config.DBMS
+def get_db_instance(dbms: str = None):
+    """Returns an instance of the appropriate database class based on the DBMS (defaults to `Config.DBMS`)."""
+    dbms = dbms or Config.DBMS
 
-    if dbms == "postgres":
+    if dbms in ("postgres", "postgresql"):
         return PostgresDB()
     elif dbms == "mysql":
         return MySQLDB()
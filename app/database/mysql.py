@@ -1,45 +1,142 @@
+import re
 from app.database.base_db import BaseDB
-from common_utils.loggers import logger
-from typing import List, Tuple, Any
+from app.common_utils.loggers import logger
+from typing import Any, Dict, Iterator, List, Tuple
+from app.config.config import Config
+
+# Ordered by table so rows can be streamed and grouped one table at a time
+METADATA_QUERY = """
+    SELECT 
+        c.TABLE_NAME AS table_name,  
+        c.COLUMN_NAME AS column_name,  
+        c.DATA_TYPE AS data_type,  
+        COALESCE(c.CHARACTER_MAXIMUM_LENGTH, c.NUMERIC_PRECISION) AS length,  
+        c.IS_NULLABLE AS is_nullable,  
+        c.COLUMN_DEFAULT AS column_default,  
+        CASE WHEN tc.CONSTRAINT_TYPE = 'PRIMARY KEY' THEN 'Yes' ELSE 'No' END AS primary_key,  
+        CASE WHEN tc.CONSTRAINT_TYPE = 'FOREIGN KEY' THEN 'Yes' ELSE 'No' END AS foreign_key,  
+        '' AS constraints,  
+        COALESCE(
+            NULLIF(c.COLUMN_COMMENT, ''),
+            CASE 
+                WHEN tc.CONSTRAINT_TYPE = 'FOREIGN KEY' THEN 
+                     CONCAT('Foreign key for ', kcu.REFERENCED_TABLE_NAME)  
+                ELSE 
+                     ''
+            END
+        ) AS description
+    FROM information_schema.COLUMNS c
+    LEFT JOIN information_schema.KEY_COLUMN_USAGE kcu
+           ON c.TABLE_SCHEMA = kcu.TABLE_SCHEMA
+          AND c.TABLE_NAME   = kcu.TABLE_NAME
+          AND c.COLUMN_NAME  = kcu.COLUMN_NAME
+    LEFT JOIN information_schema.TABLE_CONSTRAINTS tc
+           ON kcu.CONSTRAINT_NAME = tc.CONSTRAINT_NAME
+          AND tc.TABLE_SCHEMA     = c.TABLE_SCHEMA
+    WHERE c.TABLE_SCHEMA = %s
+    ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION;
+"""
+
+# One row per column. METADATA_QUERY returns a row per (column, constraint) pair and matches
+# constraints by name only, so a column in a primary and a foreign key, or whose constraint
+# name is reused by another table, comes back several times. Here the unique flag, foreign
+# key targets and the check expressions mentioning the column share the constraints column,
+# e.g. "UNIQUE; REFERENCES customer (id); (`amount` >= 0)".
+_AGGREGATED_METADATA_TEMPLATE = """
+    SELECT
+        c.TABLE_NAME AS table_name,
+        c.COLUMN_NAME AS column_name,
+        c.DATA_TYPE AS data_type,
+        COALESCE(c.CHARACTER_MAXIMUM_LENGTH, c.NUMERIC_PRECISION) AS length,
+        c.IS_NULLABLE AS is_nullable,
+        c.COLUMN_DEFAULT AS column_default,
+        CASE WHEN MAX(tc.CONSTRAINT_TYPE = 'PRIMARY KEY') = 1 THEN 'Yes' ELSE 'No' END AS primary_key,
+        CASE WHEN MAX(tc.CONSTRAINT_TYPE = 'FOREIGN KEY') = 1 THEN 'Yes' ELSE 'No' END AS foreign_key,
+        NULLIF(CONCAT_WS('; ',
+            CASE WHEN MAX(tc.CONSTRAINT_TYPE = 'UNIQUE') = 1 THEN 'UNIQUE' END,
+            CONCAT('REFERENCES ', GROUP_CONCAT(DISTINCT
+                CASE WHEN tc.CONSTRAINT_TYPE = 'FOREIGN KEY' THEN
+                     CONCAT(kcu.REFERENCED_TABLE_NAME, ' (', kcu.REFERENCED_COLUMN_NAME, ')')
+                END SEPARATOR ', ')),
+            {check_expressions}
+        ), '') AS constraints,
+        COALESCE(
+            NULLIF(c.COLUMN_COMMENT, ''),
+            CONCAT('Foreign key for ', MAX(CASE WHEN tc.CONSTRAINT_TYPE = 'FOREIGN KEY'
+                                                THEN kcu.REFERENCED_TABLE_NAME END)),
+            ''
+        ) AS description
+    FROM information_schema.COLUMNS c
+    LEFT JOIN information_schema.KEY_COLUMN_USAGE kcu
+           ON c.TABLE_SCHEMA = kcu.TABLE_SCHEMA
+          AND c.TABLE_NAME   = kcu.TABLE_NAME
+          AND c.COLUMN_NAME  = kcu.COLUMN_NAME
+    LEFT JOIN information_schema.TABLE_CONSTRAINTS tc
+           ON kcu.CONSTRAINT_NAME = tc.CONSTRAINT_NAME
+          AND tc.TABLE_SCHEMA     = kcu.TABLE_SCHEMA
+          AND tc.TABLE_NAME       = kcu.TABLE_NAME
+    WHERE c.TABLE_SCHEMA = %s
+    GROUP BY c.TABLE_SCHEMA, c.TABLE_NAME, c.COLUMN_NAME, c.ORDINAL_POSITION, c.DATA_TYPE,
+             c.CHARACTER_MAXIMUM_LENGTH, c.NUMERIC_PRECISION, c.IS_NULLABLE, c.COLUMN_DEFAULT,
+             c.COLUMN_COMMENT
+    ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION;
+"""
+
+# information_schema.CHECK_CONSTRAINTS only exists from MySQL 8.0.16 and MariaDB 10.2.22
+_CHECK_EXPRESSIONS = """(SELECT GROUP_CONCAT(DISTINCT cc.CHECK_CLAUSE SEPARATOR '; ')
+               FROM information_schema.TABLE_CONSTRAINTS ctc
+               JOIN information_schema.CHECK_CONSTRAINTS cc
+                 ON cc.CONSTRAINT_SCHEMA = ctc.CONSTRAINT_SCHEMA
+                AND cc.CONSTRAINT_NAME   = ctc.CONSTRAINT_NAME
+              WHERE ctc.TABLE_SCHEMA    = c.TABLE_SCHEMA
+                AND ctc.TABLE_NAME      = c.TABLE_NAME
+                AND ctc.CONSTRAINT_TYPE = 'CHECK'
+                AND cc.CHECK_CLAUSE LIKE CONCAT('%%`', c.COLUMN_NAME, '`%%'))"""
+
+AGGREGATED_METADATA_QUERY = _AGGREGATED_METADATA_TEMPLATE.format(check_expressions=_CHECK_EXPRESSIONS)
+AGGREGATED_METADATA_QUERY_WITHOUT_CHECKS = _AGGREGATED_METADATA_TEMPLATE.format(check_expressions="NULL")
+
+# Existing table comments, used as the table description of documented tables
+TABLE_COMMENTS_QUERY = """
+    SELECT TABLE_NAME, TABLE_COMMENT
+    FROM information_schema.TABLES
+    WHERE TABLE_SCHEMA = %s
+      AND TABLE_TYPE = 'BASE TABLE'
+      AND TABLE_COMMENT <> '';
+"""
+
+
+def supports_check_constraints(conn) -> bool:
+    """Returns whether the server has `information_schema.CHECK_CONSTRAINTS` (MySQL 8.0.16+, MariaDB 10.2.22+)."""
+    server_info = conn.get_server_info() or ""
+    # MariaDB reports e.g. "5.5.5-10.6.12-MariaDB" to stay compatible with old clients
+    match = re.search(r"(\d+)\.(\d+)\.(\d+)", server_info.replace("5.5.5-", "", 1))
+    if not match:
+        return False
+    minimum = (10, 2, 22) if "mariadb" in server_info.lower() else (8, 0, 16)
+    return tuple(int(part) for part in match.groups()) >= minimum
+
+
+def get_metadata_query(conn) -> str:
+    """
+    Returns the catalog query selected by `AGGREGATE_COLUMN_ROWS`. The aggregated query leaves
+    out check expressions on servers without `CHECK_CONSTRAINTS`.
+    """
+    if not Config.AGGREGATE_COLUMN_ROWS:
+        return METADATA_QUERY
+    if supports_check_constraints(conn):
+        return AGGREGATED_METADATA_QUERY
+    return AGGREGATED_METADATA_QUERY_WITHOUT_CHECKS
 
 
 class MySQLDB(BaseDB):
     """Handles MySQL metadata fetching."""
 
     def fetch_metadata(self, conn, schema_name: str) -> List[Tuple[Any, ...]]:
-        """Fetch metadata for all tables in the given schema."""
+        """Fetch metadata for all tables in the given schema. The caller owns `conn`."""
         try:
             with conn.cursor() as cursor:
-                query = """
-                SELECT 
-                    c.TABLE_NAME AS table_name,  
-                    c.COLUMN_NAME AS column_name,  
-                    c.DATA_TYPE AS data_type,  
-                    COALESCE(c.CHARACTER_MAXIMUM_LENGTH, c.NUMERIC_PRECISION) AS length,  
-                    c.IS_NULLABLE AS is_nullable,  
-                    c.COLUMN_DEFAULT AS column_default,  
-                    CASE WHEN tc.CONSTRAINT_TYPE = 'PRIMARY KEY' THEN 'Yes' ELSE 'No' END AS primary_key,  
-                    CASE WHEN tc.CONSTRAINT_TYPE = 'FOREIGN KEY' THEN 'Yes' ELSE 'No' END AS foreign_key,  
-                    '' AS constraints,  
-                    CASE 
-                        WHEN tc.CONSTRAINT_TYPE = 'FOREIGN KEY' THEN 
-                             CONCAT('Foreign key for ', kcu.REFERENCED_TABLE_NAME)  
-                        ELSE 
-                             ''
-                    END AS description
-                FROM information_schema.COLUMNS c
-                LEFT JOIN information_schema.KEY_COLUMN_USAGE kcu
-                       ON c.TABLE_SCHEMA = kcu.TABLE_SCHEMA
-                      AND c.TABLE_NAME   = kcu.TABLE_NAME
-                      AND c.COLUMN_NAME  = kcu.COLUMN_NAME
-                LEFT JOIN information_schema.TABLE_CONSTRAINTS tc
-                       ON kcu.CONSTRAINT_NAME = tc.CONSTRAINT_NAME
-                      AND tc.TABLE_SCHEMA     = c.TABLE_SCHEMA
-                WHERE c.TABLE_SCHEMA = %s
-                ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION;
-                """
-
-                cursor.execute(query, (schema_name,))
+                cursor.execute(get_metadata_query(conn), (schema_name,))
                 rows = cursor.fetchall()
 
             return rows
@@ -49,6 +146,40 @@ class MySQLDB(BaseDB):
                 f"Error fetching metadata for schema {schema_name}: {err}", exc_info=True)
             return []
 
-        finally:
-            if conn:
-                conn.close()
+    def stream_metadata(self, conn, schema_name: str) -> Iterator[Tuple[str, List[Tuple[Any, ...]]]]:
+        """
+        Streams metadata through an unbuffered cursor, yielding one table's rows at a time.
+
+        Rows are read from the server in batches of `METADATA_FETCH_SIZE`, so memory stays flat
+        regardless of catalog size.
+        """
+        try:
+            with conn.cursor(buffered=False) as cursor:
+                cursor.execute(get_metadata_query(conn), (schema_name,))
+                yield from self.group_rows_by_table(self._iter_rows(cursor))
+
+        except Exception as err:
+            logger.error(
+                f"Error streaming metadata for schema {schema_name}: {err}", exc_info=True)
+            raise
+
+    def fetch_table_comments(self, conn, schema_name: str) -> Dict[str, str]:
+        """Fetch the TABLE_COMMENT of the tables in the given schema."""
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(TABLE_COMMENTS_QUERY, (schema_name,))
+                return dict(cursor.fetchall())
+
+        except Exception as err:
+            logger.error(
+                f"Error fetching table comments for schema {schema_name}: {err}", exc_info=True)
+            return {}
+
+    @staticmethod
+    def _iter_rows(cursor) -> Iterator[Tuple[Any, ...]]:
+        """Yields rows from an unbuffered cursor, one `fetchmany` batch at a time."""
+        while True:
+            rows = cursor.fetchmany(Config.METADATA_FETCH_SIZE)
+            if not rows:
+                return
+            yield from rows
@@ -1,52 +1,237 @@
 from app.common_utils.loggers import logger
 from app.database.base_db import BaseDB
-from typing import List, Tuple, Any
+from typing import Any, Dict, Iterator, List, Tuple
+from app.config.config import Config
+
+# Ordered by table so rows can be streamed and grouped one table at a time
+METADATA_QUERY = """
+    SELECT 
+        c.table_name,  
+        c.column_name,  
+        c.data_type,  
+        COALESCE(c.character_maximum_length, c.numeric_precision) AS length,  
+        c.is_nullable,  
+        c.column_default,  
+        CASE WHEN tc.constraint_type = 'PRIMARY KEY' THEN 'Yes' ELSE 'No' END AS primary_key,  
+        CASE WHEN tc.constraint_type = 'FOREIGN KEY' THEN 'Yes' ELSE 'No' END AS foreign_key,  
+        pg_get_expr(pgc.conbin, pgc.conrelid) AS constraints,  
+        COALESCE(
+            NULLIF(col_description(
+                (quote_ident(c.table_schema) || '.' || quote_ident(c.table_name))::regclass,
+                c.ordinal_position), ''),
+            CASE 
+                WHEN tc.constraint_type = 'FOREIGN KEY' THEN 
+                     'Foreign key for ' || pgc.confrelid::regclass::text  
+                ELSE 
+                     ''
+            END
+        ) AS description
+    FROM information_schema.columns c
+    LEFT JOIN information_schema.key_column_usage kcu
+           ON c.table_schema = kcu.table_schema
+          AND c.table_name   = kcu.table_name
+          AND c.column_name  = kcu.column_name
+    LEFT JOIN information_schema.table_constraints tc
+           ON kcu.constraint_name = tc.constraint_name
+          AND tc.table_schema     = c.table_schema
+    LEFT JOIN pg_constraint pgc
+           ON tc.constraint_name  = pgc.conname
+          AND pgc.connamespace    = (
+                SELECT oid 
+                  FROM pg_namespace 
+                 WHERE nspname = c.table_schema
+              )
+    WHERE c.table_schema = %s
+    ORDER BY c.table_name, c.ordinal_position;
+"""
+
+# Same row shape as METADATA_QUERY, built directly on pg_catalog. It avoids the slow
+# information_schema views and picks up existing column comments from pg_description.
+PG_CATALOG_METADATA_QUERY = """
+    SELECT
+        c.relname AS table_name,
+        a.attname AS column_name,
+        format_type(a.atttypid, NULL) AS data_type,
+        CASE
+            WHEN a.atttypid IN ('bpchar'::regtype, 'varchar'::regtype) AND a.atttypmod > 0
+                THEN a.atttypmod - 4
+            WHEN a.atttypid = 'numeric'::regtype AND a.atttypmod > 0
+                THEN ((a.atttypmod - 4) >> 16) & 65535
+            WHEN a.atttypid = 'int2'::regtype THEN 16
+            WHEN a.atttypid = 'int4'::regtype THEN 32
+            WHEN a.atttypid = 'int8'::regtype THEN 64
+            WHEN a.atttypid = 'float4'::regtype THEN 24
+            WHEN a.atttypid = 'float8'::regtype THEN 53
+        END AS length,
+        CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END AS is_nullable,
+        pg_get_expr(ad.adbin, ad.adrelid) AS column_default,
+        CASE WHEN con.contype = 'p' THEN 'Yes' ELSE 'No' END AS primary_key,
+        CASE WHEN con.contype = 'f' THEN 'Yes' ELSE 'No' END AS foreign_key,
+        pg_get_expr(con.conbin, con.conrelid) AS constraints,
+        COALESCE(
+            NULLIF(d.description, ''),
+            CASE
+                WHEN con.contype = 'f' THEN
+                     'Foreign key for ' || con.confrelid::regclass::text
+                ELSE
+                     ''
+            END
+        ) AS description
+    FROM pg_class c
+    JOIN pg_namespace n
+      ON n.oid = c.relnamespace
+    JOIN pg_attribute a
+      ON a.attrelid = c.oid
+     AND a.attnum > 0
+     AND NOT a.attisdropped
+    LEFT JOIN pg_attrdef ad
+           ON ad.adrelid = a.attrelid
+          AND ad.adnum   = a.attnum
+    LEFT JOIN pg_constraint con
+           ON con.conrelid = c.oid
+          AND a.attnum = ANY (con.conkey)
+          AND con.contype IN ('p', 'f', 'u', 'c')
+    LEFT JOIN pg_description d
+           ON d.objoid   = c.oid
+          AND d.classoid = 'pg_class'::regclass
+          AND d.objsubid = a.attnum
+    WHERE n.nspname = %s
+      AND c.relkind IN ('r', 'p', 'v', 'f')
+    ORDER BY c.relname, a.attnum;
+"""
+
+# Every key and check constraint on one column, folded into a single row: PK/FK/unique flags,
+# the referenced table and column of each foreign key and all check expressions. Joined
+# LATERAL by the aggregated queries below, so a column in several constraints stays one row.
+_COLUMN_CONSTRAINTS = """
+    SELECT
+        bool_or(con.contype = 'p') AS is_primary,
+        bool_or(con.contype = 'u') AS is_unique,
+        min(con.confrelid::regclass::text) FILTER (WHERE con.contype = 'f') AS foreign_table,
+        string_agg(DISTINCT con.confrelid::regclass::text || ' (' || fa.attname || ')', ', ')
+            FILTER (WHERE con.contype = 'f') AS foreign_target,
+        string_agg(DISTINCT pg_get_expr(con.conbin, con.conrelid), '; ')
+            FILTER (WHERE con.contype = 'c') AS checks
+    FROM pg_constraint con
+    LEFT JOIN pg_attribute fa
+           ON con.contype = 'f'
+          AND fa.attrelid = con.confrelid
+          AND fa.attnum   = con.confkey[array_position(con.conkey, {attnum})]
+    WHERE con.conrelid = {relid}
+      AND {attnum} = ANY (con.conkey)
+      AND con.contype IN ('p', 'f', 'u', 'c')
+"""
+
+# Folded flags and expressions in the row shape of METADATA_QUERY: the unique flag, foreign
+# key targets and check expressions share the constraints column, e.g.
+# "UNIQUE; REFERENCES sales.customer (id); (amount >= 0)".
+_FOLDED_COLUMNS = """
+        CASE WHEN k.is_primary THEN 'Yes' ELSE 'No' END AS primary_key,
+        CASE WHEN k.foreign_target IS NOT NULL THEN 'Yes' ELSE 'No' END AS foreign_key,
+        NULLIF(concat_ws('; ',
+            CASE WHEN k.is_unique THEN 'UNIQUE' END,
+            'REFERENCES ' || k.foreign_target,
+            k.checks), '') AS constraints,"""
+
+# One row per column. METADATA_QUERY and PG_CATALOG_METADATA_QUERY return a row per
+# (column, constraint) pair, so a column in a primary and a foreign key comes back twice.
+AGGREGATED_METADATA_QUERY = f"""
+    SELECT
+        c.table_name,
+        c.column_name,
+        c.data_type,
+        COALESCE(c.character_maximum_length, c.numeric_precision) AS length,
+        c.is_nullable,
+        c.column_default,{_FOLDED_COLUMNS}
+        COALESCE(
+            NULLIF(col_description(rel.oid, c.ordinal_position), ''),
+            'Foreign key for ' || k.foreign_table,
+            ''
+        ) AS description
+    FROM information_schema.columns c
+    CROSS JOIN LATERAL (
+        SELECT (quote_ident(c.table_schema) || '.' || quote_ident(c.table_name))::regclass::oid AS oid
+    ) rel
+    LEFT JOIN LATERAL ({_COLUMN_CONSTRAINTS.format(relid="rel.oid", attnum="c.ordinal_position::int2")}) k ON true
+    WHERE c.table_schema = %s
+    ORDER BY c.table_name, c.ordinal_position;
+"""
+
+PG_CATALOG_AGGREGATED_METADATA_QUERY = f"""
+    SELECT
+        c.relname AS table_name,
+        a.attname AS column_name,
+        format_type(a.atttypid, NULL) AS data_type,
+        CASE
+            WHEN a.atttypid IN ('bpchar'::regtype, 'varchar'::regtype) AND a.atttypmod > 0
+                THEN a.atttypmod - 4
+            WHEN a.atttypid = 'numeric'::regtype AND a.atttypmod > 0
+                THEN ((a.atttypmod - 4) >> 16) & 65535
+            WHEN a.atttypid = 'int2'::regtype THEN 16
+            WHEN a.atttypid = 'int4'::regtype THEN 32
+            WHEN a.atttypid = 'int8'::regtype THEN 64
+            WHEN a.atttypid = 'float4'::regtype THEN 24
+            WHEN a.atttypid = 'float8'::regtype THEN 53
+        END AS length,
+        CASE WHEN a.attnotnull THEN 'NO' ELSE 'YES' END AS is_nullable,
+        pg_get_expr(ad.adbin, ad.adrelid) AS column_default,{_FOLDED_COLUMNS}
+        COALESCE(
+            NULLIF(d.description, ''),
+            'Foreign key for ' || k.foreign_table,
+            ''
+        ) AS description
+    FROM pg_class c
+    JOIN pg_namespace n
+      ON n.oid = c.relnamespace
+    JOIN pg_attribute a
+      ON a.attrelid = c.oid
+     AND a.attnum > 0
+     AND NOT a.attisdropped
+    LEFT JOIN pg_attrdef ad
+           ON ad.adrelid = a.attrelid
+          AND ad.adnum   = a.attnum
+    LEFT JOIN LATERAL ({_COLUMN_CONSTRAINTS.format(relid="c.oid", attnum="a.attnum")}) k ON true
+    LEFT JOIN pg_description d
+           ON d.objoid   = c.oid
+          AND d.classoid = 'pg_class'::regclass
+          AND d.objsubid = a.attnum
+    WHERE n.nspname = %s
+      AND c.relkind IN ('r', 'p', 'v', 'f')
+    ORDER BY c.relname, a.attnum;
+"""
+
+# Existing table comments, used as the table description of documented tables
+TABLE_COMMENTS_QUERY = """
+    SELECT c.relname, d.description
+    FROM pg_class c
+    JOIN pg_namespace n
+      ON n.oid = c.relnamespace
+    JOIN pg_description d
+      ON d.objoid   = c.oid
+     AND d.classoid = 'pg_class'::regclass
+     AND d.objsubid = 0
+    WHERE n.nspname = %s
+      AND c.relkind IN ('r', 'p', 'v', 'f')
+      AND d.description <> '';
+"""
+
+
+def get_metadata_query() -> str:
+    """Returns the catalog query selected by `POSTGRES_METADATA_SOURCE` and `AGGREGATE_COLUMN_ROWS`."""
+    if Config.POSTGRES_METADATA_SOURCE == "pg_catalog":
+        return PG_CATALOG_AGGREGATED_METADATA_QUERY if Config.AGGREGATE_COLUMN_ROWS else PG_CATALOG_METADATA_QUERY
+    return AGGREGATED_METADATA_QUERY if Config.AGGREGATE_COLUMN_ROWS else METADATA_QUERY
 
 
 class PostgresDB(BaseDB):
     """Handles PostgreSQL metadata fetching."""
 
     def fetch_metadata(self, conn, schema_name: str) -> List[Tuple[Any, ...]]:
+        """Fetch metadata for all tables in the given schema. The caller owns `conn`."""
         try:
             with conn.cursor() as cursor:
-                query = """
-                SELECT 
-                    c.table_name,  
-                    c.column_name,  
-                    c.data_type,  
-                    COALESCE(c.character_maximum_length, c.numeric_precision) AS length,  
-                    c.is_nullable,  
-                    c.column_default,  
-                    CASE WHEN tc.constraint_type = 'PRIMARY KEY' THEN 'Yes' ELSE 'No' END AS primary_key,  
-                    CASE WHEN tc.constraint_type = 'FOREIGN KEY' THEN 'Yes' ELSE 'No' END AS foreign_key,  
-                    pg_get_expr(pgc.conbin, pgc.conrelid) AS constraints,  
-                    CASE 
-                        WHEN tc.constraint_type = 'FOREIGN KEY' THEN 
-                             'Foreign key for ' || pgc.confrelid::regclass::text  
-                        ELSE 
-                             ''
-                    END AS description
-                FROM information_schema.columns c
-                LEFT JOIN information_schema.key_column_usage kcu
-                       ON c.table_schema = kcu.table_schema
-                      AND c.table_name   = kcu.table_name
-                      AND c.column_name  = kcu.column_name
-                LEFT JOIN information_schema.table_constraints tc
-                       ON kcu.constraint_name = tc.constraint_name
-                      AND tc.table_schema     = c.table_schema
-                LEFT JOIN pg_constraint pgc
-                       ON tc.constraint_name  = pgc.conname
-                      AND pgc.connamespace    = (
-                            SELECT oid 
-                              FROM pg_namespace 
-                             WHERE nspname = c.table_schema
-                          )
-                WHERE c.table_schema = %s
-                ORDER BY c.ordinal_position;
-                """
-
                 # Corrected: Ensure schema_name is passed as a tuple
-                cursor.execute(query, (schema_name,))
+                cursor.execute(get_metadata_query(), (schema_name,))
 
                 rows = cursor.fetchall()
 
@@ -57,6 +242,32 @@ class PostgresDB(BaseDB):
                 f"Error fetching metadata for {schema_name}: {err}", exc_info=True)
             return []
 
-        finally:
-            if conn:
-                conn.close()
+    def stream_metadata(self, conn, schema_name: str) -> Iterator[Tuple[str, List[Tuple[Any, ...]]]]:
+        """
+        Streams metadata through a server-side (named) cursor, yielding one table's rows at a time.
+
+        Only `METADATA_FETCH_SIZE` rows are held client-side per round trip, so memory stays flat
+        regardless of catalog size.
+        """
+        try:
+            with conn.cursor(name="metadata_stream") as cursor:
+                cursor.itersize = Config.METADATA_FETCH_SIZE
+                cursor.execute(get_metadata_query(), (schema_name,))
+                yield from self.group_rows_by_table(cursor)
+
+        except Exception as err:
+            logger.error(
+                f"Error streaming metadata for {schema_name}: {err}", exc_info=True)
+            raise
+
+    def fetch_table_comments(self, conn, schema_name: str) -> Dict[str, str]:
+        """Fetch the comments of the tables in the given schema from pg_description."""
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(TABLE_COMMENTS_QUERY, (schema_name,))
+                return dict(cursor.fetchall())
+
+        except Exception as err:
+            logger.error(
+                f"Error fetching table comments for {schema_name}: {err}", exc_info=True)
+            return {}
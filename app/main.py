@@ -1,123 +1,368 @@
-import json
+import argparse
+import multiprocessing
 import os
-import pandas as pd
-import re
-from app.config.db_config import get_db_connection
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Iterable, List, Tuple
+from app.config.db_config import ConnectionManager, DBTarget, get_db_targets
 from app.config.config import Config
-from app.src.generate_data_dictionary import generate_data_dictionary
-from app.src.metadata_extractor import extract_table_metadata
+from app.src.generate_data_dictionary import (
+    generate_data_dictionaries, close_description_cache, extract_table_dictionary,
+    get_column_reuse_index, log_column_reuse_stats)
+from app.src.schema_diff import load_snapshot, SnapshotWriter
+from app.src.checkpoint import CheckpointJournal, load_checkpoint
+from app.src.work_queue import WorkQueue
+from app.src.queue_worker import run_local_worker, run_worker
+from app.service import serve
+from app.output.sink_factory import get_output_sinks
+from app.src.metadata_extractor import (
+    extract_table_comments, extract_table_metadata, stream_table_metadata)
+from app.src.prompt_encoding import log_encoding_stats
+from app.common_utils.llm_scheduler import get_scheduler_stats, log_scheduler_stats
+from app.common_utils.llm_tiers import get_tier_stats, log_tier_stats
+from app.common_utils.run_metrics import run_metrics, write_run_report
 from app.common_utils.loggers import logger
 
 
-def generate_data_dictionary_file(conn, schema_name: str) -> None:
-    """Generates an Excel file containing the data dictionary."""
+def generate_data_dictionary_file(conn, schema_name: str, dbms: str = None, output_dir: str = None) -> None:
+    """Generates the data dictionary in every format listed in `OUTPUT_FORMATS` (Excel by default)."""
     try:
-        output_dir = os.path.join(os.getcwd(), "output")
+        dbms = dbms or Config.DBMS
+        output_dir = output_dir or os.path.join(os.getcwd(), "output")
         os.makedirs(output_dir, exist_ok=True)
-        output_file = os.path.join(
-            output_dir, f"{schema_name}_data_dictionary_({Config.DBMS}).xlsx")
-
-        metadata_by_table = extract_table_metadata(conn, schema_name)
-
-        with pd.ExcelWriter(output_file, engine="xlsxwriter") as writer:
-            for table, metadata in metadata_by_table.items():
-                try:
-                    logger.info(f"Processing table: {table}...")
-
-                    result = generate_data_dictionary(table, metadata)
-
-                    if not result:
-                        logger.error(
-                            f"Skipping {table} due to empty response.")
-                        continue
-
-                    if isinstance(result, str):
-                        cleaned_result = re.sub(
-                            r'```json|```|"Raw Result: ', '', result).strip()
-                        structured_data = json.loads(cleaned_result)
-                    elif isinstance(result, dict):
-                        structured_data = result
-                    else:
-                        logger.error(
-                            f"Unexpected response type: {type(result)}")
-                        continue
-
-                    tables_data = structured_data.get('text', {})
-
-                    if not tables_data:
-                        logger.warning(
-                            f"No valid table metadata found in LLM response for table {table}")
-                        continue
-
-                    df = pd.json_normalize(tables_data, "columns", [
-                                           "table_name", "table_description"])
-
-                    if df.empty:
-                        logger.warning(f"Skipping empty table: {table}")
-                        continue
-
-                    df.rename(columns={
-                        "column_name": "Field Name",
-                        "datatype": "Data Type",
-                        "length": "Length",
-                        "is_null": "Allow Null?",
-                        "foreign_key": "Foreign Key?",
-                        "primary_key": "Primary Key?",
-                        "default": "Default",
-                        "description": "Description",
-                        "constraints": "Valid Values/Constraints"
-                    }, inplace=True)
-
-                    df.drop(columns=["table"], inplace=True, errors='ignore')
-                    # Fill empty constraint values
-                    df["Valid Values/Constraints"] = df["Valid Values/Constraints"].fillna(
-                        "")
-
-                    # Define expected columns
-                    expected_columns = [
-                        "Field Name", "Data Type", "Length", "Allow Null?", "Foreign Key?",
-                        "Primary Key?", "Default", "Description", "Valid Values/Constraints"
-                    ]
-
-                    # Add extra columns dynamically
-                    if Config.ADD_EXTRA_COLUMNS and Config.EXTRA_COLUMNS:
-                        for col_name, col_value in Config.EXTRA_COLUMNS.items():
-                            df[col_name] = col_value
-                        expected_columns.extend(Config.EXTRA_COLUMNS.keys())
-
-                    df = df[expected_columns]
-
-                    # Truncate sheet name to 31 characters
-                    sheet_name = table[:31]
-
-                    # Get worksheet reference and add table metadata
-                    df.to_excel(writer, sheet_name=sheet_name, startrow=2, index=False)
-                    worksheet = writer.sheets[sheet_name]
-                    table_description = tables_data.get(
-                        'table_description', '')
-                    worksheet.write(0, 0, f"Table Name: {table}")
-                    worksheet.write(1, 0, f"Description: {table_description}")
-                except Exception as table_err:
+        snapshot_file = os.path.join(
+            output_dir, f"{schema_name}_metadata_snapshot_({dbms}).json")
+        checkpoint_file = os.path.join(
+            output_dir, f"{schema_name}_checkpoint_({dbms}).jsonl")
+
+        table_comments = extract_table_comments(
+            conn, schema_name, dbms) if Config.SKIP_DOCUMENTED_COLUMNS else None
+
+        if Config.STREAM_METADATA:
+            metadata_by_table = stream_table_metadata(conn, schema_name, dbms)
+        else:
+            metadata_by_table = extract_table_metadata(conn, schema_name, dbms)
+
+        previous_snapshot = load_snapshot(
+            snapshot_file) if Config.INCREMENTAL_MODE else None
+        checkpoint = load_checkpoint(
+            checkpoint_file) if Config.CHECKPOINT_ENABLED and Config.RESUME else {}
+        if checkpoint:
+            # Finished tables are reassembled from the journal like unchanged tables of an incremental run
+            previous_snapshot = {**(previous_snapshot or {}), **checkpoint}
+
+        with ExitStack() as stack:
+            # Entered first so the journal is only removed after every output is finalized
+            journal = stack.enter_context(CheckpointJournal(
+                checkpoint_file, resume=bool(checkpoint))) if Config.CHECKPOINT_ENABLED else None
+            write_data_dictionary_outputs(
+                generate_data_dictionaries(metadata_by_table, previous_snapshot=previous_snapshot,
+                                           table_comments=table_comments),
+                schema_name, dbms, output_dir, journal)
+
+    except Exception as err:
+        logger.exception(
+            f"Critical error in generating data dictionary: {err}")
+
+
+def write_data_dictionary_outputs(results: Iterable[Tuple[str, list, dict | None]], schema_name: str,
+                                  dbms: str, output_dir: str, journal: CheckpointJournal | None = None) -> None:
+    """
+    Writes generated table dictionaries to every output format and the metadata snapshot.
+
+    Args:
+        results (Iterable[Tuple[str, list, dict | None]]): `(table, metadata, llm_output)` in output
+            order, as yielded by `generate_data_dictionaries`.
+        schema_name (str): Name of the documented schema.
+        dbms (str): 'postgres' or 'mysql'.
+        output_dir (str): Directory of the output files.
+        journal (CheckpointJournal | None): Journal that validated tables are recorded in.
+    """
+    snapshot_file = os.path.join(
+        output_dir, f"{schema_name}_metadata_snapshot_({dbms}).json")
+    with ExitStack() as stack:
+        sinks = [stack.enter_context(sink)
+                 for sink in get_output_sinks(output_dir, schema_name, dbms)]
+        snapshot_writer = stack.enter_context(SnapshotWriter(snapshot_file))
+        for table, metadata, result in results:
+            try:
+                logger.info(f"Processing table: {table}...")
+
+                if not result:
                     logger.error(
-                        f"Error processing table {table}: {table_err}", exc_info=True)
+                        f"Skipping {table} due to empty response.")
+                    if journal:
+                        journal.mark_failed(table)
                     continue
 
-        logger.info(f"Data dictionary saved to {output_file}")
+                with run_metrics.span("parse_response"):
+                    tables_data = extract_table_dictionary(result)
+
+                if not tables_data:
+                    logger.warning(
+                        f"No valid table metadata found in LLM response for table {table}")
+                    if journal:
+                        journal.mark_failed(table)
+                    continue
+
+                if journal:
+                    journal.record(table, metadata, tables_data)
+                written = []
+                for sink in sinks:
+                    with run_metrics.span(f"write_{type(sink).__name__}"):
+                        written.append(sink.write_table(table, tables_data))
+                if any(written):
+                    run_metrics.increment("tables_written")
+                    snapshot_writer.add(table, metadata, tables_data)
+            except Exception as table_err:
+                logger.error(
+                    f"Error processing table {table}: {table_err}", exc_info=True)
+                if journal:
+                    journal.mark_failed(table)
+                continue
+
+
+def coordinate_data_dictionary_file(conn, schema_name: str, dbms: str = None, output_dir: str = None) -> None:
+    """
+    Generates the data dictionary of a schema in coordinator mode.
+
+    Extracts the metadata, enqueues one job per table into the shared work queue and starts
+    `WORK_QUEUE_LOCAL_WORKERS` worker processes; further workers can join with `--worker` from
+    other shells or hosts. Once every table is done or failed, the outputs are assembled from the
+    queue in table order. The queue is removed when every table was documented; otherwise it is
+    kept, and rerunning with `--resume` only requeues the failed and changed tables.
+    """
+    try:
+        dbms = dbms or Config.DBMS
+        output_dir = output_dir or os.path.join(os.getcwd(), "output")
+        os.makedirs(output_dir, exist_ok=True)
+        snapshot_file = os.path.join(
+            output_dir, f"{schema_name}_metadata_snapshot_({dbms}).json")
+        queue_path = Config.WORK_QUEUE_PATH or os.path.join(
+            output_dir, f"{schema_name}_queue_({dbms}).sqlite")
+
+        if not Config.RESUME and os.path.exists(queue_path):
+            WorkQueue.from_config(queue_path).remove()
+        queue = WorkQueue.from_config(queue_path)
+
+        table_comments = extract_table_comments(
+            conn, schema_name, dbms) if Config.SKIP_DOCUMENTED_COLUMNS else None
+
+        if Config.STREAM_METADATA:
+            metadata_by_table = stream_table_metadata(conn, schema_name, dbms)
+        else:
+            metadata_by_table = extract_table_metadata(conn, schema_name, dbms)
+        items = metadata_by_table.items() if isinstance(metadata_by_table, dict) else metadata_by_table
+
+        previous_snapshot = load_snapshot(
+            snapshot_file) if Config.INCREMENTAL_MODE else {}
+
+        # Started before enqueueing so they claim the first tables while the catalog is still read
+        context = multiprocessing.get_context("spawn")
+        overrides = worker_config_overrides()
+        workers = [context.Process(target=run_local_worker,
+                                   args=(queue_path, f"{socket.gethostname()}-local-{index}", overrides))
+                   for index in range(Config.WORK_QUEUE_LOCAL_WORKERS)]
+        for worker in workers:
+            worker.start()
+        logger.info(f"Coordinating {schema_name} through work queue {queue_path} "
+                    f"with {len(workers)} local worker(s)")
+        if not workers:
+            logger.warning(f"No local workers started; run `python -m app.main --worker --queue "
+                           f"\"{queue_path}\"` to process the queue")
+
+        try:
+            queue.enqueue(((table, rows, previous_snapshot.get(table)) for table, rows in items),
+                          {"table_comments": table_comments or {}, "domain_name": Config.DOMAIN_NAME})
+            wait_for_work_queue(queue, workers)
+        except BaseException:
+            for worker in workers:
+                worker.terminate()
+            raise
+        finally:
+            for worker in workers:
+                worker.join()
+
+        write_data_dictionary_outputs(queue.results(), schema_name, dbms, output_dir)
+        failed = queue.counts().get("failed", 0)
+        if failed:
+            queue.close()
+            logger.warning(f"{failed} tables failed; work queue {queue_path} kept, rerun the "
+                           f"coordinator with --resume to only requeue them")
+        else:
+            queue.remove()
 
     except Exception as err:
         logger.exception(
-            f"Critical error in generating data dictionary: {err}")
+            f"Critical error in coordinating data dictionary: {err}")
 
 
-if __name__ == "__main__":
+def worker_config_overrides() -> dict:
+    """
+    Returns the settings local workers must share with the coordinator.
+
+    Spawned workers read `Config` from the environment again, so settings changed on the command
+    line (`--no-cache`, `--incremental`, `--reuse-columns`) are handed over explicitly.
+    """
+    return {key: getattr(Config, key) for key in WORKER_CONFIG_KEYS}
+
+
+def wait_for_work_queue(queue: WorkQueue, workers: List[multiprocessing.Process]) -> None:
+    """
+    Blocks until every queued table is done or failed, logging progress every minute.
+
+    Raises:
+        TimeoutError: If no worker claimed a table within `WORK_QUEUE_IDLE_TIMEOUT` seconds.
+    """
+    started = time.monotonic()
+    last_report = started - 60
+    local_workers_exited = False
+    claimed = False
+    while not queue.is_finished():
+        if not claimed:
+            counts = queue.counts()
+            claimed = any(counts.get(status) for status in ("leased", "done", "failed"))
+            if not claimed and time.monotonic() - started > Config.WORK_QUEUE_IDLE_TIMEOUT:
+                raise TimeoutError(f"No worker claimed a table of work queue {queue.path} within "
+                                   f"{Config.WORK_QUEUE_IDLE_TIMEOUT:.0f}s")
+        if time.monotonic() - last_report >= 60:
+            counts = queue.counts()
+            logger.info(f"Work queue progress: {counts.get('done', 0)}/{sum(counts.values())} done, "
+                        f"{counts.get('leased', 0)} in progress, {counts.get('failed', 0)} failed")
+            last_report = time.monotonic()
+        if workers and not local_workers_exited and not any(worker.is_alive() for worker in workers):
+            local_workers_exited = True
+            logger.warning("Every local worker exited before the queue was finished; "
+                           "waiting for workers started with --worker")
+        time.sleep(Config.WORK_QUEUE_POLL_SECONDS)
+
+
+# Settings handed to the local worker processes, see `worker_config_overrides`
+WORKER_CONFIG_KEYS = ("CACHE_ENABLED", "INCREMENTAL_MODE", "COLUMN_REUSE_ENABLED", "COLUMN_REUSE_SIMILARITY",
+                      "WORK_QUEUE_CLAIM_SIZE", "WORK_QUEUE_LEASE_SECONDS", "WORK_QUEUE_MAX_ATTEMPTS",
+                      "WORK_QUEUE_POLL_SECONDS", "WORK_QUEUE_WAL")
+
+
+def generate_schema_dictionary(manager: ConnectionManager, schema_name: str, output_dir: str) -> None:
+    """Documents one schema on a connection borrowed from the target's pool."""
     try:
-        logger.info("Starting data dictionary generation process.")
-        conn = get_db_connection()
+        with run_metrics.table_namespace(f"{manager.target.name}.{schema_name}"), \
+                manager.connection() as conn:
+            if Config.WORK_QUEUE_MODE == "coordinator":
+                coordinate_data_dictionary_file(
+                    conn, schema_name, manager.target.dbms, output_dir)
+            else:
+                generate_data_dictionary_file(
+                    conn, schema_name, manager.target.dbms, output_dir)
+    except Exception as err:
+        logger.exception(
+            f"Failed to document schema {schema_name} of {manager.target}: {err}")
+
+
+def generate_data_dictionaries_for_targets(targets: List[DBTarget]) -> None:
+    """
+    Documents every schema of every target, `SCHEMA_CONCURRENCY` schemas at a time.
+
+    Each target gets one connection pool shared by its schemas. With several targets, each
+    one writes to its own `output/<host>_<database>` directory so file names cannot collide.
+    """
+    jobs = [(target, schema) for target in targets for schema in target.schemas]
+    if not jobs:
+        logger.error("No schemas to document. Set SCHEMA_NAME, SCHEMA_NAMES or DB_TARGETS.")
+        return
+    if Config.WORK_QUEUE_MODE == "coordinator" and Config.WORK_QUEUE_PATH and len(jobs) > 1:
+        # Every schema needs its own queue; the default path includes the schema and target
+        logger.error("WORK_QUEUE_PATH (--queue) can only be set when coordinating a single schema; "
+                     "leave it empty to use one queue per schema in the output directory.")
+        return
+
+    output_root = os.path.join(os.getcwd(), "output")
+    workers = min(Config.SCHEMA_CONCURRENCY, len(jobs))
+    managers = {id(target): ConnectionManager(target, min(workers, len(target.schemas)))
+                for target in targets}
+    logger.info(f"Documenting {len(jobs)} schema(s) across {len(targets)} database(s) "
+                f"with {workers} worker(s)")
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="schema") as executor:
+            futures = [
+                executor.submit(
+                    generate_schema_dictionary, managers[id(target)], schema,
+                    os.path.join(output_root, target.name) if len(targets) > 1 else output_root)
+                for target, schema in jobs]
+            for future in futures:
+                future.result()
+    finally:
+        for manager in managers.values():
+            manager.close_all()
 
-        if conn is None:
-            logger.error("Failed to establish database connection. Exiting.")
+
+def parse_args() -> argparse.Namespace:
+    """Parses command line options."""
+    parser = argparse.ArgumentParser(
+        description="Generate a data dictionary for a database schema.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the description cache and send every table to the LLM.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only describe columns changed since the previous run's metadata snapshot.")
+    parser.add_argument("--reuse-columns", action="store_true",
+                        help="Describe recurring column signatures once and reuse the description across tables.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run, skipping the tables in its checkpoint journal.")
+    parser.add_argument("--coordinator", action="store_true",
+                        help="Enqueue the tables into a shared work queue for workers and assemble the outputs.")
+    parser.add_argument("--worker", action="store_true",
+                        help="Document tables claimed from the work queue of a coordinator.")
+    parser.add_argument("--queue", help="Path of the work queue file shared by the coordinator and its workers.")
+    parser.add_argument("--local-workers", type=int,
+                        help="Number of worker processes the coordinator starts itself.")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run the HTTP lookup service that generates table dictionaries on demand.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.no_cache:
+        Config.CACHE_ENABLED = False
+    if args.incremental:
+        Config.INCREMENTAL_MODE = True
+    if args.reuse_columns:
+        Config.COLUMN_REUSE_ENABLED = True
+    if args.resume:
+        Config.RESUME = True
+    if args.coordinator:
+        Config.WORK_QUEUE_MODE = "coordinator"
+    if args.worker:
+        Config.WORK_QUEUE_MODE = "worker"
+    if args.queue:
+        Config.WORK_QUEUE_PATH = args.queue
+    if args.local_workers is not None:
+        Config.WORK_QUEUE_LOCAL_WORKERS = args.local_workers
+
+    try:
+        if Config.WORK_QUEUE_MODE == "worker":
+            if not Config.WORK_QUEUE_PATH:
+                raise ValueError("A worker needs the coordinator's queue: set --queue or WORK_QUEUE_PATH.")
+            run_worker(Config.WORK_QUEUE_PATH)
+        elif args.serve:
+            serve()
         else:
-            generate_data_dictionary_file(conn, Config.SCHEMA_NAME)
+            logger.info("Starting data dictionary generation process.")
+            generate_data_dictionaries_for_targets(get_db_targets())
 
     except Exception as e:
         logger.exception(f"Unexpected error: {e}")
+    finally:
+        close_description_cache()
+        log_scheduler_stats()
+        log_tier_stats()
+        log_encoding_stats()
+        log_column_reuse_stats()
+        reuse_index = get_column_reuse_index()
+        write_run_report(Config.RUN_REPORT_PATH, Config.PROMETHEUS_TEXTFILE_PATH, {
+            "llm_schedulers": get_scheduler_stats(),
+            "llm_tiers": get_tier_stats(),
+            "column_reuse": reuse_index.stats() if reuse_index else {}})
@@ -0,0 +1,93 @@
+from abc import ABC, abstractmethod
+from app.config.config import Config
+from app.common_utils.run_metrics import run_metrics
+
+# Mapping of LLM response keys to data dictionary headers
+COLUMN_HEADERS = {
+    "column_name": "Field Name",
+    "datatype": "Data Type",
+    "length": "Length",
+    "is_null": "Allow Null?",
+    "foreign_key": "Foreign Key?",
+    "primary_key": "Primary Key?",
+    "default": "Default",
+    "description": "Description",
+    "constraints": "Valid Values/Constraints"
+}
+
+# Define expected columns
+EXPECTED_COLUMNS = [
+    "Field Name", "Data Type", "Length", "Allow Null?", "Foreign Key?",
+    "Primary Key?", "Default", "Description", "Valid Values/Constraints"
+]
+
+
+def get_output_columns() -> list:
+    """Returns the data dictionary headers, including the configured extra columns."""
+    expected_columns = list(EXPECTED_COLUMNS)
+    if Config.ADD_EXTRA_COLUMNS and Config.EXTRA_COLUMNS:
+        expected_columns.extend(Config.EXTRA_COLUMNS.keys())
+    return expected_columns
+
+
+def build_table_rows(tables_data: dict) -> list:
+    """
+    Converts a table dictionary into data dictionary rows without building a DataFrame.
+
+    Args:
+        tables_data (dict): The table dictionary (`table_name`, `table_description`, `columns`).
+
+    Returns:
+        list: One list of cell values per column, ordered like `get_output_columns()`.
+    """
+    response_keys = {header: key for key, header in COLUMN_HEADERS.items()}
+    extra_columns = Config.EXTRA_COLUMNS if Config.ADD_EXTRA_COLUMNS else {}
+    output_columns = get_output_columns()
+
+    rows = []
+    for column in tables_data.get("columns", []):
+        row = []
+        for header in output_columns:
+            if header in response_keys:
+                value = column.get(response_keys[header])
+            else:
+                value = extra_columns.get(header)
+            # Fill empty constraint values
+            if header == "Valid Values/Constraints" and value is None:
+                value = ""
+            row.append(value)
+        rows.append(row)
+    return rows
+
+
+class BaseSink(ABC):
+    """Abstract base class for data dictionary output formats."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    @abstractmethod
+    def write_table(self, table: str, tables_data: dict) -> bool:
+        """
+        Writes the data dictionary of one table.
+
+        Args:
+            table (str): Name of the table.
+            tables_data (dict): The table dictionary (`table_name`, `table_description`, `columns`).
+
+        Returns:
+            bool: False if the table had no columns and was skipped.
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """Flushes and closes the output."""
+        pass
+
+    def __enter__(self) -> "BaseSink":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        with run_metrics.span(f"close_{type(self).__name__}"):
+            self.close()
@@ -0,0 +1,27 @@
+import csv
+from app.common_utils.loggers import logger
+from app.output.base_sink import BaseSink, build_table_rows, get_output_columns
+
+
+class CsvSink(BaseSink):
+    """Streams one row per column of every table to a single CSV file."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.file = open(path, "w", encoding="utf-8", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(["Table Name", "Table Description"] + get_output_columns())
+
+    def write_table(self, table: str, tables_data: dict) -> bool:
+        rows = build_table_rows(tables_data)
+        if not rows:
+            logger.warning(f"Skipping empty table: {table}")
+            return False
+
+        table_description = tables_data.get("table_description", "")
+        self.writer.writerows([table, table_description] + row for row in rows)
+        return True
+
+    def close(self) -> None:
+        self.file.close()
+        logger.info(f"Data dictionary saved to {self.path}")
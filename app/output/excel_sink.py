@@ -0,0 +1,123 @@
+import json
+import xlsxwriter
+from app.config.config import Config
+from app.common_utils.loggers import logger
+from app.common_utils.run_metrics import run_metrics
+from app.output.base_sink import BaseSink, COLUMN_HEADERS, build_table_rows, get_output_columns
+
+# Excel limits sheet names to 31 characters
+MAX_SHEET_NAME_LENGTH = 31
+
+
+def _cell_value(value):
+    """Converts values the LLM may return as lists or objects into text xlsxwriter can store."""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+class _SheetNames:
+    """Assigns unique, Excel-compatible sheet names to tables."""
+
+    def __init__(self) -> None:
+        self._used = set()
+
+    def assign(self, table: str) -> str:
+        # Truncate sheet name to 31 characters, adding a suffix when truncated names collide
+        sheet_name = table[:MAX_SHEET_NAME_LENGTH]
+        suffix = 1
+        while sheet_name.lower() in self._used:
+            tag = f"~{suffix}"
+            sheet_name = table[:MAX_SHEET_NAME_LENGTH - len(tag)] + tag
+            suffix += 1
+        if sheet_name != table:
+            logger.info(f"Writing table {table} to sheet '{sheet_name}'")
+        self._used.add(sheet_name.lower())
+        return sheet_name
+
+
+class PandasExcelSink(BaseSink):
+    """Writes one sheet per table through pandas; every sheet stays in memory until `close`."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        # pandas is only imported when this writer is selected, keeping start-up fast
+        import pandas as pd
+
+        self.pd = pd
+        self.writer = pd.ExcelWriter(path, engine="xlsxwriter")
+        self.sheet_names = _SheetNames()
+
+    def write_table(self, table: str, tables_data: dict) -> bool:
+        with run_metrics.span("shape_dataframe"):
+            df = self.pd.json_normalize(tables_data, "columns", [
+                                   "table_name", "table_description"])
+
+            if df.empty:
+                logger.warning(f"Skipping empty table: {table}")
+                return False
+
+            df.rename(columns=COLUMN_HEADERS, inplace=True)
+
+            df.drop(columns=["table"], inplace=True, errors='ignore')
+            # Fill empty constraint values
+            df["Valid Values/Constraints"] = df["Valid Values/Constraints"].fillna(
+                "")
+
+            # Add extra columns dynamically
+            if Config.ADD_EXTRA_COLUMNS and Config.EXTRA_COLUMNS:
+                for col_name, col_value in Config.EXTRA_COLUMNS.items():
+                    df[col_name] = col_value
+
+            df = df[get_output_columns()]
+
+        sheet_name = self.sheet_names.assign(table)
+
+        # Get worksheet reference and add table metadata
+        with run_metrics.span("write_sheet"):
+            df.to_excel(self.writer, sheet_name=sheet_name, startrow=2, index=False)
+            worksheet = self.writer.sheets[sheet_name]
+            table_description = tables_data.get(
+                'table_description', '')
+            worksheet.write(0, 0, f"Table Name: {table}")
+            worksheet.write(1, 0, f"Description: {table_description}")
+        return True
+
+    def close(self) -> None:
+        self.writer.close()
+        logger.info(f"Data dictionary saved to {self.path}")
+
+
+class StreamingExcelSink(BaseSink):
+    """
+    Writes one sheet per table straight to xlsxwriter in `constant_memory` mode.
+
+    Rows are flushed to disk as soon as they are written, so peak memory no longer grows
+    with the number of tables.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self.header_format = self.workbook.add_format(
+            {"bold": True, "border": 1, "align": "center", "valign": "top"})
+        self.sheet_names = _SheetNames()
+
+    def write_table(self, table: str, tables_data: dict) -> bool:
+        rows = build_table_rows(tables_data)
+        if not rows:
+            logger.warning(f"Skipping empty table: {table}")
+            return False
+
+        worksheet = self.workbook.add_worksheet(self.sheet_names.assign(table))
+        worksheet.write(0, 0, f"Table Name: {table}")
+        worksheet.write(1, 0, f"Description: {tables_data.get('table_description', '')}")
+        worksheet.write_row(2, 0, get_output_columns(), self.header_format)
+        for row_index, row in enumerate(rows, start=3):
+            for col_index, value in enumerate(row):
+                worksheet.write(row_index, col_index, _cell_value(value))
+        return True
+
+    def close(self) -> None:
+        self.workbook.close()
+        logger.info(f"Data dictionary saved to {self.path}")
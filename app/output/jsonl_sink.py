@@ -0,0 +1,26 @@
+import json
+from app.common_utils.loggers import logger
+from app.output.base_sink import BaseSink
+
+
+class JsonlSink(BaseSink):
+    """Streams one JSON object per table (`table_name`, `table_description`, `columns`) to a JSON Lines file."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write_table(self, table: str, tables_data: dict) -> bool:
+        if not tables_data.get("columns"):
+            logger.warning(f"Skipping empty table: {table}")
+            return False
+
+        record = {"table_name": table,
+                  "table_description": tables_data.get("table_description", ""),
+                  "columns": tables_data["columns"]}
+        self.file.write(json.dumps(record, default=str) + "\n")
+        return True
+
+    def close(self) -> None:
+        self.file.close()
+        logger.info(f"Data dictionary saved to {self.path}")
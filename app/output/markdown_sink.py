@@ -0,0 +1,42 @@
+from app.common_utils.loggers import logger
+from app.output.base_sink import BaseSink, build_table_rows, get_output_columns
+
+
+def _escape(value) -> str:
+    """Formats a cell value for a Markdown table."""
+    if value is None:
+        return ""
+    return str(value).replace("|", "\\|").replace("\r", " ").replace("\n", " ")
+
+
+class MarkdownSink(BaseSink):
+    """Streams a Markdown document with one section and table per database table."""
+
+    def __init__(self, path: str, title: str) -> None:
+        super().__init__(path)
+        self.file = open(path, "w", encoding="utf-8")
+        self.file.write(f"# {title}\n")
+
+    def write_table(self, table: str, tables_data: dict) -> bool:
+        rows = build_table_rows(tables_data)
+        if not rows:
+            logger.warning(f"Skipping empty table: {table}")
+            return False
+
+        headers = get_output_columns()
+        lines = [
+            "",
+            f"## {table}",
+            "",
+            _escape(tables_data.get("table_description", "")),
+            "",
+            "| " + " | ".join(headers) + " |",
+            "|" + "---|" * len(headers),
+        ]
+        lines.extend("| " + " | ".join(_escape(value) for value in row) + " |" for row in rows)
+        self.file.write("\n".join(lines) + "\n")
+        return True
+
+    def close(self) -> None:
+        self.file.close()
+        logger.info(f"Data dictionary saved to {self.path}")
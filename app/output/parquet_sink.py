@@ -0,0 +1,71 @@
+import json
+from app.common_utils.loggers import logger
+from app.output.base_sink import BaseSink, COLUMN_HEADERS, build_table_rows, get_output_columns
+
+# Rows buffered before a Parquet row group is written
+ROW_GROUP_SIZE = 50000
+
+
+def _field_name(header: str) -> str:
+    """Returns the snake_case Parquet field name of a data dictionary header."""
+    response_keys = {value: key for key, value in COLUMN_HEADERS.items()}
+    return response_keys.get(header) or header.strip().lower().replace(" ", "_")
+
+
+def _text(value) -> str | None:
+    """Stores every value as text, since LLM responses mix numbers, strings and 'NULL'."""
+    if value is None:
+        return None
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return str(value)
+
+
+class ParquetSink(BaseSink):
+    """
+    Writes one row per column of every table to a single Parquet file, in row groups of
+    `ROW_GROUP_SIZE` rows. Requires the optional `pyarrow` dependency.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as err:
+            raise ImportError(
+                "The Parquet output format requires pyarrow. Install it with `poetry install -E parquet`.") from err
+
+        self.pa = pa
+        self.fields = ["table_name", "table_description"] + \
+            [_field_name(header) for header in get_output_columns()]
+        self.schema = pa.schema([(field, pa.string()) for field in self.fields])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.buffer = {field: [] for field in self.fields}
+        self.buffered_rows = 0
+
+    def write_table(self, table: str, tables_data: dict) -> bool:
+        rows = build_table_rows(tables_data)
+        if not rows:
+            logger.warning(f"Skipping empty table: {table}")
+            return False
+
+        table_description = tables_data.get("table_description", "")
+        for row in rows:
+            for field, value in zip(self.fields, [table, table_description] + row):
+                self.buffer[field].append(_text(value))
+        self.buffered_rows += len(rows)
+        if self.buffered_rows >= ROW_GROUP_SIZE:
+            self._flush()
+        return True
+
+    def _flush(self) -> None:
+        if self.buffered_rows:
+            self.writer.write_table(self.pa.table(self.buffer, schema=self.schema))
+            self.buffer = {field: [] for field in self.fields}
+            self.buffered_rows = 0
+
+    def close(self) -> None:
+        self._flush()
+        self.writer.close()
+        logger.info(f"Data dictionary saved to {self.path}")
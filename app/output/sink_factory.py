@@ -0,0 +1,50 @@
+import os
+from typing import Iterator
+from app.config.config import Config
+from app.output.base_sink import BaseSink
+from app.output.csv_sink import CsvSink
+from app.output.excel_sink import PandasExcelSink, StreamingExcelSink
+from app.output.jsonl_sink import JsonlSink
+from app.output.markdown_sink import MarkdownSink
+from app.output.parquet_sink import ParquetSink
+
+# File extension of each output format
+OUTPUT_EXTENSIONS = {
+    "excel": "xlsx",
+    "parquet": "parquet",
+    "jsonl": "jsonl",
+    "csv": "csv",
+    "markdown": "md",
+}
+
+
+def get_output_sinks(output_dir: str, schema_name: str, dbms: str = None) -> Iterator[BaseSink]:
+    """
+    Yields one sink per format listed in `OUTPUT_FORMATS`.
+
+    Sinks are created lazily, so a caller entering each one into an `ExitStack` still closes
+    the earlier sinks if a later one fails to open. Files are named
+    `<schema_name>_data_dictionary_(<DBMS>).<extension>` inside `output_dir`.
+    """
+    dbms = dbms or Config.DBMS
+    for output_format in Config.OUTPUT_FORMATS:
+        if output_format not in OUTPUT_EXTENSIONS:
+            raise ValueError(
+                f"Unsupported output format: {output_format}. "
+                f"Supported formats: {', '.join(OUTPUT_EXTENSIONS)}.")
+
+        path = os.path.join(
+            output_dir,
+            f"{schema_name}_data_dictionary_({dbms}).{OUTPUT_EXTENSIONS[output_format]}")
+
+        if output_format == "excel":
+            yield (StreamingExcelSink(path) if Config.EXCEL_WRITER_MODE == "streaming"
+                   else PandasExcelSink(path))
+        elif output_format == "parquet":
+            yield ParquetSink(path)
+        elif output_format == "jsonl":
+            yield JsonlSink(path)
+        elif output_format == "csv":
+            yield CsvSink(path)
+        elif output_format == "markdown":
+            yield MarkdownSink(path, f"Data Dictionary: {schema_name}")
@@ -0,0 +1,149 @@
+import json
+import os
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+from urllib.parse import parse_qs, unquote, urlsplit
+from app.config.config import Config
+from app.config.db_config import ConnectionManager, get_db_targets
+from app.src.dictionary_service import DictionaryService
+from app.src.generate_data_dictionary import close_description_cache
+from app.common_utils.llm_scheduler import log_scheduler_stats
+from app.common_utils.loggers import logger
+
+# Routes of the lookup API: (method, pattern, handler name)
+ROUTES = [
+    ("GET", re.compile(r"^/health$"), "health"),
+    ("GET", re.compile(r"^/schemas/([^/]+)/tables$"), "list_tables"),
+    ("GET", re.compile(r"^/schemas/([^/]+)/tables/([^/]+)$"), "get_table"),
+    ("GET", re.compile(r"^/schemas/([^/]+)/tables/([^/]+)/columns/([^/]+)$"), "get_column"),
+    ("POST", re.compile(r"^/schemas/([^/]+)/refresh$"), "refresh"),
+    ("POST", re.compile(r"^/schemas/([^/]+)/invalidate$"), "invalidate"),
+    ("POST", re.compile(r"^/schemas/([^/]+)/tables/([^/]+)/invalidate$"), "invalidate"),
+]
+
+
+class DictionaryRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON lookup API over a `DictionaryService`.
+
+        GET  /health
+        GET  /schemas/<schema>/tables
+        GET  /schemas/<schema>/tables/<table>[?generate=false]
+        GET  /schemas/<schema>/tables/<table>/columns/<column>[?generate=false]
+        POST /schemas/<schema>/refresh
+        POST /schemas/<schema>/invalidate
+        POST /schemas/<schema>/tables/<table>/invalidate
+
+    Table and column lookups are generated on demand unless `generate=false` is given.
+    Connections are kept alive, so a client reuses one connection for many lookups.
+    """
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    service: DictionaryService = None
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def _dispatch(self, method: str) -> None:
+        url = urlsplit(self.path)
+        self.query = parse_qs(url.query)
+        if method == "POST" and self.headers.get("Content-Length"):
+            self.rfile.read(int(self.headers["Content-Length"]))
+        for route_method, pattern, handler in ROUTES:
+            match = pattern.match(url.path)
+            if match and route_method == method:
+                args = [unquote(group) for group in match.groups()]
+                if args and handler != "health" and self.service.schema(args[0]) is None:
+                    return self._send_error(404, f"Unknown schema {args[0]}")
+                try:
+                    return getattr(self, handler)(*args)
+                except Exception as err:
+                    logger.error(f"Error handling {method} {self.path}: {err}", exc_info=True)
+                    return self._send_error(500, str(err))
+        self._send_error(404, f"No route for {method} {url.path}")
+
+    def _generate(self) -> bool:
+        return self.query.get("generate", ["true"])[0].lower() != "false"
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, value) -> None:
+        self._send(status, json.dumps(value, default=str).encode("utf-8"))
+
+    def _send_error(self, status: int, message: str) -> None:
+        self._send_json(status, {"error": message})
+
+    def health(self) -> None:
+        self._send_json(200, {"status": "ok", **self.service.index.stats()})
+
+    def list_tables(self, schema: str) -> None:
+        self._send_json(200, {"schema": self.service.schema(schema), "tables": self.service.table_names(schema)})
+
+    def get_table(self, schema: str, table: str) -> None:
+        body = self.service.table(schema, table, self._generate())
+        if body is None:
+            return self._send_table_missing(schema, table)
+        self._send(200, body)
+
+    def get_column(self, schema: str, table: str, column: str) -> None:
+        body = self.service.column(schema, table, column, self._generate())
+        if body is None:
+            if self.service.index.table_json(schema, table) is not None:
+                return self._send_error(404, f"Unknown column {column} of table {table}")
+            return self._send_table_missing(schema, table)
+        self._send(200, body)
+
+    def _send_table_missing(self, schema: str, table: str) -> None:
+        if table.lower() not in (name.lower() for name in self.service.table_names(schema)):
+            return self._send_error(404, f"Unknown table {table} in schema {schema}")
+        if not self._generate():
+            return self._send_error(404, f"Table {table} is not documented yet")
+        self._send_error(502, f"Could not generate the dictionary of table {table}")
+
+    def refresh(self, schema: str) -> None:
+        self._send_json(200, self.service.refresh(schema))
+
+    def invalidate(self, schema: str, table: str | None = None) -> None:
+        self._send_json(200, {"invalidated": self.service.invalidate(schema, table)})
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def create_server(service: DictionaryService, host: str, port: int) -> ThreadingHTTPServer:
+    """Creates the HTTP server of a started service; port 0 picks a free port."""
+    handler = type("BoundDictionaryRequestHandler", (DictionaryRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(managers: List[ConnectionManager] | None = None) -> None:
+    """Runs the dictionary service on `SERVICE_HOST`:`SERVICE_PORT` until interrupted."""
+    if managers is None:
+        targets = get_db_targets()
+        managers = [ConnectionManager(target, Config.SERVICE_MAX_CONNECTIONS) for target in targets]
+    service = DictionaryService(managers, os.path.join(os.getcwd(), "output"))
+    try:
+        service.start()
+        server = create_server(service, Config.SERVICE_HOST, Config.SERVICE_PORT)
+        logger.info(f"Dictionary service listening on http://{Config.SERVICE_HOST}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Shutting down the dictionary service")
+        finally:
+            server.server_close()
+    finally:
+        service.close()
+        close_description_cache()
+        log_scheduler_stats()
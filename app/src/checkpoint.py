@@ -0,0 +1,113 @@
+import json
+import os
+from typing import Dict
+from app.src.schema_diff import normalize_row
+from app.common_utils.loggers import logger
+
+CHECKPOINT_VERSION = 1
+
+
+def load_checkpoint(path: str) -> Dict[str, dict]:
+    """
+    Loads the tables recorded in the checkpoint journal of an interrupted run.
+
+    A line torn by a crash in the middle of a write is skipped; when a table was recorded more
+    than once, the last entry wins.
+
+    Args:
+        path (str): Path of the journal file.
+
+    Returns:
+        Dict[str, dict]: Mapping of table name to `{"rows": [...], "dictionary": {...}}`, in the
+            format of the metadata snapshot, empty if no usable journal exists.
+    """
+    if not os.path.exists(path):
+        logger.info(f"No checkpoint journal found at {path}, starting from the beginning")
+        return {}
+
+    tables = {}
+    skipped = 0
+    with open(path, encoding="utf-8") as journal:
+        for number, line in enumerate(journal):
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+            if number == 0:
+                if entry.get("version") != CHECKPOINT_VERSION:
+                    logger.warning(f"Ignoring checkpoint journal {path} with unsupported version")
+                    return {}
+                continue
+            if isinstance(entry, dict) and entry.get("table") and entry.get("dictionary"):
+                tables[entry["table"]] = {"rows": entry.get("rows", []), "dictionary": entry["dictionary"]}
+
+    if skipped:
+        logger.warning(f"Skipped {skipped} unreadable line(s) of checkpoint journal {path}")
+    logger.info(f"Resuming from checkpoint journal {path} with {len(tables)} finished tables")
+    return tables
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal of the tables documented so far, one line per table.
+
+    Every line is flushed and synced to disk as soon as the table completes, so a crashed run,
+    or a power loss, loses at most the tables still in flight. One fsync per table is negligible
+    next to the LLM call that produced it. The journal is removed once every table was documented and the
+    outputs are finalized; after a crash or a failed table it is kept for `--resume`.
+    """
+
+    def __init__(self, path: str, resume: bool = False) -> None:
+        self.path = path
+        self.count = 0
+        self.failed = 0
+        if resume and os.path.exists(path):
+            # Terminate a line torn by the crash so the next entry starts on its own line
+            with open(path, "rb") as existing:
+                torn = False
+                if existing.seek(0, os.SEEK_END):
+                    existing.seek(-1, os.SEEK_END)
+                    torn = existing.read(1) != b"\n"
+            self.file = open(path, "a", encoding="utf-8")
+            if torn:
+                self.file.write("\n")
+        else:
+            self.file = open(path, "w", encoding="utf-8")
+            self.file.write(json.dumps({"version": CHECKPOINT_VERSION}) + "\n")
+        self._sync()
+
+    def record(self, table: str, metadata: list, dictionary: dict) -> None:
+        """
+        Durably records a validated table dictionary.
+
+        Args:
+            table (str): Name of the table.
+            metadata (list): The table's metadata rows, used on resume to detect changed columns.
+            dictionary (dict): The table's generated dictionary.
+        """
+        entry = {"table": table, "rows": [normalize_row(row) for row in metadata], "dictionary": dictionary}
+        self.file.write(json.dumps(entry, default=str) + "\n")
+        self._sync()
+        self.count += 1
+
+    def _sync(self) -> None:
+        """Flushes the journal and forces it to disk."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def mark_failed(self, table: str) -> None:
+        """Notes that a table could not be documented, so the journal is kept for `--resume`."""
+        self.failed += 1
+
+    def __enter__(self) -> "CheckpointJournal":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.file.close()
+        if exc_type is None and not self.failed:
+            os.remove(self.path)
+            logger.info(f"Run completed, removed checkpoint journal {self.path}")
+        else:
+            logger.warning(f"Recorded {self.count} tables in checkpoint journal {self.path}; "
+                           f"rerun with --resume to only document the remaining tables")
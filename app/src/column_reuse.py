@@ -0,0 +1,120 @@
+import difflib
+import re
+import threading
+from typing import Dict, List
+from app.src.prompt_encoding import merge_column_rows
+
+# Foreign key targets folded into the constraints field, e.g. "REFERENCES customer (id), region (code)"
+REFERENCES_PATTERN = re.compile(r"REFERENCES\s+([^;]+)", re.IGNORECASE)
+
+
+class ColumnReuseIndex:
+    """
+    Cross-table index of column descriptions keyed by column signature.
+
+    A signature is the column name together with its data type, length, nullability and foreign
+    key target. Once a column has been described, every later column with the same signature
+    reuses that description instead of being sent to the LLM. With a `similarity` below 1.0,
+    columns whose other attributes match and whose names are at least that similar
+    (`difflib` ratio, e.g. `created_on` and `created_at`) are reused as near-matches.
+    """
+
+    def __init__(self, similarity: float = 1.0) -> None:
+        self.similarity = similarity
+        self._descriptions: Dict[tuple, str] = {}
+        # Column names seen per (type, length, nullability, foreign key) bucket, for near-matches
+        self._names_by_bucket: Dict[tuple, List[str]] = {}
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+
+    @staticmethod
+    def signature(column: dict) -> tuple:
+        """
+        Returns the signature of a column in the output format: (name, bucket).
+
+        The foreign key target is the referenced tables of the column's `REFERENCES` constraints.
+        """
+        targets = sorted({target.split("(", 1)[0].strip().lower()
+                          for references in REFERENCES_PATTERN.findall(str(column.get("constraints") or ""))
+                          for target in references.split(",")})
+        if targets:
+            foreign_key = ",".join(targets)
+        else:
+            foreign_key = "FK" if column.get("foreign_key") == "Yes" else ""
+        bucket = (str(column.get("datatype")).lower(), str(column.get("length")),
+                  str(column.get("is_null")).upper(), foreign_key)
+        return str(column.get("column_name")).lower(), bucket
+
+    def lookup(self, column: dict) -> str | None:
+        """Returns the description of an identical or, above the similarity threshold, similar column."""
+        name, bucket = self.signature(column)
+        with self._lock:
+            self.lookups += 1
+            description = self._descriptions.get((name, bucket))
+            if description is not None:
+                self.exact_hits += 1
+                return description
+            if self.similarity >= 1.0:
+                return None
+            matches = difflib.get_close_matches(
+                name, self._names_by_bucket.get(bucket, []), n=1, cutoff=self.similarity)
+            if not matches:
+                return None
+            self.near_hits += 1
+            return self._descriptions[(matches[0], bucket)]
+
+    def learn(self, metadata: list, table_dictionary: dict) -> None:
+        """
+        Indexes the described columns of a finished table; the first description of a signature wins.
+
+        Args:
+            metadata (list): Metadata rows of the table, which the signatures are computed from.
+            table_dictionary (dict): The table's data dictionary.
+        """
+        rows_by_column: Dict[str, list] = {}
+        for row in metadata:
+            rows_by_column.setdefault(row[1], []).append(row)
+
+        with self._lock:
+            for column in table_dictionary.get("columns", []):
+                description = column.get("description")
+                column_rows = rows_by_column.get(column.get("column_name"))
+                if not column_rows or not description or description == "NULL":
+                    continue
+                name, bucket = self.signature(merge_column_rows(column_rows))
+                if (name, bucket) not in self._descriptions:
+                    self._descriptions[(name, bucket)] = str(description)
+                    self._names_by_bucket.setdefault(bucket, []).append(name)
+
+    def reuse_descriptions(self, metadata: list) -> Dict[str, dict]:
+        """
+        Looks up every column of `metadata` in the index.
+
+        Args:
+            metadata (list): Metadata rows of the columns of one table that still need a description.
+
+        Returns:
+            Dict[str, dict]: The columns resolved from the index, in the output format, keyed by name.
+        """
+        rows_by_column: Dict[str, list] = {}
+        for row in metadata:
+            rows_by_column.setdefault(row[1], []).append(row)
+
+        reused = {}
+        for column_name, column_rows in rows_by_column.items():
+            column = merge_column_rows(column_rows)
+            description = self.lookup(column)
+            if description is not None:
+                column["description"] = description
+                reused[column_name] = column
+        return reused
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the lookup counters and hit rate."""
+        with self._lock:
+            hits = self.exact_hits + self.near_hits
+            return {"signatures": len(self._descriptions), "lookups": self.lookups,
+                    "exact_hits": self.exact_hits, "near_hits": self.near_hits,
+                    "hit_rate": round(hits / self.lookups, 3) if self.lookups else 0.0}
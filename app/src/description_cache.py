@@ -0,0 +1,139 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from app.config.config import Config
+from app.common_utils.loggers import logger
+
+
+class DescriptionCache:
+    """
+    Persistent, content-addressed cache of LLM generated table descriptions.
+
+    Entries are keyed by a fingerprint of everything that influences the LLM answer
+    (table metadata rows, domain name, prompt template and model id), so an unchanged
+    table is never sent to the LLM twice. Entries are evicted by age and, once the cache
+    grows beyond `max_entries`, least recently used first.
+
+    The entry count is kept in memory after one `COUNT(*)` at startup, and read hits only
+    note their access time; the access times are written with the next insert or eviction,
+    so lookups never commit.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000, max_age_days: float = 30) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS descriptions (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM descriptions").fetchone()[0]
+        self._accessed = {}
+        self.hits = 0
+        self.misses = 0
+        self.evict()
+
+    @classmethod
+    def from_config(cls) -> "DescriptionCache":
+        """Creates a cache using the `CACHE_*` settings."""
+        return cls(Config.CACHE_PATH, Config.CACHE_MAX_ENTRIES, Config.CACHE_MAX_AGE_DAYS)
+
+    @staticmethod
+    def make_key(metadata: list, domain_name: str, prompt_template: str, model_name: str) -> str:
+        """
+        Builds the cache key for a table.
+
+        Args:
+            metadata (list): The table's metadata rows, as returned by `extract_table_metadata`.
+            domain_name (str): The configured domain name.
+            prompt_template (str): The prompt template text sent to the LLM.
+            model_name (str): The configured `provider:model` id.
+
+        Returns:
+            str: A SHA-256 hex digest identifying the request.
+        """
+        payload = json.dumps(
+            [[list(row) for row in metadata], domain_name, prompt_template, model_name],
+            default=str, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """Returns the cached value for `key`, or None if it is missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM descriptions WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._accessed[key] = now
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: dict) -> None:
+        """Stores `value` under `key`, evicting old entries if the cache is over its size limit."""
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute(
+                "SELECT 1 FROM descriptions WHERE key = ?", (key,)).fetchone() is not None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO descriptions (key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, default=str), now, now))
+            self._accessed.pop(key, None)
+            self._count += not exists
+            if self._count > self.max_entries:
+                self._evict_overflow()
+            else:
+                self._write_accessed()
+            self._conn.commit()
+
+    def evict(self) -> None:
+        """Removes expired entries and trims the cache to `max_entries`."""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM descriptions WHERE created_at < ?",
+                (time.time() - self.max_age_seconds,)).rowcount
+            self._count -= deleted
+            self._evict_overflow()
+            self._conn.commit()
+        if deleted:
+            logger.info(f"Evicted {deleted} expired entries from description cache")
+
+    def _write_accessed(self) -> None:
+        """Writes the access times noted by `get` since the last write. The caller holds the lock and commits."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE descriptions SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._accessed.items()])
+            self._accessed.clear()
+
+    def _evict_overflow(self) -> None:
+        """Removes the least recently used entries beyond `max_entries`. The caller holds the lock and commits."""
+        self._write_accessed()
+        overflow = self._count - self.max_entries
+        if overflow <= 0:
+            return
+        self._count -= self._conn.execute(
+            "DELETE FROM descriptions WHERE key IN ("
+            "SELECT key FROM descriptions ORDER BY accessed_at LIMIT ?)", (overflow,)).rowcount
+
+    def close(self) -> None:
+        """Writes the pending access times and closes the underlying SQLite connection."""
+        with self._lock:
+            self._write_accessed()
+            self._conn.commit()
+            self._conn.close()
+        logger.info(
+            f"Description cache closed: {self.hits} hits, {self.misses} misses")
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import threading
+from typing import Dict, List, Tuple
+from app.src.schema_diff import normalize_row
+
+
+def metadata_fingerprint(metadata: list) -> str:
+    """Returns a SHA-256 digest of a table's metadata rows, which changes with any catalog change."""
+    payload = json.dumps([normalize_row(row) for row in metadata], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DictionaryIndex:
+    """
+    Thread-safe in-memory index of generated table dictionaries, keyed by schema and table.
+
+    Tables and columns are looked up by case-insensitive name, and the JSON body of every table
+    and column is serialized once when the entry is stored, so a cached lookup is a dict access.
+    Every entry remembers the fingerprint of the metadata it was generated from. When the catalog
+    changes, `sync` marks the entry stale: it is no longer served, but its descriptions are
+    reused when the table is regenerated, so only changed columns reach the LLM.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], dict] = {}
+
+    @staticmethod
+    def _key(schema: str, table: str) -> Tuple[str, str]:
+        return schema.lower(), table.lower()
+
+    def put(self, schema: str, table: str, metadata: list, dictionary: dict) -> None:
+        """
+        Stores a generated table dictionary.
+
+        Args:
+            schema (str): Name of the schema.
+            table (str): Name of the table.
+            metadata (list): The metadata rows the dictionary was generated from.
+            dictionary (dict): The table dictionary (`table_name`, `table_description`, `columns`).
+        """
+        columns = {}
+        for column in dictionary.get("columns", []):
+            body = {"schema": schema, "table_name": table, **column}
+            columns[str(column.get("column_name", "")).lower()] = json.dumps(body, default=str).encode("utf-8")
+        entry = {
+            "schema": schema,
+            "table": table,
+            "fingerprint": metadata_fingerprint(metadata),
+            "rows": [normalize_row(row) for row in metadata],
+            "dictionary": dictionary,
+            "stale": False,
+            "body": json.dumps({"schema": schema, **dictionary}, default=str).encode("utf-8"),
+            "columns": columns,
+        }
+        with self._lock:
+            self._entries[self._key(schema, table)] = entry
+
+    def table_json(self, schema: str, table: str) -> bytes | None:
+        """Returns the JSON body of a current table entry, or None if it is missing or stale."""
+        entry = self._entries.get(self._key(schema, table))
+        return entry["body"] if entry and not entry["stale"] else None
+
+    def column_json(self, schema: str, table: str, column: str) -> bytes | None:
+        """Returns the JSON body of a column of a current table entry, or None."""
+        entry = self._entries.get(self._key(schema, table))
+        return entry["columns"].get(column.lower()) if entry and not entry["stale"] else None
+
+    def previous_entry(self, schema: str, table: str) -> dict | None:
+        """Returns a table's last entry, current or stale, in the metadata snapshot format."""
+        entry = self._entries.get(self._key(schema, table))
+        return {"rows": entry["rows"], "dictionary": entry["dictionary"]} if entry else None
+
+    def invalidate(self, schema: str, table: str | None = None) -> int:
+        """
+        Marks one table, or every table of a schema, as stale.
+
+        Returns:
+            int: The number of entries invalidated.
+        """
+        with self._lock:
+            entries = [entry for key, entry in self._entries.items()
+                       if key[0] == schema.lower() and (table is None or key[1] == table.lower())
+                       and not entry["stale"]]
+            for entry in entries:
+                entry["stale"] = True
+        return len(entries)
+
+    def sync(self, schema: str, metadata_by_table: Dict[str, list]) -> int:
+        """
+        Invalidates the entries whose metadata changed and removes the tables that were dropped.
+
+        Args:
+            schema (str): Name of the schema.
+            metadata_by_table (Dict[str, list]): The schema's current metadata rows by table.
+
+        Returns:
+            int: The number of entries invalidated or removed.
+        """
+        current = {table.lower(): rows for table, rows in metadata_by_table.items()}
+        changed = 0
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == schema.lower()]:
+                entry = self._entries[key]
+                rows = current.get(key[1])
+                if rows is None:
+                    del self._entries[key]
+                    changed += 1
+                elif not entry["stale"] and metadata_fingerprint(rows) != entry["fingerprint"]:
+                    entry["stale"] = True
+                    changed += 1
+        return changed
+
+    def load(self, schema: str, snapshot: Dict[str, dict]) -> int:
+        """
+        Fills the index from a metadata snapshot written by an earlier run or service.
+
+        Returns:
+            int: The number of tables loaded.
+        """
+        for table, entry in snapshot.items():
+            if entry.get("dictionary"):
+                self.put(schema, table, entry.get("rows", []), entry["dictionary"])
+        return len(snapshot)
+
+    def tables(self, schema: str) -> List[dict]:
+        """
+        Returns every entry of a schema in the metadata snapshot format. Stale entries are included:
+        their stored rows let an incremental run regenerate only the changed columns.
+        """
+        with self._lock:
+            entries = [entry for key, entry in self._entries.items() if key[0] == schema.lower()]
+        return [{"table": entry["table"], "rows": entry["rows"], "dictionary": entry["dictionary"]}
+                for entry in entries]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stale = sum(entry["stale"] for entry in self._entries.values())
+            return {"tables": len(self._entries) - stale, "stale": stale}
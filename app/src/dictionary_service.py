@@ -0,0 +1,168 @@
+import os
+import threading
+from typing import Dict, List
+from app.config.config import Config
+from app.config.db_config import ConnectionManager
+from app.src.dictionary_index import DictionaryIndex
+from app.src.generate_data_dictionary import extract_table_dictionary, generate_data_dictionaries, get_llm
+from app.src.metadata_extractor import extract_table_comments, extract_table_metadata
+from app.src.schema_diff import SnapshotWriter, load_snapshot
+from app.common_utils.run_metrics import run_metrics
+from app.common_utils.loggers import logger
+
+
+class DictionaryService:
+    """
+    Keeps the LLM, the connection pools and the generated dictionaries of every schema resident,
+    answering table and column lookups from a `DictionaryIndex`.
+
+    On start the index is filled from each schema's metadata snapshot and the catalog metadata
+    is read once. A lookup of a table that is not (or no longer) documented generates it on
+    demand, one request per table even when several lookups arrive at once. Every
+    `SERVICE_REFRESH_SECONDS` the catalog is read again, and tables whose metadata changed are
+    invalidated. On shutdown the index is written back to the snapshots, so the next start, or
+    an `--incremental` run, begins warm.
+    """
+
+    def __init__(self, managers: List[ConnectionManager], output_root: str) -> None:
+        self.index = DictionaryIndex()
+        self._schemas: Dict[str, tuple] = {}
+        for manager in managers:
+            output_dir = os.path.join(output_root, manager.target.name) if len(managers) > 1 else output_root
+            for schema in manager.target.schemas:
+                if schema.lower() in self._schemas:
+                    raise ValueError(f"Schema {schema} is configured for more than one database target.")
+                self._schemas[schema.lower()] = (schema, manager, output_dir)
+        self._metadata: Dict[str, Dict[str, tuple]] = {}
+        self._comments: Dict[str, Dict[str, str]] = {}
+        self._generation_locks: Dict[tuple, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._refresher = None
+
+    def schema(self, name: str) -> str | None:
+        """Returns the configured spelling of a schema name, or None if it is not served."""
+        entry = self._schemas.get(name.lower())
+        return entry[0] if entry else None
+
+    def _snapshot_file(self, schema: str) -> str:
+        _, manager, output_dir = self._schemas[schema.lower()]
+        return os.path.join(output_dir, f"{schema}_metadata_snapshot_({manager.target.dbms}).json")
+
+    def start(self) -> None:
+        """Loads the snapshots, reads the catalog of every schema, warms the LLM and starts the refresher."""
+        for schema, _, _ in self._schemas.values():
+            loaded = self.index.load(schema, load_snapshot(self._snapshot_file(schema)))
+            logger.info(f"Loaded {loaded} documented tables of {schema} into the dictionary index")
+            self.refresh(schema)
+        get_llm()
+        if Config.SERVICE_REFRESH_SECONDS > 0:
+            self._refresher = threading.Thread(target=self._refresh_periodically, name="catalog-refresh",
+                                               daemon=True)
+            self._refresher.start()
+
+    def refresh(self, schema: str) -> dict:
+        """
+        Reads the schema's catalog metadata again and invalidates the tables that changed.
+
+        Returns:
+            dict: The number of `tables` in the catalog and of entries `invalidated`.
+        """
+        schema, manager, _ = self._schemas[schema.lower()]
+        with manager.connection() as conn:
+            metadata_by_table = dict(extract_table_metadata(conn, schema, manager.target.dbms))
+            comments = extract_table_comments(
+                conn, schema, manager.target.dbms) if Config.SKIP_DOCUMENTED_COLUMNS else {}
+        if not metadata_by_table and self._metadata.get(schema.lower()):
+            # An extraction error returns no rows; keep serving rather than dropping the schema
+            logger.warning(f"Catalog refresh of {schema} returned no tables, keeping the current index")
+            return {"tables": len(self._metadata[schema.lower()]), "invalidated": 0}
+
+        invalidated = self.index.sync(schema, metadata_by_table)
+        self._metadata[schema.lower()] = {table.lower(): (table, rows) for table, rows in metadata_by_table.items()}
+        self._comments[schema.lower()] = comments
+        if invalidated:
+            logger.info(f"Catalog of {schema} changed: invalidated {invalidated} tables")
+        return {"tables": len(metadata_by_table), "invalidated": invalidated}
+
+    def _refresh_periodically(self) -> None:
+        while not self._stopped.wait(Config.SERVICE_REFRESH_SECONDS):
+            for schema, _, _ in list(self._schemas.values()):
+                try:
+                    self.refresh(schema)
+                except Exception as err:
+                    logger.error(f"Catalog refresh of {schema} failed: {err}", exc_info=True)
+
+    def table_names(self, schema: str) -> List[str]:
+        """Returns the tables of a schema in the catalog."""
+        return [table for table, _ in self._metadata.get(schema.lower(), {}).values()]
+
+    def table(self, schema: str, table: str, generate: bool = True) -> bytes | None:
+        """
+        Returns the JSON dictionary of a table, generating it when it is missing or stale.
+
+        Returns:
+            bytes | None: The table's JSON body, or None if the table is unknown, `generate` is off
+                and it is not documented, or its generation failed.
+        """
+        body = self.index.table_json(schema, table)
+        if body is None and generate and self._generate(schema, table):
+            body = self.index.table_json(schema, table)
+        return body
+
+    def column(self, schema: str, table: str, column: str, generate: bool = True) -> bytes | None:
+        """Returns the JSON entry of a column, generating its table when it is missing or stale."""
+        body = self.index.column_json(schema, table, column)
+        if body is None and generate and self.index.table_json(schema, table) is None \
+                and self._generate(schema, table):
+            body = self.index.column_json(schema, table, column)
+        return body
+
+    def invalidate(self, schema: str, table: str | None = None) -> int:
+        """Marks a table, or the whole schema, for regeneration on its next lookup."""
+        return self.index.invalidate(schema, table)
+
+    def _generation_lock(self, schema: str, table: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._generation_locks.setdefault((schema.lower(), table.lower()), threading.Lock())
+
+    def _generate(self, schema: str, table: str) -> bool:
+        """Generates and indexes one table; concurrent lookups of the same table wait for one request."""
+        found = self._metadata.get(schema.lower(), {}).get(table.lower())
+        if found is None:
+            return False
+        table, metadata = found
+        with self._generation_lock(schema, table):
+            if self.index.table_json(schema, table) is not None:
+                return True
+            previous = self.index.previous_entry(schema, table)
+            configured_schema, manager, _ = self._schemas[schema.lower()]
+            with run_metrics.span("service_generate"), \
+                    run_metrics.table_namespace(f"{manager.target.name}.{configured_schema}"):
+                for name, rows, result in generate_data_dictionaries(
+                        [(table, metadata)], max_concurrency=1,
+                        previous_snapshot={table: previous} if previous else None,
+                        table_comments=self._comments.get(schema.lower())):
+                    dictionary = extract_table_dictionary(result) if result else {}
+                    if not dictionary:
+                        logger.error(f"Could not generate the dictionary of {schema}.{name}")
+                        return False
+                    self.index.put(self.schema(schema), name, rows, dictionary)
+            return True
+
+    def save(self) -> None:
+        """Writes the entries of every schema to its metadata snapshot."""
+        for schema, _, output_dir in self._schemas.values():
+            os.makedirs(output_dir, exist_ok=True)
+            with SnapshotWriter(self._snapshot_file(schema)) as snapshot_writer:
+                for entry in self.index.tables(schema):
+                    snapshot_writer.add(entry["table"], entry["rows"], entry["dictionary"])
+
+    def close(self) -> None:
+        """Stops the refresher, saves the snapshots and closes the connection pools."""
+        self._stopped.set()
+        if self._refresher is not None:
+            self._refresher.join()
+        self.save()
+        for _, manager, _ in self._schemas.values():
+            manager.close_all()
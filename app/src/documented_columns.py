@@ -0,0 +1,52 @@
+from typing import Dict
+from app.src.prompt_encoding import merge_column_rows
+
+
+def documented_columns(metadata: list) -> Dict[str, dict]:
+    """
+    Returns the columns that already carry a column comment (`pg_description`, MySQL
+    `COLUMN_COMMENT`), keyed by column name. The extractors' foreign key note does not count.
+
+    Args:
+        metadata (list): Metadata rows of one table.
+
+    Returns:
+        Dict[str, dict]: The documented columns in the output format, with their existing description.
+    """
+    rows_by_column: Dict[str, list] = {}
+    for row in metadata:
+        rows_by_column.setdefault(row[1], []).append(row)
+
+    columns = {}
+    for column_name, column_rows in rows_by_column.items():
+        column = merge_column_rows(column_rows)
+        if column["description"] != "NULL":
+            columns[column_name] = column
+    return columns
+
+
+def apply_existing_descriptions(base_dictionary: dict | None, table_name: str,
+                                documented: Dict[str, dict], table_comment: str | None) -> dict:
+    """
+    Builds the table dictionary that the descriptions generated for undocumented columns are merged into.
+
+    Documented columns keep their existing description, overriding those of `base_dictionary`
+    (the previous run's dictionary in incremental mode), and the table comment, if any,
+    becomes the table description.
+
+    Args:
+        base_dictionary (dict | None): The dictionary to start from, or None.
+        table_name (str): Name of the table.
+        documented (Dict[str, dict]): The documented columns, from `documented_columns`.
+        table_comment (str | None): The existing table comment.
+
+    Returns:
+        dict: The table dictionary with the existing descriptions applied.
+    """
+    base = dict(base_dictionary or {"table_name": table_name, "table_description": "", "columns": []})
+    columns = {column.get("column_name"): column for column in base.get("columns", [])}
+    columns.update(documented)
+    base["columns"] = list(columns.values())
+    if table_comment:
+        base["table_description"] = table_comment
+    return base
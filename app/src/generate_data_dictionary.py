@@ -1,20 +1,37 @@
+import contextvars
 import json
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Tuple
+from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from app.src.metadata_extractor import extract_table_metadata
 from app.config.config import Config
-from app.common_utils.llm_selector import LLMSelector
+from app.common_utils.llm_scheduler import ModelLatencyCallback
+from app.common_utils.llm_tiers import ModelTier, get_llm_router
+from app.common_utils.run_metrics import run_metrics
+from app.src.description_cache import DescriptionCache
+from app.src.schema_diff import diff_table_metadata, merge_table_dictionary
+from app.src.prompt_encoding import (
+    column_descriptions, encode_metadata, encoding_stats, estimate_compact_tokens, expand_response,
+    missing_columns)
+from app.src.documented_columns import apply_existing_descriptions, documented_columns
+from app.src.column_reuse import ColumnReuseIndex
+from app.src.structured_output import BatchDescriptions, TableDescriptions, to_response_dict
+from app.src.request_batching import (
+    CHARS_PER_TOKEN, chunk_table_metadata, estimate_tokens, merge_chunk_responses, pack_tables,
+    split_batch_response, summarize_table_metadata)
 from app.common_utils.loggers import logger
 
 # Load configuration values
 SCHEMA_NAME = Config.SCHEMA_NAME
 DOMAIN_NAME = Config.DOMAIN_NAME
 
-# Initialize LLM model
-llm_selector = LLMSelector()
-llm = llm_selector.get_llm_model()
-logger.info(f"Using LLM Model: {llm.__class__.__name__}")
+# The LLMs of the model tiers are built on first use, so fully cached runs never load a provider SDK
+llm_router = get_llm_router()
 
 # Define the prompt template for column descriptions
 COLUMN_DESCRIPTION_PROMPT = PromptTemplate(
@@ -46,29 +63,229 @@ COLUMN_DESCRIPTION_PROMPT = PromptTemplate(
     """
 )
 
+# Define the prompt template for describing several small tables in one request
+MULTI_TABLE_DESCRIPTION_PROMPT = PromptTemplate(
+    input_variables=["metadata_list", "domain_name"],
+    template="""
+    {metadata_list}
+    You are an expert database documenter. This metadata belongs to {domain_name} and covers
+    several tables. First value is table_name, column name, datatype, length, is null, default,
+    primary key, foreign key, constraints, description.
+
+    For **each table**, add a **meaningful, descriptive** description (≤ 255 chars) to each
+    column and generate a **table-level description**.
+
+    - **If a description already exists, do not update it.**
+    - **Do not add anything related to {domain_name} in column or table descriptions.**
+    - **Strictly return JSON format with no extra text, markdown, or formatting artifacts.**
+
+    Return exactly this structure, with one entry per table:
+    {{"tables": [{{"table_name": "...", "table_description": "...", "columns": [
+    {{"column_name": "...", "datatype": "...", "length": "...", "is_null": "...", "default": "...",
+    "primary_key": "...", "foreign_key": "...", "constraints": "...", "description": "..."}}]}}]}}
+
+    **Important Rules:**
+    - Do **not** alter any column except `description`.
+    - Keep every table's columns under that table only.
+    - Replace any empty or `None` values with `"NULL"`.
+    - Ensure that each column is listed only once, with no duplicate column entries.
+
+    Strictly return **only** a valid JSON response.
+    """
+)
+
+# Compact variants of the two prompts above. The metadata is sent as a header plus delimited
+# rows and the LLM only returns descriptions, which are expanded back into the full structure.
+COMPACT_COLUMN_DESCRIPTION_PROMPT = PromptTemplate(
+    input_variables=["metadata_list", "domain_name"],
+    template="""
+    {metadata_list}
+    You are an expert database documenter. This metadata belongs to {domain_name}.
+    After the table name, each line under the header describes one column; fields are separated
+    by `|`, empty fields are NULL, `keys` holds PK/FK flags and `C<n>` refers to a shared constraint.
+
+    Write a **meaningful, descriptive** description (≤ 255 chars) for every column whose
+    description field is empty, and a **table-level description**.
+
+    - **Skip columns that already have a description.**
+    - **Do not add anything related to {domain_name} in column or table descriptions.**
+    - **Strictly return JSON format with no extra text, markdown, or formatting artifacts.**
+
+    Return exactly this structure, using the column names exactly as given and listing each column once:
+    {{"table_description": "...", "columns": [{{"column_name": "...", "description": "..."}}]}}
+
+    Strictly return **only** a valid JSON response.
+    """
+)
+
+COMPACT_MULTI_TABLE_DESCRIPTION_PROMPT = PromptTemplate(
+    input_variables=["metadata_list", "domain_name"],
+    template="""
+    {metadata_list}
+    You are an expert database documenter. This metadata belongs to {domain_name} and covers
+    several tables. Each table starts with its name; each line under the header describes one
+    column; fields are separated by `|`, empty fields are NULL, `keys` holds PK/FK flags and
+    `C<n>` refers to a shared constraint.
+
+    For **each table**, write a **meaningful, descriptive** description (≤ 255 chars) for every
+    column whose description field is empty, and a **table-level description**.
+
+    - **Skip columns that already have a description.**
+    - **Do not add anything related to {domain_name} in column or table descriptions.**
+    - **Strictly return JSON format with no extra text, markdown, or formatting artifacts.**
+
+    Return exactly this structure, with one entry per table, names exactly as given and each
+    column listed once:
+    {{"tables": [{{"table_name": "...", "table_description": "...",
+    "columns": [{{"column_name": "...", "description": "..."}}]}}]}}
+
+    Strictly return **only** a valid JSON response.
+    """
+)
+
+# Define the prompt template for the table-level description of tables split into column chunks
+TABLE_DESCRIPTION_PROMPT = PromptTemplate(
+    input_variables=["table_summary", "domain_name"],
+    template="""
+    {table_summary}
+    You are an expert database documenter. This is a summary of a table that belongs to {domain_name}:
+    the table name followed by its columns, data types and key flags (PK, FK).
+
+    Generate a **meaningful, descriptive** table-level description (≤ 255 chars).
+
+    - **Do not add anything related to {domain_name} in the description.**
+    - **Strictly return JSON format with no extra text, markdown, or formatting artifacts.**
+
+    Return exactly this structure: {{"table_description": "..."}}
+    """
+)
+
 # Define the JSON parser for structured output
 json_parser = JsonOutputParser()
 
+# Compiled `prompt | llm | json_parser` pipelines, built once per prompt and model tier and shared by all tables
+_chains = {}
+_chains_lock = threading.Lock()
+
+# Worker pool for the column chunks of large tables. It is separate from the per-table pool in
+# `generate_data_dictionaries`, so a table waiting on its chunks can never starve them.
+_chunk_executor = None
+_chunk_executor_lock = threading.Lock()
+
+# Description cache, created on first use so `--no-cache` can still disable it
+_description_cache = None
+_description_cache_lock = threading.Lock()
 
-def generate_column_description(metadata: list) -> dict | None:
+# Cross-table column signature index, shared by every schema of the run
+_column_reuse_index = None
+_column_reuse_index_lock = threading.Lock()
+
+
+def get_llm():
+    """Returns the shared LLM, initializing the provider selected by `LLM_MODEL_NAME` on first use."""
+    return llm_router.tiers[0].get_llm()
+
+
+def get_chain(prompt: PromptTemplate, schema: type | None = None, tier: ModelTier | None = None):
+    """
+    Returns the compiled pipeline of `prompt` on the model of `tier` (default: `LLM_MODEL_NAME`),
+    built on first use.
+
+    Without `schema` the pipeline is `prompt | llm | json_parser`. With a pydantic `schema` it
+    uses the model's native structured output (JSON schema or tool calling) instead, and None
+    is returned when the model does not support it.
+
+    The chain and its model client are stateless, so every table and thread reuses the same
+    pipeline and the client's keep-alive connection pool.
+    """
+    tier = tier or llm_router.tiers[0]
+    key = (id(prompt), schema, tier.index)
+    with _chains_lock:
+        if key not in _chains:
+            llm = tier.get_llm()
+            callbacks = [ModelLatencyCallback(tier.scheduler)]
+            if schema is None:
+                _chains[key] = prompt | llm.with_config(callbacks=callbacks) | json_parser
+            else:
+                try:
+                    structured_llm = llm.with_structured_output(schema)
+                    _chains[key] = prompt | structured_llm.with_config(callbacks=callbacks)
+                except NotImplementedError:
+                    logger.info(f"{llm.__class__.__name__} does not support structured output, "
+                                "falling back to parsing JSON responses")
+                    _chains[key] = None
+        return _chains[key]
+
+
+def get_description_cache() -> DescriptionCache | None:
+    """Returns the shared description cache, or None when caching is disabled."""
+    global _description_cache
+    if not Config.CACHE_ENABLED:
+        return None
+    with _description_cache_lock:
+        if _description_cache is None:
+            _description_cache = DescriptionCache.from_config()
+    return _description_cache
+
+
+def close_description_cache() -> None:
+    """Closes the shared description cache, if it was opened."""
+    global _description_cache
+    with _description_cache_lock:
+        if _description_cache is not None:
+            _description_cache.close()
+            _description_cache = None
+
+
+def get_column_reuse_index() -> ColumnReuseIndex | None:
+    """Returns the shared column signature index, or None when column reuse is disabled."""
+    global _column_reuse_index
+    if not Config.COLUMN_REUSE_ENABLED:
+        return None
+    with _column_reuse_index_lock:
+        if _column_reuse_index is None:
+            _column_reuse_index = ColumnReuseIndex(Config.COLUMN_REUSE_SIMILARITY)
+    return _column_reuse_index
+
+
+def log_column_reuse_stats() -> None:
+    """Logs how many column descriptions were reused from the column signature index."""
+    if _column_reuse_index is None:
+        return
+    stats = _column_reuse_index.stats()
+    logger.info(
+        f"Column reuse: {stats['exact_hits']} exact and {stats['near_hits']} near-match hits out of "
+        f"{stats['lookups']} lookups (hit rate {stats['hit_rate']:.1%}), "
+        f"{stats['signatures']} distinct column signatures indexed")
+
+
+def generate_column_description(metadata: list,
+                                prompt: PromptTemplate = COLUMN_DESCRIPTION_PROMPT) -> dict | None:
     """
     Generates meaningful column descriptions based on structured metadata.
 
     Args:
         metadata (list): A list of dictionaries where each dictionary represents column metadata
                         with keys such as 'column_name', 'datatype', 'length', 'is_null', etc.
+        prompt (PromptTemplate): The prompt to send, `COLUMN_DESCRIPTION_PROMPT` for a single table
+                        or `MULTI_TABLE_DESCRIPTION_PROMPT` for a batch of tables.
 
     Returns:
         dict | None: A JSON object containing updated column descriptions, or None in case of failure.
     """
     try:
-        # Initialize LLM chain with prompt, model, and JSON parser
-        llm_chain = LLMChain(llm=llm, prompt=COLUMN_DESCRIPTION_PROMPT, output_parser=json_parser)
+        with run_metrics.span("generate_column_description"):
+            if Config.PROMPT_ENCODING == "compact":
+                return _generate_compact_description(metadata, prompt)
 
-        response = llm_chain.invoke(
-            {"metadata_list": metadata, "domain_name": DOMAIN_NAME})
+            # Completions echo the metadata back, so budget roughly twice the prompt tokens
+            response = llm_router.call(
+                lambda tier: get_chain(prompt, tier=tier).invoke,
+                {"metadata_list": metadata, "domain_name": DOMAIN_NAME},
+                estimated_tokens=2 * estimate_tokens(metadata))
 
-        return response
+        # Keep the `{"text": ...}` envelope of chain outputs that callers and the cache expect
+        return {"text": response}
 
     except json.JSONDecodeError as e:
         logger.error(f"Invalid JSON response from LLM: {e}")
@@ -78,11 +295,221 @@ def generate_column_description(metadata: list) -> dict | None:
         raise e
 
 
+def _active_prompt(prompt: PromptTemplate) -> PromptTemplate:
+    """Returns the compact variant of `prompt` when `PROMPT_ENCODING` is 'compact'."""
+    if Config.PROMPT_ENCODING != "compact":
+        return prompt
+    if prompt is MULTI_TABLE_DESCRIPTION_PROMPT:
+        return COMPACT_MULTI_TABLE_DESCRIPTION_PROMPT
+    return COMPACT_COLUMN_DESCRIPTION_PROMPT
+
+
+def _request_compact_descriptions(metadata: list, multi_table: bool) -> Tuple[str, dict]:
+    """
+    Sends `metadata` in the compact encoding, through the model's structured output when
+    `LLM_STRUCTURED_OUTPUT` is enabled and supported.
+
+    Returns:
+        Tuple[str, dict]: The encoded metadata and the parsed compact response.
+    """
+    compact_prompt = COMPACT_MULTI_TABLE_DESCRIPTION_PROMPT if multi_table else COMPACT_COLUMN_DESCRIPTION_PROMPT
+    encoded = encode_metadata(metadata)
+    schema = BatchDescriptions if multi_table else TableDescriptions
+
+    def invoke(tier: ModelTier):
+        chain = get_chain(compact_prompt, schema, tier) if Config.LLM_STRUCTURED_OUTPUT else None
+        return (chain or get_chain(compact_prompt, tier=tier)).invoke
+
+    response = llm_router.call(
+        invoke, {"metadata_list": encoded, "domain_name": DOMAIN_NAME},
+        estimated_tokens=estimate_compact_tokens(encoded, metadata))
+    return encoded, to_response_dict(response)
+
+
+def _response_tables(response: dict, metadata: list, multi_table: bool) -> Dict[str, dict]:
+    """Maps the table entries of a compact response to the tables in `metadata`."""
+    if not isinstance(response, dict):
+        raise ValueError(f"Expected a JSON object from the LLM, got {type(response).__name__}")
+    if not multi_table:
+        return {metadata[0][0]: response}
+
+    table_names = {row[0] for row in metadata}
+    entries = {}
+    for entry in response.get("tables", []):
+        table_name = entry.get("table_name") if isinstance(entry, dict) else None
+        if table_name not in table_names:
+            logger.warning(f"Ignoring unexpected table '{table_name}' in batch response")
+        elif table_name not in entries:
+            entries[table_name] = entry
+    return entries
+
+
+def _repair_missing_columns(response: dict, metadata: list, multi_table: bool) -> dict:
+    """
+    Validates a compact response against the metadata and re-requests only the columns that
+    came back without a description, up to `LLM_REPAIR_ATTEMPTS` times, instead of
+    regenerating whole tables.
+
+    Returns:
+        dict: The response with each table's descriptions as a `{column: description}` mapping
+            and the repaired descriptions merged in. Tables still absent from a batch response
+            are left out, so the caller falls back to describing them individually.
+    """
+    entries = _response_tables(response, metadata, multi_table)
+    table_names = list(dict.fromkeys(row[0] for row in metadata))
+    tables = {table_name: {"table_name": table_name,
+                           "table_description": entries.get(table_name, {}).get("table_description", ""),
+                           "columns": column_descriptions(entries.get(table_name, {}))}
+              for table_name in table_names}
+    present = set(entries)
+
+    for _ in range(Config.LLM_REPAIR_ATTEMPTS):
+        missing = {table_name: missing_columns(table_name, metadata, table["columns"])
+                   for table_name, table in tables.items()}
+        missing = {table_name: columns for table_name, columns in missing.items() if columns}
+        if not missing:
+            break
+
+        logger.info(f"Re-requesting {sum(len(columns) for columns in missing.values())} missing "
+                    f"column descriptions for {', '.join(missing)}")
+        repair_rows = [row for row in metadata if row[1] in missing.get(row[0], ())]
+        try:
+            _, repair = _request_compact_descriptions(repair_rows, multi_table=len(missing) > 1)
+            repaired = _response_tables(repair, repair_rows, multi_table=len(missing) > 1)
+        except Exception as e:
+            logger.warning(f"Could not repair missing column descriptions: {e}")
+            break
+
+        for table_name, entry in repaired.items():
+            table = tables[table_name]
+            for column_name, description in column_descriptions(entry).items():
+                if column_name in missing[table_name]:
+                    table["columns"].setdefault(column_name, description)
+            table["table_description"] = table["table_description"] or entry.get("table_description", "")
+            present.add(table_name)
+
+    if not multi_table:
+        return tables[table_names[0]]
+    return {"tables": [tables[table_name] for table_name in table_names if table_name in present]}
+
+
+def _generate_compact_description(metadata: list, prompt: PromptTemplate) -> dict:
+    """
+    Sends `metadata` in the compact encoding, repairs missing columns and expands the compact
+    response into the structure `prompt` would have produced.
+    """
+    multi_table = prompt is MULTI_TABLE_DESCRIPTION_PROMPT
+    encoded, response = _request_compact_descriptions(metadata, multi_table)
+    repaired = _repair_missing_columns(response, metadata, multi_table)
+    with run_metrics.span("parse_response"):
+        expanded = expand_response(repaired, metadata, multi_table)
+    encoding_stats.record(
+        prompt.format(metadata_list=metadata, domain_name=DOMAIN_NAME),
+        _active_prompt(prompt).format(metadata_list=encoded, domain_name=DOMAIN_NAME),
+        expanded, response)
+    return {"text": expanded}
+
+
+def _get_chunk_executor() -> ThreadPoolExecutor:
+    """Returns the shared worker pool used for column chunks."""
+    global _chunk_executor
+    with _chunk_executor_lock:
+        if _chunk_executor is None:
+            _chunk_executor = ThreadPoolExecutor(
+                max_workers=Config.LLM_MAX_CONCURRENCY, thread_name_prefix="llm-chunk")
+    return _chunk_executor
+
+
+def generate_table_description(table_name: str, metadata: list) -> str:
+    """
+    Generates the table-level description of a large table from a compact summary of its columns.
+
+    Descriptions are cached under the column summary, domain, prompt and model, so a fully
+    documented table without a table comment is only sent to the LLM once.
+
+    Args:
+        table_name (str): Name of the table.
+        metadata (list): Metadata rows of the table.
+
+    Returns:
+        str: The table description, empty if the LLM returned none.
+    """
+    table_summary = summarize_table_metadata(table_name, metadata)
+    cache = get_description_cache()
+    cache_key = None
+    if cache is not None:
+        cache_key = DescriptionCache.make_key(
+            [(table_summary,)], DOMAIN_NAME, TABLE_DESCRIPTION_PROMPT.template, Config.LLM_MODEL_NAME)
+        cached_output = cache.get(cache_key)
+        if cached_output and cached_output.get("table_description"):
+            logger.info(f"Using cached table description for table: {table_name}")
+            run_metrics.increment("cache_hits")
+            return cached_output["table_description"]
+
+    response = llm_router.call(
+        lambda tier: get_chain(TABLE_DESCRIPTION_PROMPT, tier=tier).invoke,
+        {"table_summary": table_summary, "domain_name": DOMAIN_NAME},
+        estimated_tokens=len(table_summary) // CHARS_PER_TOKEN)
+    table_description = response.get("table_description", "") if isinstance(response, dict) else ""
+    if cache is not None and table_description:
+        cache.put(cache_key, {"table_description": table_description})
+    return table_description
+
+
+def generate_chunked_column_description(table_name: str, metadata: list, chunks: List[list]) -> dict | None:
+    """
+    Describes a large table chunk by chunk, running the chunks and the table-level description in parallel.
+
+    Args:
+        table_name (str): Name of the table.
+        metadata (list): All metadata rows of the table.
+        chunks (List[list]): The table's metadata split into column chunks.
+
+    Returns:
+        dict | None: The merged output in the single-table format, or None if any chunk failed.
+    """
+    logger.info(f"Splitting table {table_name} into {len(chunks)} column chunks")
+    executor = _get_chunk_executor()
+    # Chunks run on other threads; copying the context keeps their LLM calls counted for this table
+    description_future = executor.submit(
+        contextvars.copy_context().run, generate_table_description, table_name, metadata)
+    chunk_futures = [executor.submit(contextvars.copy_context().run, generate_column_description, chunk)
+                     for chunk in chunks]
+
+    chunk_outputs = [future.result() for future in chunk_futures]
+    if not all(chunk_outputs):
+        logger.error(f"{chunk_outputs.count(None)} column chunks failed for table {table_name}")
+        return None
+
+    try:
+        table_description = description_future.result()
+    except Exception as e:
+        logger.warning(f"Could not generate table description for {table_name}: {e}")
+        table_description = ""
+
+    return merge_chunk_responses(table_name, chunk_outputs, table_description)
+
+
+def _cache_key(metadata: list) -> str:
+    """Returns the description cache key of a table's metadata rows."""
+    return DescriptionCache.make_key(
+        metadata, DOMAIN_NAME, _active_prompt(COLUMN_DESCRIPTION_PROMPT).template, Config.LLM_MODEL_NAME)
+
+
+def _cache_output(cache: DescriptionCache | None, metadata: list, llm_output: dict | None) -> None:
+    """Stores a successful single-table output in the description cache."""
+    if cache is not None and isinstance(llm_output, dict) and llm_output.get("text"):
+        cache.put(_cache_key(metadata), {"text": llm_output["text"]})
+
+
 def generate_data_dictionary(table_name: str, metadata: list) -> dict | None:
     """
     Generates a data dictionary for a given table by processing its metadata
     and adding meaningful descriptions.
 
+    Tables whose metadata exceeds `LLM_BATCH_TOKEN_BUDGET` or `LLM_MAX_COLUMNS_PER_REQUEST`
+    are described in parallel column chunks.
+
     Args:
         table_name (str): Name of the table to process.
         metadata (list): A list of dictionaries containing column metadata.
@@ -94,13 +521,282 @@ def generate_data_dictionary(table_name: str, metadata: list) -> dict | None:
         logger.warning(f"No metadata found for table: {table_name}")
         return None
 
+    cache = get_description_cache()
+    if cache is not None:
+        cached_output = cache.get(_cache_key(metadata))
+        if cached_output:
+            logger.info(f"Using cached data dictionary for table: {table_name}")
+            run_metrics.increment("cache_hits")
+            return cached_output
+
     logger.info(f"Generating data dictionary for table: {table_name}")
 
-    llm_output = generate_column_description(metadata)
+    chunks = chunk_table_metadata(
+        metadata, Config.LLM_BATCH_TOKEN_BUDGET, Config.LLM_MAX_COLUMNS_PER_REQUEST)
+    if len(chunks) == 1:
+        llm_output = generate_column_description(metadata)
+    else:
+        llm_output = generate_chunked_column_description(table_name, metadata, chunks)
 
     if llm_output:
         logger.info(f"Successfully generated data dictionary for {table_name}")
+        _cache_output(cache, metadata, llm_output)
     else:
         logger.error(f"Failed to generate data dictionary for {table_name}")
 
     return llm_output
+
+
+def generate_batch_data_dictionary(tables: List[Tuple[str, list]]) -> Dict[str, dict | None]:
+    """
+    Generates data dictionaries for several small tables with a single LLM request.
+
+    Cached tables are served from the description cache. Tables missing from the batch
+    response are retried individually.
+
+    Args:
+        tables (List[Tuple[str, list]]): The table names and their metadata rows.
+
+    Returns:
+        Dict[str, dict | None]: Mapping of table name to its output in the single-table format.
+    """
+    cache = get_description_cache()
+    outputs = {}
+    pending = []
+    for table_name, metadata in tables:
+        cached_output = cache.get(_cache_key(metadata)) if cache is not None and metadata else None
+        if cached_output:
+            logger.info(f"Using cached data dictionary for table: {table_name}")
+            run_metrics.increment("cache_hits")
+            outputs[table_name] = cached_output
+        else:
+            pending.append((table_name, metadata))
+
+    if len(pending) > 1:
+        table_names = [table_name for table_name, _ in pending]
+        logger.info(f"Generating data dictionaries for batch of tables: {', '.join(table_names)}")
+        batch_metadata = [row for _, metadata in pending for row in metadata]
+        response = generate_column_description(
+            batch_metadata, prompt=MULTI_TABLE_DESCRIPTION_PROMPT)
+        batch_outputs = split_batch_response(response, table_names) if response else {}
+        for table_name, metadata in pending:
+            if table_name in batch_outputs:
+                outputs[table_name] = batch_outputs[table_name]
+                _cache_output(cache, metadata, batch_outputs[table_name])
+
+    for table_name, metadata in pending:
+        if table_name not in outputs:
+            outputs[table_name] = generate_data_dictionary(table_name, metadata)
+
+    return outputs
+
+
+def extract_table_dictionary(result: dict | str) -> dict:
+    """
+    Extracts the table dictionary (`table_name`, `table_description`, `columns`) from an LLM output.
+
+    Args:
+        result (dict | str): The chain output, or its raw JSON text.
+
+    Returns:
+        dict: The table dictionary, empty if the response contained none.
+
+    Raises:
+        ValueError: If the response is neither a dict nor a JSON string.
+    """
+    if isinstance(result, str):
+        cleaned_result = re.sub(
+            r'```json|```|"Raw Result: ', '', result).strip()
+        structured_data = json.loads(cleaned_result)
+    elif isinstance(result, dict):
+        structured_data = result
+    else:
+        raise ValueError(f"Unexpected response type: {type(result)}")
+
+    return structured_data.get('text', {})
+
+
+def _plan_tables(metadata_by_table: dict | Iterable[Tuple[str, list]],
+                 previous_snapshot: dict | None,
+                 table_comments: Dict[str, str] | None = None) -> Iterator[tuple]:
+    """
+    Determines which metadata rows of each table need to be sent to the LLM.
+
+    Accepts either a mapping of table name to rows or a stream of `(table_name, rows)` pairs.
+    When running incrementally, only columns changed since the previous snapshot are sent. With
+    `SKIP_DOCUMENTED_COLUMNS`, columns that already have a description are never sent. With
+    `COLUMN_REUSE_ENABLED`, columns whose signature was already described in an earlier table
+    reuse that description.
+
+    Yields:
+        tuple: `(table_name, metadata, rows_to_send, base_dictionary)`, where `base_dictionary` holds
+            the descriptions that are not regenerated (from the previous snapshot or the database's
+            existing comments), or None when the whole table is sent.
+    """
+    items = metadata_by_table.items() if isinstance(metadata_by_table, dict) else metadata_by_table
+    for table_name, metadata in items:
+        previous_entry = previous_snapshot.get(table_name) if previous_snapshot else None
+        if previous_entry and previous_entry.get("dictionary"):
+            base_dictionary = previous_entry["dictionary"]
+            rows_to_send = diff_table_metadata(previous_entry.get("rows", []), metadata)
+        else:
+            base_dictionary, rows_to_send = None, metadata
+
+        if Config.SKIP_DOCUMENTED_COLUMNS:
+            documented = documented_columns(metadata)
+            table_comment = (table_comments or {}).get(table_name)
+            if documented or table_comment:
+                rows_to_send = [row for row in rows_to_send if row[1] not in documented]
+                base_dictionary = apply_existing_descriptions(
+                    base_dictionary, table_name, documented, table_comment)
+
+        reuse_index = get_column_reuse_index()
+        if reuse_index is not None and rows_to_send:
+            reused = reuse_index.reuse_descriptions(rows_to_send)
+            if reused:
+                rows_to_send = [row for row in rows_to_send if row[1] not in reused]
+                base_dictionary = apply_existing_descriptions(base_dictionary, table_name, reused, None)
+
+        yield table_name, metadata, rows_to_send, base_dictionary
+
+
+def _generate_batch_safe(batch: List[tuple]) -> Dict[str, dict | None]:
+    """
+    Generates the data dictionaries of a batch of planned tables, logging and swallowing errors
+    so one batch cannot stop the run.
+
+    Tables with a base dictionary only have their remaining columns described; the other
+    descriptions are merged in from the base dictionary. Tables left without a table
+    description get one from a compact column summary.
+    """
+    table_names = [item[0] for item in batch]
+    try:
+        to_send = [(table_name, rows_to_send)
+                   for table_name, _, rows_to_send, base_dictionary in batch
+                   if rows_to_send or base_dictionary is None]
+        if len(to_send) == 1:
+            outputs = {to_send[0][0]: generate_data_dictionary(*to_send[0])}
+        elif to_send:
+            outputs = generate_batch_data_dictionary(to_send)
+        else:
+            outputs = {}
+
+        results = {}
+        for table_name, metadata, rows_to_send, base_dictionary in batch:
+            if base_dictionary is None:
+                results[table_name] = outputs.get(table_name)
+                continue
+
+            partial_dictionary = None
+            if rows_to_send:
+                if not outputs.get(table_name):
+                    results[table_name] = None
+                    continue
+                logger.info(
+                    f"Described {len(rows_to_send)} undocumented or changed metadata rows for table: {table_name}")
+                with run_metrics.span("parse_response"):
+                    partial_dictionary = extract_table_dictionary(outputs[table_name])
+            else:
+                logger.info(
+                    f"All columns of table {table_name} are already described, skipping the LLM")
+
+            table_dictionary = merge_table_dictionary(base_dictionary, partial_dictionary, metadata)
+            if not table_dictionary["table_description"]:
+                try:
+                    table_dictionary["table_description"] = generate_table_description(table_name, metadata)
+                except Exception as e:
+                    logger.warning(f"Could not generate table description for {table_name}: {e}")
+            results[table_name] = {"text": table_dictionary}
+
+        reuse_index = get_column_reuse_index()
+        if reuse_index is not None:
+            for table_name, metadata, _, _ in batch:
+                if results.get(table_name):
+                    reuse_index.learn(metadata, extract_table_dictionary(results[table_name]))
+        return results
+
+    except Exception as e:
+        logger.error(
+            f"Error generating data dictionary for {', '.join(table_names)}: {e}", exc_info=True)
+        return {}
+
+
+def _generate_batch_measured(batch: List[tuple]) -> Dict[str, dict | None]:
+    """
+    Runs `_generate_batch_safe` and records the rows sent, LLM calls, retries, tokens, time and
+    serving model tier (0 = no LLM request) of each table. The counters of a multi-table request are apportioned by the rows each table sent.
+    """
+    started = time.perf_counter()
+    with run_metrics.table_scope() as batch_counters:
+        results = _generate_batch_safe(batch)
+    seconds = time.perf_counter() - started
+    run_metrics.record_span("generate_batch", seconds)
+
+    rows_sent = sum(len(item[2]) for item in batch)
+    for table_name, metadata, rows_to_send, _ in batch:
+        share = len(rows_to_send) / rows_sent if rows_sent else 1 / len(batch)
+        run_metrics.record_table(
+            table_name, columns=len({row[1] for row in metadata}), rows_sent=len(rows_to_send),
+            batch_tables=len(batch), seconds=round(seconds, 4), failed=0 if results.get(table_name) else 1,
+            tier=llm_router.record_table(batch_counters),
+            **{counter: round(value * share, 2) for counter, value in batch_counters.items()})
+    return results
+
+
+def generate_data_dictionaries(metadata_by_table: dict | Iterable[Tuple[str, list]],
+                               max_concurrency: int = Config.LLM_MAX_CONCURRENCY,
+                               previous_snapshot: dict | None = None,
+                               table_comments: Dict[str, str] | None = None
+                               ) -> Iterator[Tuple[str, list, dict | None]]:
+    """
+    Generates data dictionaries for every table, running up to `max_concurrency` LLM calls at once.
+
+    Consecutive small tables are packed into multi-table requests up to `LLM_BATCH_TOKEN_BUDGET`.
+    Results are yielded in the iteration order of `metadata_by_table`, regardless of the order
+    in which the LLM calls complete, so the output file stays deterministic. At most
+    `2 * max_concurrency` requests are in flight, which bounds the number of results held in memory
+    and lets a streamed `metadata_by_table` be consumed lazily.
+
+    Args:
+        metadata_by_table (dict | Iterable[Tuple[str, list]]): Mapping of table name to its list of
+            metadata rows, or a stream of `(table_name, rows)` pairs.
+        max_concurrency (int): Maximum number of concurrent LLM calls (1 = sequential).
+        previous_snapshot (dict | None): Metadata snapshot of the previous run. When given, only
+            added or altered columns are sent to the LLM.
+        table_comments (Dict[str, str] | None): Existing table comments, used as the table
+            description instead of generating one.
+
+    Yields:
+        Tuple[str, list, dict | None]: The table name, its metadata rows and its LLM output, or None
+            if the generation failed.
+    """
+    batches = pack_tables(_plan_tables(metadata_by_table, previous_snapshot, table_comments),
+                          Config.LLM_BATCH_TOKEN_BUDGET)
+
+    if max_concurrency <= 1:
+        for batch in batches:
+            results = _generate_batch_measured(batch)
+            for item in batch:
+                yield item[0], item[1], results.get(item[0])
+        return
+
+    logger.info(f"Generating data dictionaries with concurrency {max_concurrency}")
+    window = 2 * max_concurrency
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max_concurrency,
+                            thread_name_prefix="llm-worker") as executor:
+        for batch in batches:
+            # Copied so the worker records the batch's tables in the caller's metrics namespace
+            pending.append((batch, executor.submit(
+                contextvars.copy_context().run, _generate_batch_measured, batch)))
+            if len(pending) >= window:
+                done_batch, future = pending.popleft()
+                results = future.result()
+                for item in done_batch:
+                    yield item[0], item[1], results.get(item[0])
+
+        while pending:
+            done_batch, future = pending.popleft()
+            results = future.result()
+            for item in done_batch:
+                yield item[0], item[1], results.get(item[0])
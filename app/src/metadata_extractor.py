@@ -1,28 +1,113 @@
 from app.database.db_factory import get_db_instance
 from app.common_utils.loggers import logger
+from app.common_utils.run_metrics import run_metrics
+import queue
+import threading
 from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Tuple
 
 
-def extract_table_metadata(conn, schema_name: str) -> dict:
+def extract_table_metadata(conn, schema_name: str, dbms: str = None) -> dict:
     """
     Extracts metadata for all tables in a given schema.
 
     Args:
         conn: Database connection object.
         schema_name (str): The name of the schema to extract metadata from.
+        dbms (str, optional): The DBMS behind `conn`. Defaults to `Config.DBMS`.
 
     Returns:
         dict: A dictionary where keys are table names and values are lists of metadata rows.
     """
-    db_instance = get_db_instance()
+    db_instance = get_db_instance(dbms)
     logger.info(
         f"Extracting metadata for {schema_name} using {db_instance.__class__.__name__}")
 
-    rows = db_instance.fetch_metadata(conn, schema_name)
+    with run_metrics.span("extract_table_metadata"):
+        with run_metrics.span("fetch_metadata"):
+            rows = db_instance.fetch_metadata(conn, schema_name)
 
-    metadata_by_table = defaultdict(list)
-    for row in rows:
-        table_name = row[0]
-        metadata_by_table[table_name].append(row)
+        metadata_by_table = defaultdict(list)
+        for row in rows:
+            table_name = row[0]
+            metadata_by_table[table_name].append(row)
 
+    run_metrics.increment("metadata_rows", len(rows))
+    run_metrics.increment("tables_extracted", len(metadata_by_table))
     return metadata_by_table
+
+
+def stream_table_metadata(conn, schema_name: str, dbms: str = None) -> Iterator[Tuple[str, List[Tuple[Any, ...]]]]:
+    """
+    Streams metadata for all tables in a given schema, one table at a time.
+
+    Unlike `extract_table_metadata`, rows are read through a server-side cursor and handed
+    over as soon as a table is complete, so generation starts before the catalog query has
+    finished. A reader thread drains the cursor at the database's pace and buffers the complete
+    tables, so the cursor is not held open while the LLM stage catches up.
+
+    Args:
+        conn: Database connection object.
+        schema_name (str): The name of the schema to extract metadata from.
+        dbms (str, optional): The DBMS behind `conn`. Defaults to `Config.DBMS`.
+
+    Yields:
+        Tuple[str, List[Tuple[Any, ...]]]: A table name and its metadata rows.
+
+    Raises:
+        Exception: The error that ended the stream, so a partial schema is never finalized.
+    """
+    db_instance = get_db_instance(dbms)
+    logger.info(
+        f"Streaming metadata for {schema_name} using {db_instance.__class__.__name__}")
+
+    tables = queue.Queue()
+    stopped = threading.Event()
+
+    def read_stream() -> None:
+        stream = db_instance.stream_metadata(conn, schema_name)
+        try:
+            for item in stream:
+                tables.put(item)
+                if stopped.is_set():
+                    break
+            tables.put(None)
+        except Exception as err:
+            tables.put(err)
+        finally:
+            stream.close()
+
+    reader = threading.Thread(target=read_stream, name="metadata-stream", daemon=True)
+    reader.start()
+    try:
+        while True:
+            # Each span covers the wait for the next complete table
+            with run_metrics.span("fetch_metadata"):
+                item = tables.get()
+            if item is None:
+                return
+            if isinstance(item, Exception):
+                raise item
+            run_metrics.increment("metadata_rows", len(item[1]))
+            run_metrics.increment("tables_extracted")
+            yield item
+    finally:
+        # The caller may hand `conn` back to its pool once the stream is closed
+        stopped.set()
+        reader.join()
+
+
+def extract_table_comments(conn, schema_name: str, dbms: str = None) -> Dict[str, str]:
+    """
+    Extracts the existing comments of the tables in a given schema.
+
+    Args:
+        conn: Database connection object.
+        schema_name (str): The name of the schema to extract table comments from.
+        dbms (str, optional): The DBMS behind `conn`. Defaults to `Config.DBMS`.
+
+    Returns:
+        Dict[str, str]: The comment of each commented table, keyed by table name.
+    """
+    db_instance = get_db_instance(dbms)
+    return db_instance.fetch_table_comments(conn, schema_name)
@@ -0,0 +1,293 @@
+import json
+import threading
+from typing import Dict, List
+from app.common_utils.loggers import logger
+from app.src.request_batching import CHARS_PER_TOKEN
+
+# Header of the compact encoding; one `|`-separated line per column follows it
+COMPACT_HEADER = "column|type|length|not_null|default|keys|constraints|description"
+FIELD_DELIMITER = "|"
+
+# Constraint and default expressions longer than this are truncated in the prompt only
+MAX_EXPRESSION_CHARS = 120
+
+# Approximate completion tokens of one column description in the compact response
+OUTPUT_TOKENS_PER_COLUMN = 40
+
+# Prefix of the note the extractors put in the description of uncommented foreign key columns
+FOREIGN_KEY_NOTE = "Foreign key for "
+
+
+def _field(value) -> str:
+    """Renders a metadata value as a single delimiter-safe prompt field, empty for NULLs."""
+    if value is None:
+        return ""
+    text = " ".join(str(value).split())
+    if text.upper() in ("NULL", "NONE"):
+        return ""
+    return text.replace(FIELD_DELIMITER, "/")
+
+
+def _truncate(text: str) -> str:
+    return text if len(text) <= MAX_EXPRESSION_CHARS else text[:MAX_EXPRESSION_CHARS - 3] + "..."
+
+
+def catalog_comment(value) -> str:
+    """Returns the column comment in a description field, empty for NULLs and the extractors' foreign key note."""
+    text = _field(value)
+    return "" if text.startswith(FOREIGN_KEY_NOTE) else text
+
+
+def _column_constraints(column_rows: list) -> List[str]:
+    """
+    Returns the distinct constraint expressions of one column. The target of the extractors'
+    foreign key note is added as `REFERENCES <table>` when no constraint names it already.
+    """
+    constraints = list(dict.fromkeys(_field(row[8]) for row in column_rows if _field(row[8])))
+    if not any("REFERENCES " in constraint for constraint in constraints):
+        targets = dict.fromkeys(_field(row[9])[len(FOREIGN_KEY_NOTE):] for row in column_rows
+                                if _field(row[9]).startswith(FOREIGN_KEY_NOTE))
+        constraints.extend(f"REFERENCES {target}" for target in targets)
+    return constraints
+
+
+def _group_rows(metadata: list) -> Dict[str, Dict[str, list]]:
+    """Groups metadata rows by table and then by column, preserving their order."""
+    tables: Dict[str, Dict[str, list]] = {}
+    for row in metadata:
+        tables.setdefault(row[0], {}).setdefault(row[1], []).append(row)
+    return tables
+
+
+def merge_column_rows(column_rows: list) -> dict:
+    """
+    Folds the rows of one column (one per key or constraint it takes part in) into a single column.
+
+    Only column comments count as an existing description; the extractors' foreign key note
+    becomes a `REFERENCES` constraint instead.
+
+    Returns:
+        dict: The column in the output format, with the column's existing description if any.
+    """
+    first = column_rows[0]
+    constraints = _column_constraints(column_rows)
+    description = next((row[9] for row in column_rows if catalog_comment(row[9])), None)
+
+    return {
+        "column_name": first[1],
+        "datatype": first[2] if first[2] is not None else "NULL",
+        "length": first[3] if first[3] is not None else "NULL",
+        "is_null": first[4] if first[4] is not None else "NULL",
+        "default": first[5] if _field(first[5]) else "NULL",
+        "primary_key": "Yes" if any(row[6] == "Yes" for row in column_rows) else "No",
+        "foreign_key": "Yes" if any(row[7] == "Yes" for row in column_rows) else "No",
+        "constraints": "; ".join(constraints) or "NULL",
+        "description": description or "NULL",
+    }
+
+
+def encode_metadata(metadata: list) -> str:
+    """
+    Serializes metadata rows into the compact prompt format.
+
+    Each table is introduced once by a `table <name>` line, followed by `COMPACT_HEADER` and one
+    line per column. NULL and default values are left empty, long expressions are truncated, and
+    constraint expressions shared by several columns are listed once at the end as `C<n>=...`.
+
+    Args:
+        metadata (list): Metadata rows of one or more tables.
+
+    Returns:
+        str: The compact encoding.
+    """
+    tables = _group_rows(metadata)
+
+    # Constraint expressions used by more than one column are replaced by a reference
+    usage: Dict[str, int] = {}
+    for columns in tables.values():
+        for column_rows in columns.values():
+            for constraint in set(_column_constraints(column_rows)):
+                usage[constraint] = usage.get(constraint, 0) + 1
+    shared = {constraint: f"C{index}" for index, constraint in
+              enumerate((c for c, count in usage.items() if count > 1), start=1)}
+
+    lines: List[str] = []
+    for table_name, columns in tables.items():
+        lines.append(f"table {table_name}")
+        lines.append(COMPACT_HEADER)
+        for column_rows in columns.values():
+            column = merge_column_rows(column_rows)
+            keys = " ".join(flag for flag, key in (("PK", "primary_key"), ("FK", "foreign_key"))
+                            if column[key] == "Yes")
+            constraints = [shared.get(constraint) or _truncate(constraint)
+                           for constraint in _column_constraints(column_rows)]
+            lines.append(FIELD_DELIMITER.join((
+                _field(column["column_name"]),
+                _field(column["datatype"]),
+                _field(column["length"]),
+                "Y" if str(column["is_null"]).upper() == "NO" else "",
+                _truncate(_field(column["default"])),
+                keys,
+                "; ".join(constraints),
+                _field(column["description"]),
+            )))
+
+    if shared:
+        lines.append("shared constraints:")
+        lines.extend(f"{reference}={_truncate(constraint)}" for constraint, reference in shared.items())
+    return "\n".join(lines)
+
+
+def estimate_compact_tokens(encoded: str, metadata: list) -> int:
+    """Estimates the prompt and completion tokens of a compact request."""
+    columns = sum(len(columns) for columns in _group_rows(metadata).values())
+    return len(encoded) // CHARS_PER_TOKEN + OUTPUT_TOKENS_PER_COLUMN * columns
+
+
+def column_descriptions(compact_table: dict) -> Dict[str, str]:
+    """
+    Returns the generated descriptions of a compact table response by column name.
+
+    Accepts the `[{"column_name": ..., "description": ...}]` list the prompts and the structured
+    output schema ask for, as well as a `{"<column>": "<description>"}` mapping. A column listed
+    more than once keeps its first non-empty description.
+    """
+    columns = compact_table.get("columns") if isinstance(compact_table, dict) else None
+    if isinstance(columns, dict):
+        pairs = list(columns.items())
+    elif isinstance(columns, list):
+        pairs = [(column.get("column_name"), column.get("description"))
+                 for column in columns if isinstance(column, dict)]
+    else:
+        pairs = []
+
+    descriptions: Dict[str, str] = {}
+    duplicates = set()
+    for column_name, description in pairs:
+        if not column_name or not description:
+            continue
+        if column_name in descriptions:
+            duplicates.add(column_name)
+            continue
+        descriptions[column_name] = str(description)
+
+    if duplicates:
+        logger.warning(f"LLM response lists columns more than once: {', '.join(sorted(map(str, duplicates)))}")
+    return descriptions
+
+
+def missing_columns(table_name: str, metadata: list, descriptions: Dict[str, str]) -> List[str]:
+    """Returns the columns of `table_name` that have neither an existing nor a generated description."""
+    return [column_name for column_name, column_rows in _group_rows(metadata).get(table_name, {}).items()
+            if not any(catalog_comment(row[9]) for row in column_rows) and not descriptions.get(column_name)]
+
+
+def expand_table(table_name: str, metadata: list, compact_table: dict) -> dict:
+    """
+    Expands a compact table response into the full table dictionary.
+
+    Every field except the descriptions is rebuilt from the metadata rows, so the LLM only has
+    to return the descriptions. Existing column descriptions are always kept.
+
+    Args:
+        table_name (str): Name of the table.
+        metadata (list): Metadata rows of the table.
+        compact_table (dict): `{"table_description": "...", "columns": [{"column_name": ..., "description": ...}]}`.
+
+    Returns:
+        dict: `{"table_name", "table_description", "columns": [...]}`.
+    """
+    descriptions = column_descriptions(compact_table)
+
+    columns = []
+    missing = 0
+    for column_rows in _group_rows(metadata).get(table_name, {}).values():
+        column = merge_column_rows(column_rows)
+        if column["description"] == "NULL":
+            generated = descriptions.get(column["column_name"])
+            if generated:
+                column["description"] = str(generated)
+            else:
+                missing += 1
+        columns.append(column)
+
+    if missing:
+        logger.warning(f"LLM response has no description for {missing} columns of table {table_name}")
+
+    return {"table_name": table_name,
+            "table_description": compact_table.get("table_description", "")
+            if isinstance(compact_table, dict) else "",
+            "columns": columns}
+
+
+def expand_response(response: dict, metadata: list, multi_table: bool) -> dict:
+    """
+    Expands a compact LLM response into the structure of the full-size prompts.
+
+    Args:
+        response (dict): The parsed compact response.
+        metadata (list): The metadata rows sent in the request.
+        multi_table (bool): Whether the request was a multi-table batch (`{"tables": [...]}`).
+
+    Returns:
+        dict: A single table dictionary, or `{"tables": [...]}` for a batch.
+
+    Raises:
+        ValueError: If the response is not a JSON object.
+    """
+    if not isinstance(response, dict):
+        raise ValueError(f"Expected a JSON object from the LLM, got {type(response).__name__}")
+
+    if not multi_table:
+        return expand_table(metadata[0][0], metadata, response)
+
+    table_names = set(_group_rows(metadata))
+    tables = []
+    for compact_table in response.get("tables", []):
+        table_name = compact_table.get("table_name") if isinstance(compact_table, dict) else None
+        if table_name not in table_names:
+            logger.warning(f"Ignoring unexpected table '{table_name}' in batch response")
+            continue
+        tables.append(expand_table(table_name, metadata, compact_table))
+    return {"tables": tables}
+
+
+class EncodingStats:
+    """Thread-safe tally of the tokens saved by the compact encoding, estimated with `CHARS_PER_TOKEN`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.input_tokens = 0
+        self.input_tokens_saved = 0
+        self.output_tokens = 0
+        self.output_tokens_saved = 0
+
+    def record(self, full_prompt: str, compact_prompt: str, full_output: dict, compact_output: dict) -> None:
+        """Records one request, comparing the compact prompt and response with their full-size equivalents."""
+        full_output_chars = len(json.dumps(full_output, default=str))
+        compact_output_chars = len(json.dumps(compact_output, default=str))
+        with self._lock:
+            self.requests += 1
+            self.input_tokens += len(compact_prompt) // CHARS_PER_TOKEN
+            self.input_tokens_saved += (len(full_prompt) - len(compact_prompt)) // CHARS_PER_TOKEN
+            self.output_tokens += compact_output_chars // CHARS_PER_TOKEN
+            self.output_tokens_saved += (full_output_chars - compact_output_chars) // CHARS_PER_TOKEN
+
+    def log(self) -> None:
+        """Logs the estimated token savings of the run."""
+        with self._lock:
+            if not self.requests:
+                return
+            logger.info(
+                f"Compact prompt encoding over {self.requests} requests: "
+                f"~{self.input_tokens} input tokens ({self.input_tokens_saved} saved), "
+                f"~{self.output_tokens} output tokens ({self.output_tokens_saved} saved)")
+
+
+encoding_stats = EncodingStats()
+
+
+def log_encoding_stats() -> None:
+    """Logs the estimated tokens saved by the compact encoding during this run."""
+    encoding_stats.log()
@@ -0,0 +1,139 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Iterable
+from app.config.config import Config
+from app.src.work_queue import WorkQueue
+from app.src.generate_data_dictionary import (
+    DOMAIN_NAME, close_description_cache, extract_table_dictionary, generate_data_dictionaries)
+from app.common_utils.llm_scheduler import log_scheduler_stats
+from app.common_utils.loggers import logger
+
+
+def default_worker_id() -> str:
+    """Returns an id that is unique across hosts: `<hostname>-<pid>`."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaseKeeper:
+    """Renews the leases of the jobs a worker holds from a background thread, every third of the lease."""
+
+    def __init__(self, queue: WorkQueue, worker: str) -> None:
+        self.queue = queue
+        self.worker = worker
+        self._tables = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-keeper", daemon=True)
+        self._thread.start()
+
+    def hold(self, tables: Iterable[str]) -> None:
+        with self._lock:
+            self._tables.update(tables)
+
+    def release(self, table: str) -> None:
+        with self._lock:
+            self._tables.discard(table)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.queue.lease_seconds / 3):
+            with self._lock:
+                tables = list(self._tables)
+            if not tables:
+                continue
+            try:
+                self.queue.renew(self.worker, tables)
+            except sqlite3.Error as err:
+                logger.warning(f"Could not renew the leases of worker {self.worker}: {err}")
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+
+def run_worker(queue_path: str, worker_id: str | None = None) -> int:
+    """
+    Documents tables claimed from a work queue until the coordinator's job is finished.
+
+    Claims `WORK_QUEUE_CLAIM_SIZE` tables at a time and generates them with the worker's own LLM
+    settings (`LLM_MODEL_NAME`, `API_KEY`, `LLM_MAX_CONCURRENCY`, rate limits, ...), so every
+    worker adds one more API key's throughput. Leases are renewed while the tables are in flight;
+    a table whose response is empty or invalid is released for another attempt.
+
+    Args:
+        queue_path (str): Path of the coordinator's queue file. The worker waits until it exists.
+        worker_id (str | None): Id recorded on claimed jobs, `<hostname>-<pid>` by default.
+
+    Returns:
+        int: The number of tables this worker documented.
+    """
+    worker_id = worker_id or default_worker_id()
+    if not os.path.exists(queue_path):
+        logger.info(f"Worker {worker_id} waiting for work queue {queue_path}")
+        while not os.path.exists(queue_path):
+            time.sleep(Config.WORK_QUEUE_POLL_SECONDS)
+
+    queue = WorkQueue.from_config(queue_path)
+    keeper = LeaseKeeper(queue, worker_id)
+    completed = failed = 0
+    try:
+        logger.info(f"Worker {worker_id} started on work queue {queue_path}")
+        while True:
+            jobs = queue.claim(worker_id, Config.WORK_QUEUE_CLAIM_SIZE)
+            if not jobs:
+                if queue.is_finished():
+                    break
+                time.sleep(Config.WORK_QUEUE_POLL_SECONDS)
+                continue
+
+            coordinator_domain = queue.setting("domain_name")
+            if coordinator_domain is not None and coordinator_domain != DOMAIN_NAME:
+                logger.warning(f"Worker {worker_id} uses DOMAIN_NAME {DOMAIN_NAME!r}, "
+                               f"the coordinator {coordinator_domain!r}")
+            keeper.hold(table for table, _, _ in jobs)
+            previous_snapshot = {table: previous for table, _, previous in jobs if previous}
+            for table, metadata, result in generate_data_dictionaries(
+                    [(table, rows) for table, rows, _ in jobs], previous_snapshot=previous_snapshot or None,
+                    table_comments=queue.setting("table_comments")):
+                try:
+                    dictionary = extract_table_dictionary(result) if result else {}
+                except ValueError as err:
+                    logger.error(f"Invalid LLM response for table {table}: {err}")
+                    dictionary = {}
+
+                if dictionary:
+                    queue.complete(worker_id, table, dictionary)
+                    completed += 1
+                else:
+                    queue.fail(worker_id, table, "empty or invalid LLM response")
+                    failed += 1
+                keeper.release(table)
+    finally:
+        keeper.stop()
+        queue.close()
+
+    logger.info(f"Worker {worker_id} finished: {completed} tables documented, {failed} failed attempts")
+    return completed
+
+
+def run_local_worker(queue_path: str, worker_id: str, config_overrides: dict | None = None) -> None:
+    """
+    Entry point of the worker processes the coordinator starts with `WORK_QUEUE_LOCAL_WORKERS`.
+
+    Args:
+        queue_path (str): Path of the coordinator's queue file.
+        worker_id (str): Id recorded on claimed jobs.
+        config_overrides (dict | None): `Config` settings of the coordinator, applied before any work
+            so command line options such as `--no-cache` also hold in the spawned process.
+    """
+    for key, value in (config_overrides or {}).items():
+        setattr(Config, key, value)
+    try:
+        run_worker(queue_path, worker_id)
+    except Exception as err:
+        logger.exception(f"Worker {worker_id} failed: {err}")
+    finally:
+        close_description_cache()
+        log_scheduler_stats()
@@ -0,0 +1,167 @@
+from typing import Iterable, Iterator, List
+from app.common_utils.loggers import logger
+
+# Rough characters-per-token ratio used to estimate prompt sizes without a tokenizer
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(metadata: list) -> int:
+    """
+    Estimates the number of prompt tokens used by a list of metadata rows.
+
+    Args:
+        metadata (list): Metadata rows, serialized into the prompt as their Python representation.
+
+    Returns:
+        int: The approximate token count.
+    """
+    return len(str(metadata)) // CHARS_PER_TOKEN + 1
+
+
+def pack_tables(items: Iterable[tuple], token_budget: int) -> Iterator[List[tuple]]:
+    """
+    Groups consecutive work items into requests whose metadata fits within `token_budget`.
+
+    Each item is a tuple whose first element is the table name and whose third element is the
+    list of metadata rows to send to the LLM. Items are packed greedily in order, so the batches
+    are deterministic; an item larger than the budget is placed in a batch of its own.
+
+    Args:
+        items (Iterable[tuple]): Work items `(table_name, metadata, rows_to_send, ...)`.
+        token_budget (int): Maximum estimated metadata tokens per request. 0 disables packing.
+
+    Yields:
+        List[tuple]: Batches of work items.
+    """
+    batch, batch_tokens = [], 0
+    for item in items:
+        tokens = estimate_tokens(item[2]) if item[2] else 0
+        if batch and (token_budget <= 0 or batch_tokens + tokens > token_budget):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(item)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def chunk_table_metadata(metadata: list, token_budget: int, max_columns: int = 0) -> List[list]:
+    """
+    Splits the metadata rows of a large table into column chunks that fit within `token_budget`
+    and hold at most `max_columns` columns.
+
+    Rows of the same column are always kept in the same chunk.
+
+    Args:
+        metadata (list): Metadata rows of a single table.
+        token_budget (int): Maximum estimated metadata tokens per chunk. 0 disables the token limit.
+        max_columns (int): Maximum number of columns per chunk. 0 disables the column limit.
+
+    Returns:
+        List[list]: The chunks, in column order.
+    """
+    columns = _group_rows_by_column(metadata)
+    over_budget = token_budget > 0 and estimate_tokens(metadata) > token_budget
+    over_columns = max_columns > 0 and len(columns) > max_columns
+    if not over_budget and not over_columns:
+        return [metadata]
+
+    chunks, chunk, chunk_tokens, chunk_columns = [], [], 0, 0
+    for column_rows in columns:
+        tokens = estimate_tokens(column_rows)
+        if chunk and ((token_budget > 0 and chunk_tokens + tokens > token_budget)
+                      or (max_columns > 0 and chunk_columns >= max_columns)):
+            chunks.append(chunk)
+            chunk, chunk_tokens, chunk_columns = [], 0, 0
+        chunk.extend(column_rows)
+        chunk_tokens += tokens
+        chunk_columns += 1
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def summarize_table_metadata(table_name: str, metadata: list, max_columns: int = 200) -> str:
+    """
+    Builds a compact one-line-per-table summary used to describe a large table as a whole.
+
+    Args:
+        table_name (str): Name of the table.
+        metadata (list): Metadata rows of the table.
+        max_columns (int): Maximum number of columns listed in the summary.
+
+    Returns:
+        str: The table name followed by its column names, data types and key flags.
+    """
+    columns = []
+    for column_rows in _group_rows_by_column(metadata):
+        row = column_rows[0]
+        flags = "".join(
+            flag for flag, is_set in ((" PK", any(r[6] == "Yes" for r in column_rows)),
+                                      (" FK", any(r[7] == "Yes" for r in column_rows)))
+            if is_set)
+        columns.append(f"{row[1]} {row[2]}{flags}")
+
+    summary = ", ".join(columns[:max_columns])
+    if len(columns) > max_columns:
+        summary += f", ... ({len(columns) - max_columns} more columns)"
+    return f"{table_name}: {summary}"
+
+
+def _group_rows_by_column(metadata: list) -> List[list]:
+    """Groups metadata rows by column name, preserving the order of first appearance."""
+    grouped = {}
+    for row in metadata:
+        grouped.setdefault(row[1], []).append(row)
+    return list(grouped.values())
+
+
+def split_batch_response(response: dict, table_names: List[str]) -> dict:
+    """
+    Maps a multi-table LLM response back to the single-table output format.
+
+    Args:
+        response (dict): The chain output, whose `text` holds `{"tables": [...]}`.
+        table_names (List[str]): The tables included in the request.
+
+    Returns:
+        dict: Mapping of table name to `{"text": table_dictionary}` for every table found in the response.
+    """
+    payload = response.get("text", {}) if isinstance(response, dict) else {}
+    tables = payload.get("tables", []) if isinstance(payload, dict) else []
+
+    expected = set(table_names)
+    results = {}
+    for table_dictionary in tables:
+        table_name = table_dictionary.get("table_name") if isinstance(table_dictionary, dict) else None
+        if table_name not in expected:
+            logger.warning(f"Ignoring unexpected table '{table_name}' in batch response")
+            continue
+        if table_name in results:
+            logger.warning(f"Ignoring duplicate table '{table_name}' in batch response")
+            continue
+        results[table_name] = {"text": table_dictionary}
+    return results
+
+
+def merge_chunk_responses(table_name: str, responses: List[dict], table_description: str = "") -> dict:
+    """
+    Merges the outputs of column chunks of one table into a single table output.
+
+    Args:
+        table_name (str): Name of the table.
+        responses (List[dict]): Chain outputs of the chunks, in column order.
+        table_description (str): The table-level description. Falls back to the first chunk's
+            description when empty.
+
+    Returns:
+        dict: The merged output in the single-table format (`{"text": {...}}`).
+    """
+    columns: List[dict] = []
+    for response in responses:
+        table_dictionary = response.get("text", {}) if isinstance(response, dict) else {}
+        columns.extend(table_dictionary.get("columns", []))
+        table_description = table_description or table_dictionary.get("table_description", "")
+    return {"text": {"table_name": table_name,
+                     "table_description": table_description,
+                     "columns": columns}}
@@ -0,0 +1,151 @@
+import json
+import os
+from collections import OrderedDict
+from app.common_utils.loggers import logger
+
+SNAPSHOT_VERSION = 1
+
+
+def normalize_row(row) -> list:
+    """Converts a metadata row into its JSON representation so it compares equal to a stored row."""
+    return json.loads(json.dumps(list(row), default=str))
+
+
+def _rows_by_column(rows: list) -> OrderedDict:
+    """Groups normalized metadata rows by column name, preserving column order."""
+    grouped = OrderedDict()
+    for row in rows:
+        normalized = normalize_row(row)
+        grouped.setdefault(normalized[1], []).append(normalized)
+    return grouped
+
+
+def load_snapshot(path: str) -> dict:
+    """
+    Loads the metadata snapshot written by a previous run.
+
+    Args:
+        path (str): Path of the snapshot file.
+
+    Returns:
+        dict: Mapping of table name to `{"rows": [...], "dictionary": {...}}`, empty if no usable snapshot exists.
+    """
+    if not os.path.exists(path):
+        logger.info(f"No previous metadata snapshot found at {path}")
+        return {}
+
+    try:
+        with open(path, encoding="utf-8") as snapshot_file:
+            snapshot = json.load(snapshot_file)
+    except (OSError, json.JSONDecodeError) as err:
+        logger.warning(f"Ignoring unreadable metadata snapshot {path}: {err}")
+        return {}
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        logger.warning(f"Ignoring metadata snapshot {path} with unsupported version")
+        return {}
+
+    return snapshot.get("tables", {})
+
+
+class SnapshotWriter:
+    """
+    Writes the metadata snapshot incrementally, one table at a time, so the whole run never has
+    to be held in memory. The snapshot only replaces the previous one when the run completes.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.file = open(self.tmp_path, "w", encoding="utf-8")
+        self.file.write(f'{{"version": {SNAPSHOT_VERSION}, "tables": {{')
+        self.count = 0
+
+    def add(self, table: str, metadata: list, dictionary: dict) -> None:
+        """
+        Stores the extracted metadata and the generated dictionary of a successfully documented table.
+
+        Args:
+            table (str): Name of the table.
+            metadata (list): The table's metadata rows.
+            dictionary (dict): The table's generated dictionary.
+        """
+        entry = {"rows": [normalize_row(row) for row in metadata], "dictionary": dictionary}
+        separator = ", " if self.count else ""
+        self.file.write(f"{separator}{json.dumps(table)}: {json.dumps(entry, default=str)}")
+        self.count += 1
+
+    def close(self) -> None:
+        """Completes the snapshot and atomically replaces the previous one."""
+        self.file.write("}}")
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+        logger.info(f"Metadata snapshot of {self.count} tables saved to {self.path}")
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep the previous snapshot when the run fails
+            self.file.close()
+            os.remove(self.tmp_path)
+
+
+def diff_table_metadata(previous_rows: list, metadata: list) -> list:
+    """
+    Returns the metadata rows of columns that were added or altered since the previous snapshot.
+
+    Args:
+        previous_rows (list): Metadata rows stored in the previous snapshot.
+        metadata (list): Metadata rows extracted in this run.
+
+    Returns:
+        list: The subset of `metadata` belonging to new or changed columns, in their original order.
+    """
+    previous_columns = _rows_by_column(previous_rows)
+    current_columns = _rows_by_column(metadata)
+    changed_columns = {
+        column for column, rows in current_columns.items()
+        if previous_columns.get(column) != rows
+    }
+    return [row for row in metadata if row[1] in changed_columns]
+
+
+def merge_table_dictionary(previous_dictionary: dict, partial_dictionary: dict | None, metadata: list) -> dict:
+    """
+    Builds a complete table dictionary from the previous run and the descriptions generated for changed columns.
+
+    Columns are emitted in the order of `metadata`; dropped columns disappear and the previous
+    table description is kept.
+
+    Args:
+        previous_dictionary (dict): The table dictionary stored in the previous snapshot.
+        partial_dictionary (dict | None): The table dictionary generated for the changed columns only.
+        metadata (list): Metadata rows extracted in this run.
+
+    Returns:
+        dict: The merged table dictionary.
+    """
+    previous_columns = {column.get("column_name"): column
+                        for column in previous_dictionary.get("columns", [])}
+    new_columns = {column.get("column_name"): column
+                   for column in (partial_dictionary or {}).get("columns", [])}
+
+    columns = []
+    for column_name in _rows_by_column(metadata):
+        column = new_columns.get(column_name) or previous_columns.get(column_name)
+        if column is None:
+            logger.warning(
+                f"No description available for column {column_name} of table {metadata[0][0]}")
+            continue
+        columns.append(column)
+
+    return {
+        "table_name": previous_dictionary.get("table_name", metadata[0][0]),
+        "table_description": previous_dictionary.get("table_description")
+        or (partial_dictionary or {}).get("table_description", ""),
+        "columns": columns,
+    }
@@ -0,0 +1,36 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class ColumnDescription(BaseModel):
+    """Generated description of one column."""
+
+    column_name: str = Field(description="The column name, exactly as given in the metadata.")
+    description: str = Field(description="A meaningful, descriptive column description (at most 255 characters).")
+
+
+class TableDescriptions(BaseModel):
+    """Response schema of the compact single-table prompt."""
+
+    table_description: str = Field(description="A meaningful, descriptive table-level description.")
+    columns: List[ColumnDescription] = Field(
+        description="One entry per column that has no description yet, each column listed once.")
+
+
+class NamedTableDescriptions(TableDescriptions):
+    """One table of a multi-table response."""
+
+    table_name: str = Field(description="The table name, exactly as given in the metadata.")
+
+
+class BatchDescriptions(BaseModel):
+    """Response schema of the compact multi-table prompt."""
+
+    tables: List[NamedTableDescriptions] = Field(description="One entry per table, each table listed once.")
+
+
+def to_response_dict(response) -> dict:
+    """Converts a structured output model into the plain dict returned by the JSON parser."""
+    if isinstance(response, BaseModel):
+        return response.model_dump()
+    return response
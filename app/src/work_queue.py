@@ -0,0 +1,244 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Tuple
+from app.config.config import Config
+from app.src.schema_diff import normalize_row
+from app.common_utils.loggers import logger
+
+# Jobs enqueued per transaction, so workers can start claiming while the coordinator still enqueues
+ENQUEUE_BATCH_SIZE = 500
+
+
+class WorkQueue:
+    """
+    Shared SQLite queue of per-table jobs for the coordinator/worker mode.
+
+    The coordinator enqueues every table of a schema with its metadata rows. Workers, in other
+    processes or on other hosts sharing the file, claim jobs under a lease, renew the lease while
+    they work and store each table dictionary. A job whose lease expires because its worker
+    crashed or hung is claimed again by another worker, up to `max_attempts` times; after that it
+    is marked as failed.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 300, max_attempts: int = 3, wal: bool = True) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Autocommit mode, transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        if wal:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                table_name TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                generation INTEGER NOT NULL,
+                rows TEXT NOT NULL,
+                previous TEXT,
+                status TEXT NOT NULL,
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                error TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, position)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+
+    @classmethod
+    def from_config(cls, path: str) -> "WorkQueue":
+        """Opens the queue at `path` using the `WORK_QUEUE_*` settings."""
+        return cls(path, Config.WORK_QUEUE_LEASE_SECONDS, Config.WORK_QUEUE_MAX_ATTEMPTS, Config.WORK_QUEUE_WAL)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Runs the enclosed statements in one write transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _set(self, connection: sqlite3.Connection, key: str, value) -> None:
+        connection.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def setting(self, key: str, default=None):
+        """Returns a value stored by the coordinator, such as the table comments."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def enqueue(self, jobs: Iterable[Tuple[str, list, dict | None]], settings: Dict[str, object] | None = None) -> int:
+        """
+        Enqueues one job per table and marks the queue as complete once every job is in.
+
+        A table that is already done with identical metadata rows, e.g. when the coordinator is
+        resumed, keeps its result; a changed or failed table is queued again, and tables that
+        are no longer in `jobs` are removed.
+
+        Args:
+            jobs (Iterable[Tuple[str, list, dict | None]]): `(table_name, rows, previous_entry)`, where
+                `previous_entry` is the table's entry in the previous metadata snapshot, if any.
+            settings (Dict[str, object] | None): Values shared with the workers, such as the table comments.
+
+        Returns:
+            int: The number of jobs enqueued.
+        """
+        with self._transaction() as connection:
+            generation = connection.execute("SELECT COALESCE(MAX(generation), 0) + 1 FROM jobs").fetchone()[0]
+            self._set(connection, "complete", False)
+            for key, value in (settings or {}).items():
+                self._set(connection, key, value)
+
+        count, batch = 0, []
+        for table_name, rows, previous in jobs:
+            batch.append((table_name, count, generation, json.dumps([normalize_row(row) for row in rows]),
+                          json.dumps(previous, default=str) if previous else None))
+            count += 1
+            if len(batch) >= ENQUEUE_BATCH_SIZE:
+                self._upsert(batch)
+                batch = []
+        if batch:
+            self._upsert(batch)
+
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM jobs WHERE generation <> ?", (generation,))
+            self._set(connection, "complete", True)
+        logger.info(f"Enqueued {count} tables in work queue {self.path}")
+        return count
+
+    def _upsert(self, batch: List[tuple]) -> None:
+        with self._transaction() as connection:
+            # Column references on the right-hand side see the existing row
+            connection.executemany("""
+                INSERT INTO jobs (table_name, position, generation, rows, previous, status)
+                VALUES (?, ?, ?, ?, ?, 'pending')
+                ON CONFLICT (table_name) DO UPDATE SET
+                    position = excluded.position,
+                    generation = excluded.generation,
+                    previous = excluded.previous,
+                    status = CASE WHEN jobs.status = 'done' AND jobs.rows = excluded.rows
+                                  THEN 'done' ELSE 'pending' END,
+                    attempts = CASE WHEN jobs.status = 'done' AND jobs.rows = excluded.rows
+                                    THEN jobs.attempts ELSE 0 END,
+                    result = CASE WHEN jobs.status = 'done' AND jobs.rows = excluded.rows
+                                  THEN jobs.result END,
+                    rows = excluded.rows
+            """, batch)
+
+    def claim(self, worker: str, limit: int) -> List[Tuple[str, list, dict | None]]:
+        """
+        Leases up to `limit` pending or expired jobs to `worker`, in table order.
+
+        Returns:
+            List[Tuple[str, list, dict | None]]: `(table_name, rows, previous_entry)` of the claimed jobs.
+        """
+        now = time.time()
+        claimed = []
+        with self._transaction() as connection:
+            candidates = connection.execute("""
+                SELECT table_name, rows, previous, attempts, status FROM jobs
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY position LIMIT ?
+            """, (now, limit)).fetchall()
+            for table_name, rows, previous, attempts, status in candidates:
+                if attempts >= self.max_attempts:
+                    connection.execute(
+                        "UPDATE jobs SET status = 'failed', error = ? WHERE table_name = ?",
+                        (f"lease expired after {attempts} attempts", table_name))
+                    logger.error(f"Giving up on table {table_name}: lease expired after {attempts} attempts")
+                    continue
+                if status == "leased":
+                    logger.warning(f"Lease of table {table_name} expired, reclaiming it for {worker}")
+                connection.execute("""
+                    UPDATE jobs SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1
+                    WHERE table_name = ?
+                """, (worker, now + self.lease_seconds, table_name))
+                claimed.append((table_name, [tuple(row) for row in json.loads(rows)],
+                                json.loads(previous) if previous else None))
+        return claimed
+
+    def renew(self, worker: str, tables: Iterable[str]) -> None:
+        """Extends the leases `worker` still holds on `tables`."""
+        expires = time.time() + self.lease_seconds
+        with self._transaction() as connection:
+            connection.executemany(
+                "UPDATE jobs SET lease_expires = ? WHERE table_name = ? AND worker = ? AND status = 'leased'",
+                [(expires, table, worker) for table in tables])
+
+    def complete(self, worker: str, table: str, dictionary: dict) -> bool:
+        """
+        Stores the dictionary of a table. The first result wins: when an expired lease was
+        reclaimed and both workers finish, the later result is dropped.
+
+        Returns:
+            bool: False if the table was already done.
+        """
+        with self._transaction() as connection:
+            updated = connection.execute("""
+                UPDATE jobs SET status = 'done', worker = ?, result = ?, error = NULL, lease_expires = NULL
+                WHERE table_name = ? AND status <> 'done'
+            """, (worker, json.dumps(dictionary, default=str), table)).rowcount
+        return bool(updated)
+
+    def fail(self, worker: str, table: str, error: str) -> None:
+        """Releases a job `worker` could not finish, queuing it again unless it ran out of attempts."""
+        with self._transaction() as connection:
+            connection.execute("""
+                UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                                error = ?, lease_expires = NULL
+                WHERE table_name = ? AND worker = ? AND status = 'leased'
+            """, (self.max_attempts, error, table, worker))
+
+    def counts(self) -> Dict[str, int]:
+        """Returns the number of jobs per status (pending, leased, done, failed)."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def is_finished(self) -> bool:
+        """Whether the coordinator enqueued every job and each one is done or failed."""
+        counts = self.counts()
+        return bool(self.setting("complete", False)) and not counts.get("pending") and not counts.get("leased")
+
+    def results(self) -> Iterator[Tuple[str, list, dict | None]]:
+        """
+        Yields every job in table order, in the shape of `generate_data_dictionaries`.
+
+        Yields:
+            Tuple[str, list, dict | None]: The table name, its metadata rows and its output in the
+                chain's `{"text": {...}}` envelope, or None if the table failed.
+        """
+        with self._lock:
+            positions = [row[0] for row in self._conn.execute("SELECT position FROM jobs ORDER BY position")]
+        # Read in slices so a 20k-table schema is never held in memory at once
+        for start in range(0, len(positions), ENQUEUE_BATCH_SIZE):
+            with self._lock:
+                rows = self._conn.execute("""
+                    SELECT table_name, rows, result FROM jobs
+                    WHERE position >= ? AND position <= ? ORDER BY position
+                """, (positions[start], positions[min(start + ENQUEUE_BATCH_SIZE, len(positions)) - 1])).fetchall()
+            for table_name, metadata, result in rows:
+                yield (table_name, [tuple(row) for row in json.loads(metadata)],
+                       {"text": json.loads(result)} if result else None)
+
+    def close(self) -> None:
+        """Closes the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
+
+    def remove(self) -> None:
+        """Closes the queue and deletes its file, together with SQLite's WAL files."""
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
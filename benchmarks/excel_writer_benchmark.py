@@ -0,0 +1,82 @@
+"""
+Compares peak memory and wall-clock time of the pandas and streaming Excel writers.
+
+Usage:
+    python -m benchmarks.excel_writer_benchmark --tables 5000 --columns 20
+
+Each writer runs in its own process so that peak RSS is measured independently.
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+
+def synthetic_table(table_index: int, columns: int) -> dict:
+    """Builds a table dictionary shaped like an LLM response."""
+    return {
+        "table_name": f"table_{table_index:05d}",
+        "table_description": f"Synthetic table number {table_index} used for benchmarking.",
+        "columns": [{
+            "column_name": f"column_{column_index:03d}",
+            "datatype": "character varying",
+            "length": 255,
+            "is_null": "YES",
+            "default": "NULL",
+            "primary_key": "Yes" if column_index == 0 else "No",
+            "foreign_key": "No",
+            "constraints": None,
+            "description": f"Synthetic column {column_index} of table {table_index}.",
+        } for column_index in range(columns)],
+    }
+
+
+def _peak_rss_mb() -> float:
+    """Returns the peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_writer(mode: str, tables: int, columns: int, queue) -> None:
+    from app.output.excel_sink import PandasExcelSink, StreamingExcelSink
+
+    sink_class = StreamingExcelSink if mode == "streaming" else PandasExcelSink
+    baseline_mb = _peak_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "benchmark.xlsx")
+        start = time.perf_counter()
+        with sink_class(output_file) as sink:
+            for table_index in range(tables):
+                table = synthetic_table(table_index, columns)
+                sink.write_table(table["table_name"], table)
+        elapsed = time.perf_counter() - start
+        size_mb = os.path.getsize(output_file) / (1024 * 1024)
+    queue.put((elapsed, _peak_rss_mb(), _peak_rss_mb() - baseline_mb, size_mb))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--modes", default="pandas,streaming",
+                        help="Comma-separated writer modes to compare.")
+    args = parser.parse_args()
+
+    print(f"Writing {args.tables} tables x {args.columns} columns")
+    print(f"{'mode':<10} {'seconds':>9} {'peak RSS MB':>12} {'growth MB':>10} {'file MB':>8}")
+    context = multiprocessing.get_context("spawn")
+    for mode in args.modes.split(","):
+        queue = context.Queue()
+        process = context.Process(target=_run_writer, args=(mode, args.tables, args.columns, queue))
+        process.start()
+        elapsed, peak_mb, growth_mb, size_mb = queue.get()
+        process.join()
+        print(f"{mode:<10} {elapsed:>9.2f} {peak_mb:>12.1f} {growth_mb:>10.1f} {size_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Checks that the aggregated extractor queries return exactly one row per column on a local schema.
+
+Usage:
+    python -m benchmarks.extractor_row_counts --dialect postgres --tables 50 --columns 12
+
+Connects with the DB_* (PostgreSQL) or MYSQL_* settings from `.env`, creates the synthetic
+schema `--schema` from `benchmarks.synthetic_schema` (primary keys, foreign keys, check
+constraints and comments), runs every extractor query of the dialect and compares its row
+count with the number of columns created. The schema is dropped again unless `--keep` is given.
+
+The per-constraint queries are expected to return more rows than columns; the aggregated ones
+must return exactly one row per column, flag the foreign keys and fold their targets and check
+expressions (from MySQL 8.0.16) into the constraints field. The exit status is 1 if they do not.
+`tests/test_extractor_row_counts.py` runs the same checks under pytest.
+"""
+import argparse
+import sys
+from collections import Counter
+from app.config.config import Config
+from benchmarks.synthetic_schema import ddl_statements, table_columns, table_name
+
+
+def connect(dialect: str):
+    if dialect == "mysql":
+        import mysql.connector
+        return mysql.connector.connect(host=Config.MYSQL_HOST, user=Config.MYSQL_USER,
+                                       password=Config.MYSQL_PASSWORD)
+    import psycopg2
+    return psycopg2.connect(host=Config.DB_HOST, port=Config.DB_PORT, dbname=Config.DB_NAME,
+                            user=Config.DB_USER, password=Config.DB_PASSWORD)
+
+
+def extractor_queries(dialect: str, conn) -> dict:
+    """Returns the extractor queries of the dialect, by name, and whether each is aggregated."""
+    if dialect == "mysql":
+        from app.database import mysql
+        aggregated = (mysql.AGGREGATED_METADATA_QUERY if mysql.supports_check_constraints(conn)
+                      else mysql.AGGREGATED_METADATA_QUERY_WITHOUT_CHECKS)
+        return {"per constraint": (mysql.METADATA_QUERY, False), "aggregated": (aggregated, True)}
+    from app.database import postgres
+    return {"information_schema": (postgres.METADATA_QUERY, False),
+            "information_schema, aggregated": (postgres.AGGREGATED_METADATA_QUERY, True),
+            "pg_catalog": (postgres.PG_CATALOG_METADATA_QUERY, False),
+            "pg_catalog, aggregated": (postgres.PG_CATALOG_AGGREGATED_METADATA_QUERY, True)}
+
+
+def mysql_checks_supported(conn) -> bool:
+    from app.database import mysql
+    return mysql.supports_check_constraints(conn)
+
+
+def check_rows(rows: list, expected_columns: int, tables: int, checks: bool = True) -> list:
+    """Returns the problems found in the rows of an aggregated query; `checks` expects check expressions."""
+    problems = []
+    duplicates = [key for key, count in Counter((row[0], row[1]) for row in rows).items() if count > 1]
+    if len(rows) != expected_columns:
+        problems.append(f"{len(rows)} rows for {expected_columns} columns")
+    if duplicates:
+        problems.append(f"{len(duplicates)} columns returned more than once, e.g. {duplicates[0]}")
+
+    by_column = {(row[0], row[1]): row for row in rows}
+    if tables > 1:
+        parent = by_column.get((table_name(1), "parent_id"))
+        if not parent or parent[7] != "Yes" or table_name(0) not in (parent[8] or ""):
+            problems.append(f"foreign key of {table_name(1)}.parent_id not folded: {parent}")
+    primary = by_column.get((table_name(0), "id"))
+    if not primary or primary[6] != "Yes":
+        problems.append(f"primary key of {table_name(0)}.id not flagged: {primary}")
+    amount = by_column.get((table_name(0), "amount"))
+    if checks and amount and "amount" not in (amount[8] or ""):
+        problems.append(f"check expression of {table_name(0)}.amount missing: {amount}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dialect", choices=("postgres", "mysql"), default=Config.DBMS or "postgres")
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--schema", default="docuschema_row_counts")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated schema.")
+    args = parser.parse_args()
+
+    expected_columns = sum(len(table_columns(index, args.columns)) for index in range(args.tables))
+    conn = connect(args.dialect)
+    failures = []
+    try:
+        with conn.cursor() as cursor:
+            for statement in ddl_statements(args.tables, args.columns, args.dialect, args.schema):
+                cursor.execute(statement)
+        conn.commit()
+
+        print(f"{args.tables} tables, {expected_columns} columns")
+        print(f"{'extractor':<31} {'rows':>7} {'columns':>8}  result")
+        checks = args.dialect != "mysql" or mysql_checks_supported(conn)
+        for name, (query, aggregated) in extractor_queries(args.dialect, conn).items():
+            with conn.cursor() as cursor:
+                cursor.execute(query, (args.schema,))
+                rows = cursor.fetchall()
+            problems = check_rows(rows, expected_columns, args.tables, checks) if aggregated else []
+            failures.extend(f"{name}: {problem}" for problem in problems)
+            result = "; ".join(problems) if problems else ("ok" if aggregated else "one row per constraint")
+            print(f"{name:<31} {len(rows):>7} {len({(row[0], row[1]) for row in rows}):>8}  {result}")
+    finally:
+        if not args.keep:
+            with conn.cursor() as cursor:
+                cursor.execute(ddl_statements(0, 0, args.dialect, args.schema)[0])
+            conn.commit()
+        conn.close()
+
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
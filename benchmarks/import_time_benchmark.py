@@ -0,0 +1,76 @@
+"""
+Measures how long importing the application takes and fails when it regresses.
+
+Usage:
+    python -m benchmarks.import_time_benchmark --max-seconds 1.5
+
+Imports `--module` (default `app.main`) in fresh interpreters with `python -X importtime`,
+reports the median cumulative import time and the slowest modules, and exits with status 1
+if the median exceeds `--max-seconds` or if any module listed in `--forbid` (the provider SDKs
+by default) was imported eagerly.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+# Provider SDKs must only be imported once `LLM_MODEL_NAME` selects them
+DEFAULT_FORBIDDEN_MODULES = "langchain_openai,langchain_ollama,langchain_huggingface,langchain_cohere"
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Parses `-X importtime` output into {module: (self_us, cumulative_us)}."""
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure(module: str) -> dict:
+    """Imports `module` in a fresh interpreter and returns its import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest modules to list.")
+    parser.add_argument("--max-seconds", type=float, default=1.5,
+                        help="Fail when the median cumulative import time exceeds this.")
+    parser.add_argument("--forbid", default=DEFAULT_FORBIDDEN_MODULES,
+                        help="Comma-separated modules that must not be imported.")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.repeat)]
+    seconds = statistics.median(run[args.module][1] for run in runs) / 1_000_000
+
+    print(f"{args.module}: median import time {seconds:.3f}s over {args.repeat} runs")
+    print(f"{'module':<50} {'self ms':>9} {'cumulative ms':>14}")
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"{name:<50} {self_us / 1000:>9.1f} {cumulative_us / 1000:>14.1f}")
+
+    failures = []
+    if seconds > args.max_seconds:
+        failures.append(f"import time {seconds:.3f}s exceeds the {args.max_seconds:.3f}s threshold")
+    forbidden = [name for name in args.forbid.split(",") if name.strip() in runs[-1]]
+    if forbidden:
+        failures.append(f"eagerly imported: {', '.join(forbidden)}")
+
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
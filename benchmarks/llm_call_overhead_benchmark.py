@@ -0,0 +1,126 @@
+"""
+Measures the per-call overhead of LLM requests, separate from model latency.
+
+Usage:
+    python -m benchmarks.llm_call_overhead_benchmark --calls 500
+
+Two offline scenarios are timed:
+    - chain: a zero-latency fake model, comparing a `LLMChain` built per call with the compiled
+      `prompt | llm | parser` pipeline reused across calls.
+    - http: a local OpenAI-compatible server, comparing a new client per call (a fresh connection
+      every time) with one client whose keep-alive pool is shared by all calls.
+"""
+import argparse
+import json
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.prompts import PromptTemplate
+
+PROMPT = PromptTemplate(
+    input_variables=["metadata_list"],
+    template="{metadata_list}\nDescribe every column and return JSON.")
+
+METADATA = [("orders", f"column_{index:02d}", "integer", 32, "YES", None, "No", "No", None, "")
+            for index in range(20)]
+
+COMPLETION = {
+    "id": "chatcmpl-benchmark", "object": "chat.completion", "created": 0, "model": "benchmark",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {
+        "role": "assistant", "content": json.dumps({"table_name": "orders", "columns": []})}}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    """Answers every chat completion request instantly, keeping the connection open."""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def time_calls(call, calls: int) -> float:
+    """Returns the mean microseconds per call after one warm-up call."""
+    call()
+    start = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def chain_scenarios(calls: int) -> dict:
+    from langchain.chains import LLMChain
+    from app.common_utils.fake_llm import FakeChatModel
+
+    llm = FakeChatModel(latency=0.0)
+    parser = JsonOutputParser()
+    compiled = PROMPT | llm | parser
+    inputs = {"metadata_list": METADATA}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return {
+            "LLMChain per call": time_calls(
+                lambda: LLMChain(llm=llm, prompt=PROMPT, output_parser=parser).invoke(inputs), calls),
+            "compiled chain": time_calls(lambda: compiled.invoke(inputs), calls),
+        }
+
+
+def http_scenarios(calls: int) -> dict:
+    import httpx
+    from langchain_openai import ChatOpenAI
+    from openai import DefaultHttpxClient
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CompletionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    parser = JsonOutputParser()
+    inputs = {"metadata_list": METADATA}
+
+    def new_client_per_call():
+        http_client = DefaultHttpxClient()
+        llm = ChatOpenAI(model="benchmark", api_key="benchmark", base_url=base_url,
+                         max_retries=0, http_client=http_client)
+        (PROMPT | llm | parser).invoke(inputs)
+        http_client.close()
+
+    limits = httpx.Limits(max_connections=4, max_keepalive_connections=4)
+    shared = PROMPT | ChatOpenAI(model="benchmark", api_key="benchmark", base_url=base_url,
+                                 max_retries=0, http_client=DefaultHttpxClient(limits=limits)) | parser
+    try:
+        return {
+            "new client per call": time_calls(new_client_per_call, calls),
+            "shared keep-alive client": time_calls(lambda: shared.invoke(inputs), calls),
+        }
+    finally:
+        server.shutdown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--scenarios", default="chain,http",
+                        help="Comma-separated scenarios to run: chain, http.")
+    args = parser.parse_args()
+
+    runners = {"chain": chain_scenarios, "http": http_scenarios}
+    print(f"{'scenario':<10} {'variant':<26} {'us/call':>10}")
+    for scenario in args.scenarios.split(","):
+        for variant, micros in runners[scenario.strip()](args.calls).items():
+            print(f"{scenario:<10} {variant:<26} {micros:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Measures the per-record cost of the logging sinks on the logging thread.
+
+Usage:
+    python -m benchmarks.logging_benchmark --records 20000 --threads 4
+
+Each variant logs the same per-table INFO message from `--threads` threads, with stdout and
+stderr redirected to /dev/null and the log file in a temporary directory:
+    - sync: the JSON stdout sink and the loguru file sink, both running on the logging thread.
+    - async: `AsyncLogWriter`, which only enqueues records for a background writer thread.
+    - async+sampling: `AsyncLogWriter` behind a `CallSiteSampler` (first 20, then 1 in 10).
+
+`caller us/record` is the time the logging threads spend per record; `total us/record`
+includes waiting until the background writer has written everything.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+LOG_DIR = tempfile.mkdtemp(prefix="logging_benchmark_")
+os.environ["LOG_FILE"] = os.path.join(LOG_DIR, "setup.log")
+
+from loguru import logger  # noqa: E402
+from app.common_utils.loggers import (  # noqa: E402
+    FILE_FORMAT, AsyncLogWriter, CallSiteSampler, sink_function)
+
+
+def sync_sinks(log_file: str):
+    logger.add(sink_function, level="INFO")
+    logger.add(log_file, format=FILE_FORMAT, rotation="2 week", retention="30 days", level="INFO")
+    return None
+
+
+def async_sink(log_file: str):
+    writer = AsyncLogWriter(log_file)
+    logger.add(writer, format="{message}", level="INFO")
+    return writer
+
+
+def sampled_async_sink(log_file: str):
+    writer = AsyncLogWriter(log_file)
+    logger.add(writer, format="{message}", level="INFO", filter=CallSiteSampler(20, 10))
+    return writer
+
+
+VARIANTS = {"sync": sync_sinks, "async": async_sink, "async+sampling": sampled_async_sink}
+
+
+def run(variant: str, records: int, threads: int) -> tuple:
+    """Returns the caller and total microseconds per record of one variant."""
+    logger.remove()
+    writer = VARIANTS[variant](os.path.join(LOG_DIR, f"{variant}.log"))
+    per_thread = records // threads
+
+    def log_tables(worker: int) -> None:
+        for index in range(per_thread):
+            logger.info(f"Generating data dictionary for table: table_{worker}_{index}")
+
+    workers = [threading.Thread(target=log_tables, args=(worker,)) for worker in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    caller_seconds = time.perf_counter() - started
+
+    if writer is not None:
+        writer.stop()
+    logger.remove()
+    total_seconds = time.perf_counter() - started
+
+    logged = per_thread * threads
+    return caller_seconds / logged * 1_000_000, total_seconds / logged * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--variants", default=",".join(VARIANTS),
+                        help="Comma-separated variants to run: " + ", ".join(VARIANTS) + ".")
+    args = parser.parse_args()
+
+    results = {}
+    stdout, stderr = sys.stdout, sys.stderr
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = sys.stderr = devnull
+        try:
+            for variant in args.variants.split(","):
+                results[variant.strip()] = run(variant.strip(), args.records, args.threads)
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+
+    print(f"{'variant':<16} {'caller us/record':>17} {'total us/record':>16}")
+    for variant, (caller_micros, total_micros) in results.items():
+        print(f"{variant:<16} {caller_micros:>17.1f} {total_micros:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Measures end-to-end throughput of the pipeline on a synthetic schema with the fake LLM.
+
+Usage:
+    python -m benchmarks.pipeline_benchmark --tables 200 --columns 20 --latency 0.02
+
+Each scenario runs `generate_data_dictionary_file` in its own process, from metadata
+extraction (rows served by `SyntheticDB` instead of a database) through description
+generation with the fake LLM (`--latency` ± `--jitter` seconds per call) to the Excel
+write. It reports tables/sec, peak RSS and the time spent in each stage, taken from the
+run metrics.
+
+Results are appended to `benchmarks/results/pipeline_benchmark.jsonl` (not versioned) with the
+project version, commit and host. Each run is compared with the last stored run of the same
+scenario and size on the same host, and the exit status is 1 if throughput dropped or peak RSS
+grew by more than `--max-regression`, or if a scenario crashed or ran longer than `--timeout`.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from queue import Empty
+from benchmarks.excel_writer_benchmark import _peak_rss_mb
+
+RESULTS_FILE = os.path.join(os.path.dirname(__file__), "results", "pipeline_benchmark.jsonl")
+
+# Environment of every scenario: the seeded fake model, no cache and no run report file
+COMMON_ENV = {
+    "LLM_MODEL_NAME": "fake:benchmark",
+    "FAKE_LLM_SEED": "7",
+    "CACHE_ENABLED": "False",
+    "RUN_REPORT_PATH": "",
+    "OUTPUT_FORMATS": "excel",
+    "SCHEMA_NAME": "benchmark",
+}
+
+SCENARIOS = {
+    "sequential": {"LLM_MAX_CONCURRENCY": "1"},
+    "concurrent": {"LLM_MAX_CONCURRENCY": "8"},
+    "batched": {"LLM_MAX_CONCURRENCY": "8", "LLM_BATCH_TOKEN_BUDGET": "4000"},
+    "streaming": {"LLM_MAX_CONCURRENCY": "8", "STREAM_METADATA": "True", "EXCEL_WRITER_MODE": "streaming"},
+    "flaky": {"LLM_MAX_CONCURRENCY": "8", "FAKE_LLM_ERROR_RATE": "0.05",
+              "LLM_RETRY_BASE_DELAY": "0.01", "LLM_RETRY_MAX_DELAY": "0.05"},
+}
+
+# Stages listed in the per-stage breakdown, in pipeline order
+REPORTED_STAGES = ("fetch_metadata", "llm_call", "parse_response", "shape_dataframe", "write_sheet",
+                   "write_PandasExcelSink", "write_StreamingExcelSink", "close_PandasExcelSink",
+                   "close_StreamingExcelSink")
+
+
+def _run_scenario(env: dict, tables: int, columns: int, queue) -> None:
+    # The configuration is read on import, so the environment is set first
+    os.environ.update(env)
+    sys.stdout = open(os.devnull, "w")
+    from benchmarks.synthetic_schema import SyntheticDB
+    from app.common_utils.run_metrics import run_metrics
+    from app.src import metadata_extractor
+    from app.main import generate_data_dictionary_file
+
+    metadata_extractor.get_db_instance = lambda dbms=None: SyntheticDB(tables, columns)
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        generate_data_dictionary_file(None, env["SCHEMA_NAME"], "postgres", output_dir)
+        elapsed = time.perf_counter() - start
+    queue.put((elapsed, _peak_rss_mb(), run_metrics.summary()))
+
+
+def _version() -> dict:
+    """Returns the project version and, when available, the current git commit."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, "pyproject.toml"), encoding="utf-8") as pyproject:
+        match = re.search(r'^version\s*=\s*"([^"]+)"', pyproject.read(), re.MULTILINE)
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"version": match.group(1) if match else None, "commit": commit}
+
+
+def _wait_for_result(process, queue, timeout: float) -> tuple | None:
+    """Returns the result of a scenario process, or None if it exited without one or ran past `timeout` seconds."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            return queue.get(timeout=1)
+        except Empty:
+            if not process.is_alive():
+                # The result may still be in flight when the process exits
+                try:
+                    return queue.get(timeout=1)
+                except Empty:
+                    return None
+    return None
+
+
+def _previous_result(results: list, entry: dict) -> dict | None:
+    """Returns the last stored result of the same scenario, size and latency on the same host."""
+    keys = ("host", "scenario", "tables", "columns", "latency", "jitter")
+    matches = [result for result in results if all(result.get(key) == entry[key] for key in keys)]
+    return matches[-1] if matches else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake LLM seconds per call.")
+    parser.add_argument("--jitter", type=float, default=0.005)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help="Comma-separated scenarios to run: " + ", ".join(SCENARIOS) + ".")
+    parser.add_argument("--results", default=RESULTS_FILE, help="JSONL file the results are appended to.")
+    parser.add_argument("--no-save", action="store_true", help="Do not store the results.")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Relative drop in tables/sec or growth in peak RSS that fails the run.")
+    parser.add_argument("--timeout", type=float, default=1800, help="Seconds a scenario may run.")
+    args = parser.parse_args()
+
+    stored = []
+    if os.path.exists(args.results):
+        with open(args.results, encoding="utf-8") as results_file:
+            stored = [json.loads(line) for line in results_file if line.strip()]
+
+    version = _version()
+    context = multiprocessing.get_context("spawn")
+    entries, regressions, failures = [], [], []
+    print(f"Documenting {args.tables} tables x {args.columns} columns, fake LLM latency {args.latency}s")
+    print(f"{'scenario':<12} {'seconds':>8} {'tables/s':>9} {'peak RSS MB':>12} {'LLM calls':>10} "
+          f"{'retries':>8} {'vs last':>8}")
+    for scenario in (name.strip() for name in args.scenarios.split(",")):
+        with tempfile.TemporaryDirectory() as log_dir:
+            env = {**COMMON_ENV, "FAKE_LLM_LATENCY": str(args.latency), "FAKE_LLM_JITTER": str(args.jitter),
+                   "LOG_FILE": os.path.join(log_dir, "benchmark.log"), **SCENARIOS[scenario]}
+            queue = context.Queue()
+            process = context.Process(target=_run_scenario, args=(env, args.tables, args.columns, queue))
+            process.start()
+            result = _wait_for_result(process, queue, args.timeout)
+            timed_out = result is None and process.is_alive()
+            if timed_out:
+                process.terminate()
+            process.join()
+
+        if result is None:
+            reason = f"timed out after {args.timeout:.0f}s" if timed_out else f"exited with code {process.exitcode}"
+            failures.append(f"{scenario}: {reason}")
+            print(f"{scenario:<12} FAILED, the scenario process {reason}")
+            continue
+        elapsed, peak_mb, summary = result
+
+        counters = summary["counters"]
+        entry = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **version, "host": platform.node(),
+            "scenario": scenario,
+            "tables": args.tables, "columns": args.columns, "latency": args.latency, "jitter": args.jitter,
+            "seconds": round(elapsed, 3), "tables_per_second": round(args.tables / elapsed, 2),
+            "peak_rss_mb": round(peak_mb, 1), "llm_calls": counters.get("llm_calls", 0),
+            "llm_retries": counters.get("llm_retried", 0),
+            "stages_ms": {stage: stats["total_ms"] for stage, stats in summary["stages"].items()},
+        }
+        entries.append(entry)
+
+        change = ""
+        previous = _previous_result(stored, entry)
+        if previous:
+            throughput_change = entry["tables_per_second"] / previous["tables_per_second"] - 1
+            rss_change = entry["peak_rss_mb"] / previous["peak_rss_mb"] - 1
+            change = f"{throughput_change:+.0%}"
+            if throughput_change < -args.max_regression or rss_change > args.max_regression:
+                regressions.append(f"{scenario}: {throughput_change:+.0%} tables/sec, {rss_change:+.0%} "
+                                   f"peak RSS vs {previous.get('commit') or previous['timestamp']}")
+        print(f"{scenario:<12} {elapsed:>8.2f} {entry['tables_per_second']:>9.1f} {peak_mb:>12.1f} "
+              f"{entry['llm_calls']:>10.0f} {entry['llm_retries']:>8.0f} {change:>8}")
+
+    print(f"\n{'stage ms':<26}" + "".join(f"{entry['scenario']:>12}" for entry in entries))
+    for stage in REPORTED_STAGES:
+        if any(stage in entry["stages_ms"] for entry in entries):
+            print(f"{stage:<26}" + "".join(f"{entry['stages_ms'].get(stage, 0):>12.0f}" for entry in entries))
+
+    if not args.no_save and entries:
+        os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+        with open(args.results, "a", encoding="utf-8") as results_file:
+            for entry in entries:
+                results_file.write(json.dumps(entry) + "\n")
+        print(f"\nResults appended to {args.results}")
+
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+    if regressions:
+        print("REGRESSION: " + "; ".join(regressions))
+    if failures or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
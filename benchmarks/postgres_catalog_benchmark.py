@@ -0,0 +1,108 @@
+"""
+Compares the information_schema and pg_catalog metadata queries on a generated schema.
+
+Usage:
+    python -m benchmarks.postgres_catalog_benchmark --tables 2000 --columns 30
+
+Connects with the DB_* settings from `.env`, creates the schema `--schema` with the requested
+number of tables (primary keys, foreign keys, check constraints and column comments), times
+both extractor queries, with one row per constraint and aggregated to one row per column, and
+drops the schema again unless `--keep` is given.
+"""
+import argparse
+import statistics
+import time
+import psycopg2
+from psycopg2 import sql
+from app.config.config import Config
+from app.database.postgres import (
+    AGGREGATED_METADATA_QUERY, METADATA_QUERY, PG_CATALOG_AGGREGATED_METADATA_QUERY, PG_CATALOG_METADATA_QUERY)
+
+# Tables created per transaction while generating the schema
+DDL_BATCH_SIZE = 100
+
+
+def table_ddl(schema: sql.Identifier, table_index: int, columns: int) -> sql.Composed:
+    """Builds the DDL of one synthetic table, referencing the previous table."""
+    table = sql.Identifier(f"table_{table_index:05d}")
+    definitions = [sql.SQL("id serial PRIMARY KEY")]
+    if table_index > 0:
+        definitions.append(sql.SQL("parent_id integer REFERENCES {}.{} (id)").format(
+            schema, sql.Identifier(f"table_{table_index - 1:05d}")))
+    definitions.append(sql.SQL("amount numeric(12, 2) CHECK (amount >= 0)"))
+    for column_index in range(max(columns - len(definitions), 0)):
+        definitions.append(sql.SQL("{} varchar(255) DEFAULT ''").format(
+            sql.Identifier(f"column_{column_index:03d}")))
+
+    statements = [sql.SQL("CREATE TABLE {}.{} ({})").format(
+        schema, table, sql.SQL(", ").join(definitions))]
+    if table_index % 2 == 0:
+        statements.append(sql.SQL("COMMENT ON COLUMN {}.{}.amount IS {}").format(
+            schema, table, sql.Literal("Amount in the account currency.")))
+    return sql.SQL("; ").join(statements)
+
+
+def create_schema(conn, schema_name: str, tables: int, columns: int) -> None:
+    schema = sql.Identifier(schema_name)
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(schema))
+        cursor.execute(sql.SQL("CREATE SCHEMA {}").format(schema))
+    conn.commit()
+
+    for start in range(0, tables, DDL_BATCH_SIZE):
+        with conn.cursor() as cursor:
+            for table_index in range(start, min(start + DDL_BATCH_SIZE, tables)):
+                cursor.execute(table_ddl(schema, table_index, columns))
+        conn.commit()
+    with conn.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    conn.commit()
+
+
+def time_query(conn, query: str, schema_name: str, repeat: int) -> tuple:
+    """Runs `query` `repeat` times and returns (median seconds, row count)."""
+    timings, row_count = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with conn.cursor() as cursor:
+            cursor.execute(query, (schema_name,))
+            row_count = len(cursor.fetchall())
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), row_count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, default=1000)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--schema", default="docuschema_benchmark")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep", action="store_true", help="Keep the generated schema.")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(host=Config.DB_HOST, port=Config.DB_PORT, dbname=Config.DB_NAME,
+                            user=Config.DB_USER, password=Config.DB_PASSWORD)
+    try:
+        start = time.perf_counter()
+        create_schema(conn, args.schema, args.tables, args.columns)
+        print(f"Created {args.tables} tables x {args.columns} columns "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        print(f"{'extractor':<31} {'median s':>9} {'rows':>9}")
+        for name, query in (("information_schema", METADATA_QUERY),
+                            ("information_schema, aggregated", AGGREGATED_METADATA_QUERY),
+                            ("pg_catalog", PG_CATALOG_METADATA_QUERY),
+                            ("pg_catalog, aggregated", PG_CATALOG_AGGREGATED_METADATA_QUERY)):
+            seconds, row_count = time_query(conn, query, args.schema, args.repeat)
+            print(f"{name:<31} {seconds:>9.3f} {row_count:>9}")
+    finally:
+        if not args.keep:
+            with conn.cursor() as cursor:
+                cursor.execute(sql.SQL("DROP SCHEMA IF EXISTS {} CASCADE").format(
+                    sql.Identifier(args.schema)))
+            conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
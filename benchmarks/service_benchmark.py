@@ -0,0 +1,120 @@
+"""
+Measures the lookup latency of the dictionary service on a synthetic schema with the fake LLM.
+
+Usage:
+    python -m benchmarks.service_benchmark --tables 500 --columns 20 --lookups 5000
+
+Starts the service in-process on a free port, with metadata rows served by `SyntheticDB`
+instead of a database. First `--generate` tables are looked up once each, so they are
+generated on demand (`--latency` seconds per fake LLM call). Then `--lookups` table and column
+lookups of the generated tables are timed over one keep-alive connection. The run prints the
+p50/p90/p99 latency of each kind and exits with status 1 if the cached p50 exceeds `--max-p50-ms`.
+"""
+import argparse
+import http.client
+import os
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+os.environ["LLM_MODEL_NAME"] = "fake:benchmark"
+os.environ["CACHE_ENABLED"] = "False"
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(prefix="service_benchmark_"), "benchmark.log"))
+
+from app.config.config import Config  # noqa: E402
+from app.config.db_config import DBTarget  # noqa: E402
+from app.common_utils.run_metrics import _percentile  # noqa: E402
+from app.service import create_server  # noqa: E402
+from app.src import metadata_extractor  # noqa: E402
+from app.src.dictionary_service import DictionaryService  # noqa: E402
+from benchmarks.synthetic_schema import SyntheticDB, table_columns, table_name  # noqa: E402
+
+SCHEMA = "benchmark"
+
+
+class SyntheticConnectionManager:
+    """Stands in for `ConnectionManager`; the synthetic schema needs no connection."""
+
+    def __init__(self) -> None:
+        self.target = DBTarget("postgres", {}, [SCHEMA], name="synthetic")
+
+    @contextmanager
+    def connection(self):
+        yield None
+
+    def close_all(self) -> None:
+        pass
+
+
+def time_requests(connection: http.client.HTTPConnection, paths: list) -> list:
+    """Returns the milliseconds each GET took, sorted."""
+    timings = []
+    for path in paths:
+        start = time.perf_counter()
+        connection.request("GET", path)
+        response = connection.getresponse()
+        response.read()
+        timings.append(1000 * (time.perf_counter() - start))
+        if response.status != 200:
+            raise RuntimeError(f"GET {path} returned {response.status}")
+    return sorted(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, default=500)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--generate", type=int, default=50, help="Tables generated on demand before timing.")
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.02, help="Fake LLM seconds per call.")
+    parser.add_argument("--max-p50-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    Config.FAKE_LLM_LATENCY = args.latency
+    Config.SERVICE_REFRESH_SECONDS = 0
+    metadata_extractor.get_db_instance = lambda dbms=None: SyntheticDB(args.tables, args.columns)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        service = DictionaryService([SyntheticConnectionManager()], output_dir)
+        start = time.perf_counter()
+        service.start()
+        print(f"Service started in {time.perf_counter() - start:.2f}s "
+              f"({args.tables} tables x {args.columns} columns)")
+
+        server = create_server(service, "127.0.0.1", 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+        try:
+            generated = [table_name(index) for index in range(min(args.generate, args.tables))]
+            results = {"on-demand table": time_requests(
+                connection, [f"/schemas/{SCHEMA}/tables/{table}" for table in generated])}
+
+            rng = random.Random(7)
+            table_paths, column_paths = [], []
+            for _ in range(args.lookups):
+                index = rng.randrange(len(generated))
+                column = rng.choice(table_columns(index, args.columns))["name"]
+                table_paths.append(f"/schemas/{SCHEMA}/tables/{generated[index]}")
+                column_paths.append(f"/schemas/{SCHEMA}/tables/{generated[index]}/columns/{column}")
+            results["cached table"] = time_requests(connection, table_paths)
+            results["cached column"] = time_requests(connection, column_paths)
+        finally:
+            connection.close()
+            server.shutdown()
+            service.close()
+
+    print(f"{'lookup':<16} {'count':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8}")
+    for kind, timings in results.items():
+        print(f"{kind:<16} {len(timings):>6} " + " ".join(
+            f"{_percentile(timings, percentile):>8.2f}" for percentile in (50, 90, 99)))
+
+    cached_p50 = _percentile(results["cached table"], 50)
+    if cached_p50 > args.max_p50_ms:
+        print(f"FAILED: cached p50 {cached_p50:.2f} ms exceeds {args.max_p50_ms} ms")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Generates synthetic schemas of N tables x M columns for benchmarks.
+
+Usage:
+    python -m benchmarks.synthetic_schema --tables 500 --columns 20 --dialect postgres > schema.sql
+
+Every table has a serial primary key, a foreign key to the previous table, a numeric column
+and a status column with check constraints, a timestamp and plain varchar columns. Every
+other table has a column comment and every fourth table a table comment. The schema can be
+loaded into a local PostgreSQL or MySQL database from the printed DDL, or fed straight to the
+extractor as metadata rows through `SyntheticDB`.
+"""
+import argparse
+from typing import Any, Dict, Iterator, List, Tuple
+from app.database.base_db import BaseDB
+
+STATUS_VALUES = ("active", "inactive", "archived")
+
+
+def table_name(table_index: int) -> str:
+    return f"table_{table_index:05d}"
+
+
+def table_columns(table_index: int, columns: int) -> List[dict]:
+    """
+    Describes the columns of one synthetic table.
+
+    Returns:
+        List[dict]: Column specs with `name`, `type`, `length`, `nullable`, `default`,
+            `primary_key`, `references`, `check` and `comment`.
+    """
+    specs = [{"name": "id", "type": "integer", "length": 32, "nullable": False,
+              "default": f"nextval('{table_name(table_index)}_id_seq'::regclass)", "primary_key": True}]
+    if table_index > 0:
+        specs.append({"name": "parent_id", "type": "integer", "length": 32,
+                      "references": table_name(table_index - 1)})
+    specs.append({"name": "amount", "type": "numeric", "length": 12, "check": "(amount >= (0)::numeric)",
+                  "comment": "Amount in the account currency." if table_index % 2 == 0 else None})
+    specs.append({"name": "status", "type": "character varying", "length": 20, "nullable": False,
+                  "default": "'active'::character varying",
+                  "check": "((status)::text = ANY ((ARRAY['"
+                           + "'::character varying, '".join(STATUS_VALUES)
+                           + "'::character varying])::text[]))"})
+    specs.append({"name": "created_at", "type": "timestamp without time zone", "nullable": False,
+                  "default": "now()"})
+    for column_index in range(max(columns - len(specs), 0)):
+        specs.append({"name": f"column_{column_index:03d}", "type": "character varying", "length": 255,
+                      "default": "''::character varying"})
+    return specs[:max(columns, 1)]
+
+
+def metadata_rows(tables: int, columns: int) -> Iterator[Tuple[Any, ...]]:
+    """Yields the one-row-per-column metadata rows the extractors return for the synthetic schema, ordered by table."""
+    for table_index in range(tables):
+        name = table_name(table_index)
+        for spec in table_columns(table_index, columns):
+            references = spec.get("references")
+            description = spec.get("comment") or (f"Foreign key for {references}" if references else "")
+            constraints = f"REFERENCES {references} (id)" if references else spec.get("check")
+            yield (name, spec["name"], spec["type"], spec.get("length"),
+                   "NO" if spec.get("nullable") is False else "YES", spec.get("default"),
+                   "Yes" if spec.get("primary_key") else "No", "Yes" if references else "No",
+                   constraints, description)
+
+
+def table_comments(tables: int) -> Dict[str, str]:
+    """Returns the synthetic table comments: every fourth table is commented."""
+    return {table_name(index): f"Synthetic table number {index}." for index in range(0, tables, 4)}
+
+
+def ddl_statements(tables: int, columns: int, dialect: str = "postgres", schema: str = "docuschema_benchmark") -> List[str]:
+    """
+    Builds the DDL that creates the synthetic schema in PostgreSQL or MySQL.
+
+    Args:
+        tables (int): Number of tables.
+        columns (int): Number of columns per table.
+        dialect (str): 'postgres' or 'mysql'.
+        schema (str): Schema (PostgreSQL) or database (MySQL) to create.
+
+    Returns:
+        List[str]: The statements, in execution order.
+    """
+    mysql = dialect == "mysql"
+    statements = [f"DROP {'DATABASE' if mysql else 'SCHEMA'} IF EXISTS {schema}{'' if mysql else ' CASCADE'}",
+                  f"CREATE {'DATABASE' if mysql else 'SCHEMA'} {schema}"]
+    comments = table_comments(tables)
+    status_values = ", ".join(f"'{value}'" for value in STATUS_VALUES)
+    for table_index in range(tables):
+        name = f"{schema}.{table_name(table_index)}"
+        definitions, comment_statements = [], []
+        for spec in table_columns(table_index, columns):
+            if spec.get("primary_key"):
+                definition = "id INT AUTO_INCREMENT PRIMARY KEY" if mysql else "id serial PRIMARY KEY"
+            elif spec.get("references"):
+                definition = "parent_id INT"
+                if not mysql:
+                    definition += f" REFERENCES {schema}.{spec['references']} (id)"
+            elif spec["name"] == "amount":
+                definition = "amount NUMERIC(12, 2) CHECK (amount >= 0)"
+            elif spec["name"] == "status":
+                definition = f"status VARCHAR(20) NOT NULL DEFAULT 'active' CHECK (status IN ({status_values}))"
+            elif spec["name"] == "created_at":
+                definition = "created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP"
+            else:
+                definition = f"{spec['name']} VARCHAR(255) DEFAULT ''"
+
+            if spec.get("comment") and mysql:
+                definition += f" COMMENT '{spec['comment']}'"
+            elif spec.get("comment"):
+                comment_statements.append(f"COMMENT ON COLUMN {name}.{spec['name']} IS '{spec['comment']}'")
+            definitions.append(definition)
+
+        if mysql and table_index > 0:
+            # MySQL ignores inline REFERENCES clauses
+            definitions.append(f"FOREIGN KEY (parent_id) REFERENCES {schema}.{table_name(table_index - 1)} (id)")
+        table_comment = comments.get(table_name(table_index))
+        if table_comment and mysql:
+            statements.append(f"CREATE TABLE {name} ({', '.join(definitions)}) COMMENT='{table_comment}'")
+        else:
+            statements.append(f"CREATE TABLE {name} ({', '.join(definitions)})")
+            if table_comment:
+                comment_statements.append(f"COMMENT ON TABLE {name} IS '{table_comment}'")
+        statements.extend(comment_statements)
+    return statements
+
+
+class SyntheticDB(BaseDB):
+    """Serves the synthetic schema's metadata rows in place of a database; `conn` is ignored."""
+
+    def __init__(self, tables: int, columns: int) -> None:
+        self.tables = tables
+        self.columns = columns
+
+    def fetch_metadata(self, conn, schema_name: str) -> List[Tuple[Any, ...]]:
+        return list(metadata_rows(self.tables, self.columns))
+
+    def stream_metadata(self, conn, schema_name: str) -> Iterator[Tuple[str, List[Tuple[Any, ...]]]]:
+        yield from self.group_rows_by_table(metadata_rows(self.tables, self.columns))
+
+    def fetch_table_comments(self, conn, schema_name: str) -> Dict[str, str]:
+        return table_comments(self.tables)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, default=100)
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--dialect", choices=("postgres", "mysql"), default="postgres")
+    parser.add_argument("--schema", default="docuschema_benchmark")
+    args = parser.parse_args()
+
+    for statement in ddl_statements(args.tables, args.columns, args.dialect, args.schema):
+        print(f"{statement};")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Measures how model tiers, hedged requests and circuit breakers cut the tail latency of a run, offline.
+
+Usage:
+    python -m benchmarks.tiered_llm_benchmark --tables 200 --columns 10 --concurrency 8
+
+Generates the data dictionaries of a synthetic schema with fake providers standing in for a
+fast local model with a slow tail and occasional errors, and a slower but steady backup:
+    - primary only: the local model alone, as with a single `LLM_MODEL_NAME`.
+    - tiers, no hedging: the backup only takes over requests the local model failed.
+    - tiers, hedged: requests slower than the local model's `--hedge-percentile` latency are
+      also sent to the backup, and the first valid response wins.
+    - primary down: the local model fails every call, so its circuit breaker opens and the
+      backup serves the run.
+
+The run prints the wall time, the p50/p99 table latency, the failed tables and how many tables
+each tier served. It exits with status 1 if a tiered scenario left tables undocumented or the
+hedged p99 is not below the primary-only p99.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ["LLM_MODEL_NAME"] = "fake:benchmark"
+os.environ["CACHE_ENABLED"] = "False"
+os.environ.setdefault("LOG_FILE", os.path.join(tempfile.mkdtemp(prefix="tiered_llm_benchmark_"), "benchmark.log"))
+
+from app.config.config import Config  # noqa: E402
+from app.common_utils.llm_scheduler import LLMScheduler  # noqa: E402
+from app.common_utils.llm_tiers import CircuitBreaker, LLMRouter, ModelTier  # noqa: E402
+from app.common_utils.run_metrics import _percentile, run_metrics  # noqa: E402
+from app.src import generate_data_dictionary  # noqa: E402
+from benchmarks.synthetic_schema import metadata_rows  # noqa: E402
+
+LOCAL = "fake:local?latency=0.05&jitter=0.02&tail_rate=0.05&tail_latency=1.5&error_rate=0.02&seed=1"
+BACKUP = "fake:cloud?latency=0.2&jitter=0.05&seed=2"
+LOCAL_DOWN = "fake:local?latency=0.02&error_rate=1&seed=3"
+
+
+def build_router(model_names: list, hedge_percentile: float) -> LLMRouter:
+    """Returns a router with fresh schedulers and breakers, so scenarios do not share state."""
+    tiers = [ModelTier(index, model_name,
+                       LLMScheduler(model_name, max_retries=2, base_delay=0.05, max_delay=0.5),
+                       CircuitBreaker(model_name, failure_threshold=5, reset_seconds=5))
+             for index, model_name in enumerate(model_names, start=1)]
+    return LLMRouter(tiers, hedge_percentile=hedge_percentile, hedge_min_samples=10,
+                     hedge_min_seconds=0.0, fallback_retries=0)
+
+
+def run_scenario(metadata_by_table: dict, router: LLMRouter, concurrency: int) -> dict:
+    generate_data_dictionary.llm_router = router
+    generate_data_dictionary._chains.clear()
+    run_metrics.reset()
+
+    start = time.perf_counter()
+    failed = sum(1 for _, _, output in generate_data_dictionary.generate_data_dictionaries(
+        metadata_by_table, max_concurrency=concurrency) if not output)
+    wall = time.perf_counter() - start
+
+    seconds = sorted(stats["seconds"] for stats in run_metrics.summary()["tables"].values())
+    return {"wall_s": wall, "p50_ms": 1000 * _percentile(seconds, 50),
+            "p99_ms": 1000 * _percentile(seconds, 99), "failed": failed,
+            "served": {index: stats["tables"] for index, stats in router.stats().items()},
+            "hedges": sum(stats["hedges"] for stats in router.stats().values()),
+            "breaker_opened": sum(stats["breaker_opened"] for stats in router.stats().values())}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tables", type=int, default=200)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--hedge-percentile", type=float, default=90.0)
+    args = parser.parse_args()
+
+    Config.LLM_MAX_CONCURRENCY = args.concurrency
+    metadata_by_table = {}
+    for row in metadata_rows(args.tables, args.columns):
+        metadata_by_table.setdefault(row[0], []).append(row)
+
+    scenarios = {
+        "primary only": ([LOCAL], 0.0),
+        "tiers, no hedging": ([LOCAL, BACKUP], 0.0),
+        "tiers, hedged": ([LOCAL, BACKUP], args.hedge_percentile),
+        "primary down": ([LOCAL_DOWN, BACKUP], args.hedge_percentile),
+    }
+    results = {name: run_scenario(metadata_by_table, build_router(model_names, hedge_percentile),
+                                  args.concurrency)
+               for name, (model_names, hedge_percentile) in scenarios.items()}
+
+    print(f"{args.tables} tables x {args.columns} columns, concurrency {args.concurrency}")
+    print(f"{'scenario':<18} {'wall s':>7} {'p50 ms':>8} {'p99 ms':>8} {'failed':>7} {'hedges':>7} "
+          f"{'breaker':>8}  tables per tier")
+    for name, result in results.items():
+        served = ", ".join(f"{index}: {tables}" for index, tables in result["served"].items())
+        print(f"{name:<18} {result['wall_s']:>7.2f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+              f"{result['failed']:>7} {result['hedges']:>7} {result['breaker_opened']:>8}  {served}")
+
+    failures = [f"{name}: {result['failed']} tables failed" for name, result in results.items()
+                if name != "primary only" and result["failed"]]
+    if results["tiers, hedged"]["p99_ms"] >= results["primary only"]["p99_ms"]:
+        failures.append("hedging did not lower the p99 table latency")
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
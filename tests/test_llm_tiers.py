@@ -0,0 +1,58 @@
+import time
+from app.common_utils.fake_llm import FakeChatModel
+from app.common_utils.llm_scheduler import LLMScheduler
+from app.common_utils.llm_tiers import CircuitBreaker, LLMRouter, ModelTier
+
+
+def make_router(models: dict, hedge_percentile: float = 0.0, failure_threshold: int = 2) -> LLMRouter:
+    tiers = []
+    for index, (name, model) in enumerate(models.items(), start=1):
+        tier = ModelTier(index, f"fake:{name}", LLMScheduler(name, max_retries=0),
+                         CircuitBreaker(name, failure_threshold=failure_threshold, reset_seconds=60))
+        tier._llm = model
+        tiers.append(tier)
+    return LLMRouter(tiers, hedge_percentile=hedge_percentile, hedge_min_samples=3,
+                     hedge_min_seconds=0.0, fallback_retries=0)
+
+
+def ask(router: LLMRouter) -> str:
+    return router.call(lambda tier: tier.get_llm().invoke, "('orders', 'id', 'integer'").content
+
+
+def test_slow_request_is_hedged_to_the_next_tier():
+    router = make_router({"local": FakeChatModel(latency=0.02), "cloud": FakeChatModel(latency=0.05)},
+                         hedge_percentile=90)
+    for _ in range(3):
+        ask(router)
+
+    router.tiers[0]._llm = FakeChatModel(latency=2.0)
+    started = time.perf_counter()
+    ask(router)
+
+    assert time.perf_counter() - started < 1.0
+    assert router.tiers[1].stats()["hedges_won"] == 1
+    assert router.tiers[0].stats()["abandoned"] == 1
+
+
+def test_failed_request_fails_over_and_opens_the_breaker():
+    router = make_router({"local": FakeChatModel(error_rate=1.0), "cloud": FakeChatModel()})
+    for _ in range(3):
+        ask(router)
+
+    local, cloud = router.tiers[0].stats(), router.tiers[1].stats()
+    assert local["breaker"] == "open"
+    assert local["requests"] == 2
+    assert cloud["served"] == 3
+    assert cloud["failovers"] == 2
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker("local", failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()